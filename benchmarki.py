@@ -0,0 +1,606 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Pomiary wydajności rozwiązań zadań domowych.
+# Uruchomienie: python benchmarki.py [--historia benchmarki.jsonl] [--szybki]
+# Wyniki dopisywane są do historii (plik JSONL, jeden wiersz na uruchomienie),
+# a pogorszenie metryk względem poprzedniego wpisu zgłaszane jest jako regresja.
+
+import argparse
+import asyncio
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+import bezstanowe
+import przebiegi
+import punkty
+import serwis
+import zadanie1
+import zadanie2
+
+def zmierzCzas(funkcja,powtorzenia=3):
+    'Zwraca najkrótszy z kilku pomiarów czasu wykonania funkcji [s].'
+    czasy = []
+    for x in range(powtorzenia):
+        start = time.perf_counter()
+        funkcja()
+        czasy.append(time.perf_counter() - start)
+    return min(czasy)
+
+def benchmarkRownoleglosci(liczbyProcesow=None,rozdzielczosc=1.0,liczbaCzestotliwosci=16):
+    """
+    Mierzy skalowanie Rozwiazanie.wzorPromieniowania z liczbą procesów roboczych
+    dla siatki theta x phi o zadanej rozdzielczości [stopień].
+    Sprawdza przy okazji, że wynik równoległy jest identyczny z szeregowym.
+    Zwraca listę krotek (liczba procesów, czas [s], przyspieszenie).
+    """
+    if liczbyProcesow is None:
+        liczbyProcesow = sorted(set([1, 2, 4, multiprocessing.cpu_count()]))
+    rozwiazanie = zadanie1.Rozwiazanie(r=1.0E4)
+    listaTheta = np.radians(np.arange(0.0, 360.0, rozdzielczosc))        # [rad]
+    listaPhi = np.radians(np.arange(0.0, 180.0, rozdzielczosc))            # [rad]
+    f = np.logspace(5, 9, liczbaCzestotliwosci)                            # [Hz]
+
+    wzorzec = rozwiazanie.wzorPromieniowania(listaTheta,listaPhi,f)
+    wyniki = []
+    for liczbaProcesow in liczbyProcesow:
+        wynik = rozwiazanie.wzorPromieniowania(listaTheta,listaPhi,f,liczbaProcesow)
+        if not np.array_equal(wynik, wzorzec):
+            raise Exception("Wynik równoległy różni się od szeregowego!")
+        czas = zmierzCzas(lambda: rozwiazanie.wzorPromieniowania(listaTheta,listaPhi,f,liczbaProcesow))
+        wyniki.append((liczbaProcesow, czas, wyniki[0][1]/czas if wyniki else 1.0))
+    return wyniki
+
+def zmierzPamiec(funkcja):
+    'Zwraca krotkę (wynik funkcji, pamięć zajmowana przez wynik [B]) zmierzoną przez tracemalloc.'
+    tracemalloc.start()
+    try:
+        wynik = funkcja()
+        pamiec = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return wynik, pamiec
+
+def zmierzPamiecSzczytowa(funkcja):
+    'Zwraca krotkę (wynik funkcji, szczytowa pamięć zaalokowana w trakcie wykonania [B]).'
+    tracemalloc.start()
+    try:
+        wynik = funkcja()
+        pamiec = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return wynik, pamiec
+
+def obwodTestowy(liczbaDipoli):
+    """
+    Obwód z zadania pierwszego, w którym dipole zastąpiono liczbaDipoli dipolami
+    o tych samych orientacjach, rozrzuconymi wokół dipoli obwodu (łączna długość bez zmian).
+    """
+    obwod = zadanie1.EmitujacyObwod()
+    if liczbaDipoli != len(obwod.dipole):
+        numery = np.arange(liczbaDipoli) % len(obwod.dipole)
+        skala = np.linspace(0.5, 1.5, liczbaDipoli)
+        obwod.dipole = zadanie1.ZbiorDipoli(\
+            dlugosci = obwod.dipole.dlugosci[numery]*len(obwod.dipole)/liczbaDipoli,\
+            theta = obwod.dipole.theta[numery],\
+            r = obwod.dipole.r[numery]*skala,\
+            prady = obwod.A,\
+            srodki = obwod.dipole.srodki.xyz[numery]*skala[:, np.newaxis])
+    return obwod
+
+def benchmarkPrzemiatania(rozdzielczosci=(4.0, 2.0, 1.0),liczbyDipoli=(6, 1000, 10000),liczbaCzestotliwosci=3,\
+        model='biegunowy'):
+    """
+    Mierzy wydajność Rozwiazanie.wzorPromieniowania (zadanie 1) dla siatek theta x phi
+    o zadanych rozdzielczościach [stopień] i obwodów o zadanej liczbie dipoli (model pola obwodu model).
+    Zwraca listę słowników z liczbą punktów (theta, phi, f), liczbą dipoli,
+    liczbą punktów na sekundę i szczytową pamięcią obliczeń [B].
+    """
+    f = np.logspace(5, 9, liczbaCzestotliwosci)                                # [Hz]
+    wyniki = []
+    for liczbaDipoli in liczbyDipoli:
+        rozwiazanie = zadanie1.Rozwiazanie(r=1.0E4,obwod=obwodTestowy(liczbaDipoli))
+        rozwiazanie.obwod.model = model
+        for rozdzielczosc in rozdzielczosci:
+            listaTheta = np.radians(np.arange(0.0, 360.0, rozdzielczosc))        # [rad]
+            listaPhi = np.radians(np.arange(0.0, 180.0, rozdzielczosc))            # [rad]
+            liczbaPunktow = listaTheta.size*listaPhi.size*f.size
+            obliczenia = lambda: rozwiazanie.wzorPromieniowania(listaTheta,listaPhi,f)
+            czas = zmierzCzas(obliczenia)
+            wyniki.append({\
+                'rozdzielczosc': rozdzielczosc,\
+                'dipole': liczbaDipoli,\
+                'punkty': liczbaPunktow,\
+                'punktyNaSekunde': liczbaPunktow/czas,\
+                'pamiecSzczytowa': zmierzPamiecSzczytowa(obliczenia)[1]})
+    return wyniki
+
+def benchmarkPunktow(liczbaPunktow=10**6,liczbaZrodel=8):
+    """
+    Mierzy przeliczenia zbiorów punktów (moduł punkty) dla liczbaPunktow punktów obserwacji:
+    współrzędne sferyczne -> kartezjańskie -> sferyczne oraz odległości od liczbaZrodel źródeł
+    i ich rzuty na wersory theta. Sprawdza zgodność przeliczenia w obie strony.
+    Zwraca słownik liczby punktów na sekundę dla każdej operacji.
+    """
+    losowe = np.random.default_rng(0)
+    theta = losowe.uniform(0.01, np.pi - 0.01, liczbaPunktow)                # [rad]
+    phi = losowe.uniform(-np.pi + 0.01, np.pi - 0.01, liczbaPunktow)        # [rad]
+    r = losowe.uniform(1.0, 1.0E4, liczbaPunktow)                            # [m]
+    zrodla = punkty.ZbiorPunktow(losowe.uniform(-0.3, 0.3, (liczbaZrodel, 3)))
+    obserwatory = punkty.ZbiorPunktow.zeSferycznych(theta,phi,r)
+    for a, b in zip(obserwatory.sferyczne(), (theta, phi, r)):
+        if not np.allclose(a, b, rtol=1.0E-12, atol=1.0E-12):
+            raise Exception("Przeliczenie współrzędnych w obie strony nie zgadza się!")
+    wersoryTheta = punkty.wersorySferyczne(theta,phi)[1][:, np.newaxis, :]
+
+    def rzuty():
+        wektory = punkty.wektoryWzgledne(zrodla,obserwatory)
+        return np.sqrt(punkty.rzut(wektory,wektory)), punkty.rzut(wektory,wersoryTheta)
+    return {\
+        'kartezjanskie': liczbaPunktow/zmierzCzas(lambda: punkty.ZbiorPunktow.zeSferycznych(theta,phi,r)),\
+        'sferyczne': liczbaPunktow/zmierzCzas(obserwatory.sferyczne),\
+        'odleglosci': liczbaPunktow*liczbaZrodel/zmierzCzas(rzuty)}
+
+def benchmarkPolaBliskiego(liczbaPunktowNaOs=40,liczbaProcesow=2):
+    """
+    Mierzy mapę pełnego pola E (Rozwiazanie.mapaPola, zadanie 1) na siatce objętościowej
+    liczbaPunktowNaOs^3 punktów nad płytką, zapisywaną do pliku .npy odwzorowanego w pamięci.
+    Sprawdza, że w strefie dalekiej pole pokrywa się z modelem geometrycznym, a wynik puli
+    liczbaProcesow procesów jest identyczny z szeregowym.
+    Zwraca słownik z liczbą punktów (punkt, częstotliwość) na sekundę i szczytową pamięcią [B].
+    """
+    rozwiazanie = zadanie1.Rozwiazanie(r=1.0)
+    obwod = rozwiazanie.obwod
+    f = np.array(obwod.f)                                                    # [Hz]
+    theta, phi = np.array([0.3, 1.0, 2.5]), np.array([0.0, 0.4, -0.7])        # [rad]
+    E = obwod.poleBliskie(zadanie1.punktyZadania(theta,phi,1.0E7),f)
+    Etheta = np.einsum('nfk,nk->nf', E, zadanie1.wersorThetaZadania(theta,phi))
+    obwod.model = 'geometryczny'
+    wzorzec = obwod.poleE(theta,phi,1.0E7,f)
+    obwod.model = 'biegunowy'
+    if np.abs(Etheta - wzorzec).max() > 1.0E-3*np.abs(wzorzec).max():
+        raise Exception("Pole bliskie w strefie dalekiej różni się od modelu geometrycznego!")
+
+    x = np.linspace(-0.1, 0.4, liczbaPunktowNaOs)                            # [m]
+    y = np.linspace(-0.2, 0.2, liczbaPunktowNaOs)                            # [m]
+    z = np.linspace(0.01, 0.2, liczbaPunktowNaOs)                            # [m]
+    with tempfile.TemporaryDirectory() as katalog:
+        plik = os.path.join(katalog, 'mapa.npy')
+        obliczenia = lambda: rozwiazanie.mapaPola(x,y,z,f,plik=plik,dlugoscDipola=0.01)
+        czas = zmierzCzas(obliczenia, 1)
+        wynik, pamiec = zmierzPamiecSzczytowa(obliczenia)
+        if liczbaProcesow > 1 and not np.array_equal(wynik.dane,\
+                rozwiazanie.mapaPola(x,y,z,f,liczbaProcesow,dlugoscDipola=0.01).dane):
+            raise Exception("Mapa pola z puli procesów różni się od szeregowej!")
+        del wynik
+    return {\
+        'punktyNaSekunde': x.size*y.size*z.size*f.size/czas,\
+        'pamiecSzczytowa': pamiec}
+
+def benchmarkPamieciDipoli(liczbaDipoli=100000):
+    """
+    Porównuje pamięć zajmowaną przez liczbaDipoli dipoli przechowywanych jako obiekty
+    DipolHertza oraz jako kolumnowy zadanie1.ZbiorDipoli (wraz z prądami).
+    Zwraca słownik liczby bajtów na dipol dla obu modeli.
+    """
+    dlugosci = np.full(liczbaDipoli, 1.0E-3)                            # [m]
+    theta = np.linspace(0.0, 2.0*np.pi, liczbaDipoli)                    # [rad]
+    r = np.linspace(0.0, 1.0, liczbaDipoli)                                # [m]
+
+    def obiekty():
+        return [zadanie1.DipolHertza(float(dlugosci[x]),\
+            zadanie1.UkladPolarny(theta=float(theta[x]),phi=0.0,r=float(r[x])))\
+            for x in range(liczbaDipoli)]
+
+    def tablice():
+        return zadanie1.ZbiorDipoli(dlugosci.copy(),theta.copy(),r.copy(),zadanie1.EmitujacyObwod.A)
+
+    wynikObiekty, pamiecObiekty = zmierzPamiec(obiekty)
+    wynikTablice, pamiecTablice = zmierzPamiec(tablice)
+    return {\
+        'obiekty': pamiecObiekty/liczbaDipoli,\
+        'tablice': pamiecTablice/liczbaDipoli}
+
+def falaTestowa():
+    'Fala płaska ,,Fala pierwsza'' z zadania drugiego, pobudzająca wszystkie segmenty linii.'
+    return zadanie2.FalaPlaska(\
+        k = zadanie2.UkladKartezjanski(x = 1.0, y = 1.0, z = 1.0),\
+        E = zadanie2.UkladKartezjanski(x = -0.5, y = -0.5, z = 1.0),\
+        H = zadanie2.UkladKartezjanski(x = -1.0, y = 1.0, z = 0.0),\
+        f = zadanie2.Rozwiazanie.fmin)
+
+def benchmarkLiniiTEM(punktyNaDekadeF=1000):
+    """
+    Porównuje skalarne (Rozwiazanie.Vne/Vfe) i wektorowe (Rozwiazanie.widmoVne/widmoVfe)
+    przemiatanie częstotliwości linii TEM. Sprawdza zgodność obu ścieżek.
+    Zwraca słownik liczby częstotliwości na sekundę dla obu ścieżek.
+    """
+    rozwiazanie = zadanie2.Rozwiazanie()
+    rozwiazanie.punktyNaDekadeF = punktyNaDekadeF
+    rozwiazanie.fala = falaTestowa()
+    for skalarne, wektorowe in ((rozwiazanie.Vne, rozwiazanie.widmoVne), (rozwiazanie.Vfe, rozwiazanie.widmoVfe)):
+        if not np.allclose(np.asarray(skalarne()), wektorowe(), rtol=1.0E-12, atol=0.0):
+            raise Exception("Widmo wektorowe różni się od obliczeń skalarnych!")
+    liczbaF = len(rozwiazanie.czestotliwosci())
+    return {\
+        'skalarne': liczbaF/zmierzCzas(rozwiazanie.Vne),\
+        'wektorowe': liczbaF/zmierzCzas(rozwiazanie.widmoVne)}
+
+def odpowiedzLiniiDopasowanej(f,liczbaCzesci=1):
+    """
+    Wzorzec modelu MTL w postaci zamkniętej: pojedyncza, jednorodna linia (jeden segment
+    o długości B wzdłuż osi x, podzielony na liczbaCzesci części) obciążona na obu końcach
+    impedancją falową Zc i oświetlana prostopadle (k prostopadłe do linii, faza fali stała
+    wzdłuż linii). Przy dopasowaniu fale biegnące w obie strony nie odbijają się, więc
+    Vfe = (V' + Zc*I')/2 * (1 - exp(-j*beta*B))/(j*beta) oraz
+    Vne = -(V' - Zc*I')/2 * (1 - exp(-j*beta*B))/(j*beta), gdzie V' i I' to źródła na jednostkę
+    długości. Zwraca krotkę (linia, fala, Vne, Vfe).
+    """
+    segment = zadanie2.LiniaTEM.SegmentTEM(zadanie2.UkladKartezjanski(1.0, 0.0, 0.0))
+    linia = zadanie2.LiniaTEM.__new__(zadanie2.LiniaTEM)
+    linia.segmenty = (segment,)
+    linia.pamiecTransmitancji = None
+    Zc = np.sqrt(zadanie2.Constants.Mi*zadanie2.Constants.Eps) / segment.C        # [Ohm] impedancja falowa
+    linia.Rne = Zc
+    linia.Rfe = Zc
+    linia = linia.podzielona(liczbaCzesci)
+    # k w płaszczyźnie OYZ, E i H obrócone wokół k tak, by pobudzały oba źródła
+    cos, sin = np.cos(0.3), np.sin(0.3)
+    fala = zadanie2.FalaPlaska(\
+        k = zadanie2.UkladKartezjanski(x = 0.0, y = 1.0, z = 1.0),\
+        E = zadanie2.UkladKartezjanski(x = cos, y = -sin/np.sqrt(2.0), z = sin/np.sqrt(2.0)),\
+        H = zadanie2.UkladKartezjanski(x = -sin, y = -cos/np.sqrt(2.0), z = cos/np.sqrt(2.0)),\
+        f = zadanie2.Rozwiazanie.fmin)
+    omega = 2.0*np.pi*np.asarray(f, dtype=float)                                # [rad/s]
+    beta = omega / zadanie2.Constants.c                                        # [rad/m]
+    zrodloV = -1j*omega * zadanie2.Constants.Mi*fala.H.y*zadanie2.Constants.H * segment.s    # [V/m]
+    zrodloI = -1j*omega * segment.C*fala.E.z*zadanie2.Constants.E * segment.s                # [A/m]
+    calka = (1.0 - np.exp(-1j*beta*segment.B)) / (1j*beta)                    # [m]
+    return linia, fala, -0.5*(zrodloV - Zc*zrodloI)*calka, 0.5*(zrodloV + Zc*zrodloI)*calka
+
+def benchmarkMTL(liczbaCzestotliwosci=5000,liczbaCzesci=100):
+    """
+    Mierzy wydajność modelu linii długiej (LiniaTEM.odpowiedzMTL) dla linii, której segmenty
+    podzielono na liczbaCzesci części, na logarytmicznej siatce częstotliwości do 10 GHz.
+    Sprawdza, że podział segmentów nie zmienia wyniku, że dla małych częstotliwości
+    wynik pokrywa się z modelem skupionym, a dla B/lambda > 1/8 z postacią zamkniętą
+    linii dopasowanej (odpowiedzLiniiDopasowanej). Zwraca liczbę częstotliwości na sekundę.
+    """
+    linia = zadanie2.LiniaTEM()
+    fala = falaTestowa()
+    f = np.logspace(0, 10, liczbaCzestotliwosci)                            # [Hz]
+    podzielona = linia.podzielona(liczbaCzesci)
+    wynik = podzielona.odpowiedzMTL(fala,f)
+    for wielkosc, wzorzec in zip(wynik, linia.odpowiedzMTL(fala,f)):
+        if not np.allclose(wielkosc, wzorzec, rtol=1.0E-9, atol=1.0E-9*np.abs(wzorzec).max()):
+            raise Exception("Podział segmentów zmienia wynik modelu MTL!")
+    niskie = f <= 10.0
+    for wielkosc, wzorzec in zip(wynik, linia.odpowiedz(fala,f[niskie])):
+        if not np.allclose(wielkosc[niskie], wzorzec, rtol=1.0E-5, atol=0.0):
+            raise Exception("Model MTL różni się od skupionego dla małych częstotliwości!")
+    wysokie = f[f > zadanie2.Constants.c / (8.0*zadanie2.LiniaTEM.SegmentTEM.B)]
+    dopasowana, falaProstopadla, Vne, Vfe = odpowiedzLiniiDopasowanej(wysokie, liczbaCzesci)
+    for wielkosc, wzorzec in zip(dopasowana.odpowiedzMTL(falaProstopadla,wysokie), (Vne, Vfe)):
+        if not np.allclose(wielkosc, wzorzec, rtol=1.0E-9, atol=1.0E-9*np.abs(wzorzec).max()):
+            raise Exception("Model MTL różni się od postaci zamkniętej linii dopasowanej!")
+    return f.size/zmierzCzas(lambda: podzielona.odpowiedzMTL(fala,f))
+
+def benchmarkPrzebiegow(liczbaProbek=10**6,dt=1.0E-11):
+    """
+    Mierzy czas trybu przebiegów czasowych obu zadań dla rekordu liczbaProbek próbek co dt [s]:
+    pola E(t) od obwodu zasilanego impulsem ESD (zadanie 1) i napięć Vne(t), Vfe(t) linii
+    oświetlanej falą o przebiegu zegara trapezowego (zadanie 2, model MTL). Sprawdza, że przebieg
+    sinusoidalny daje odpowiedź zgodną z obliczeniami harmonicznymi.
+    Zwraca słownik czasów obliczeń [s].
+    """
+    rozwiazanie1 = zadanie1.Rozwiazanie(r=1.0E4)
+    rozwiazanie2 = zadanie2.Rozwiazanie()
+    rozwiazanie2.fala = falaTestowa()
+    rozwiazanie2.model = 'mtl'
+
+    # zgodność z obliczeniami harmonicznymi dla jednego prążka
+    N, krok, numer = 4096, 1.0E-10, 37
+    f0 = np.fft.rfftfreq(N, krok)[numer]                                    # [Hz]
+    sinusoida = np.cos(2.0*np.pi*f0*przebiegi.czasy(N, krok))
+    for przebieg, H in (\
+            (rozwiazanie1.przebiegPola(sinusoida,krok,[0.5*np.pi],opoznienie=True)[0, 0],\
+                rozwiazanie1.obwod.poleE(0.5*np.pi,0.0,rozwiazanie1.r,[f0])[0]/rozwiazanie1.obwod.A),\
+            (rozwiazanie2.przebiegNapiec(sinusoida,krok)[0],\
+                rozwiazanie2.odpowiedz([f0])[0][0]/zadanie2.Constants.E)):
+        wzorzec = np.abs(H)*np.cos(2.0*np.pi*f0*przebiegi.czasy(N, krok) + np.angle(H))
+        if np.abs(przebieg - wzorzec).max() > 1.0E-8*np.abs(H):
+            raise Exception("Przebieg czasowy różni się od obliczeń harmonicznych!")
+
+    prad = przebiegi.impulsESD(liczbaProbek,dt,opoznienie=1.0E-9)            # [A]
+    pole = 10.0*przebiegi.zegarTrapezowy(liczbaProbek,dt,1.0E-8,1.0E-9)        # [V/m]
+    return {\
+        'pole': zmierzCzas(lambda: rozwiazanie1.przebiegPola(prad,dt,[0.5*np.pi]), 1),\
+        'napiecia': zmierzCzas(lambda: rozwiazanie2.przebiegNapiec(pole,dt), 1)}
+
+def benchmarkWspolbieznosci(liczbaZadan=64,liczbaWatkow=8,liczbaDipoli=1000):
+    """
+    Test obciążeniowy obliczeń współbieżnych: liczbaZadan zadań o różnych częstotliwościach
+    liczonych naraz w liczbaWatkow wątkach na wspólnej geometrii - bezstanowym API
+    (pula wątków i asyncio) oraz wspólnymi obiektami EmitujacyObwod i LiniaTEM.
+    Każdy wynik porównywany jest z obliczeniem szeregowym; rozbieżność zgłaszana jest wyjątkiem.
+    Zwraca słownik przepustowości [zadania/s] szeregowo i w każdym trybie współbieżnym.
+    """
+    obwodWspolny = obwodTestowy(liczbaDipoli)
+    obwod = bezstanowe.obwodDipoli(obwodWspolny)
+    linia = zadanie2.LiniaTEM().podzielona(10)
+    geometria = linia.geometria()
+    fala = falaTestowa()
+    wektory = zadanie2.wektoryFali(fala)
+    theta = np.linspace(0.0, np.pi, 181)                                    # [rad]
+    zadania = [np.array([1.0E6*(numer + 1), 3.0E7*(numer + 1)]) for numer in range(liczbaZadan)]
+
+    def zadanieBezstanowe(f):
+        return bezstanowe.poleE(obwod,theta,0.0,1.0E4,f), bezstanowe.odpowiedzLinii(geometria,wektory,f,'mtl')
+
+    def zadanieWspolne(f):
+        return obwodWspolny.poleE(theta,0.0,1.0E4,f), linia.odpowiedzMTL(fala,f), linia.odpowiedz(fala,f)
+
+    start = time.perf_counter()
+    wzorce = [zadanieBezstanowe(f) for f in zadania]
+    czasSzeregowy = time.perf_counter() - start
+    wzorceWspolne = [zadanieWspolne(f) for f in zadania]
+
+    def tablice(wynik):
+        'Tablice wyniku zadania (zagnieżdżone krotki) jako płaska lista.'
+        if isinstance(wynik, (tuple, list)):
+            return [tablica for czesc in wynik for tablica in tablice(czesc)]
+        return [wynik]
+
+    def sprawdz(wyniki,oczekiwane,tryb):
+        for wynik, wzorzec in zip(wyniki, oczekiwane):
+            if not all(np.array_equal(a, b) for a, b in zip(tablice(wynik), tablice(wzorzec))):
+                raise Exception("Wynik współbieżny (" + tryb + ") różni się od szeregowego!")
+
+    async def wszystkieAsync(wykonawca):
+        return await asyncio.gather(*[asyncio.gather(\
+            wykonawca.poleEAsync(obwod,theta,0.0,1.0E4,f),\
+            wykonawca.odpowiedzLiniiAsync(geometria,wektory,f,'mtl')) for f in zadania])
+
+    czasy = {'szeregowo': czasSzeregowy}
+    with bezstanowe.Wykonawca(liczbaWatkow) as wykonawca:
+        start = time.perf_counter()
+        wyniki = list(wykonawca.pula.map(zadanieBezstanowe, zadania))
+        czasy['watki'] = time.perf_counter() - start
+        sprawdz(wyniki, wzorce, 'wątki')
+        start = time.perf_counter()
+        wyniki = asyncio.run(wszystkieAsync(wykonawca))
+        czasy['asyncio'] = time.perf_counter() - start
+        sprawdz(wyniki, wzorce, 'asyncio')
+        start = time.perf_counter()
+        wyniki = list(wykonawca.pula.map(zadanieWspolne, zadania))
+        czasy['obiektyWspolne'] = time.perf_counter() - start
+        sprawdz(wyniki, wzorceWspolne, 'obiekty wspólne')
+    return dict((tryb, liczbaZadan/czas) for tryb, czas in czasy.items())
+
+def benchmarkSerwisu(liczbaZapytan=2000,wspolbieznosc=64,liczbaProcesow=2,okna=(0.0, 0.002),limitWiersza=1 << 20):
+    """
+    Test obciążeniowy lokalnego serwisu (serwis.Serwis) uruchomionego na gnieździe uniksowym:
+    generator wysyła liczbaZapytan drobnych zapytań (serwis.zapytaniaTestowe) utrzymując
+    wspolbieznosc zapytań w toku, osobno dla każdego okna łączenia zapytań [s].
+    Odpowiedzi na kilka pierwszych zapytań i na jedno duże zapytanie (1000 kierunków, odpowiedź
+    dłuższa niż domyślny limit wiersza asyncio) porównywane są z obliczeniem bezpośrednim,
+    a zapytanie dłuższe niż limitWiersza [B] musi dostać odpowiedź z błędem bez zerwania
+    połączenia; niepowodzenie zgłaszane jest wyjątkiem. Zwraca słownik okno -> raport generatora
+    (przepustowosc [zapytania/s], p50, p99 [s]) uzupełniony o średnią liczbę zapytań na porcję.
+    """
+    zapytania = serwis.zapytaniaTestowe(liczbaZapytan)
+    obwod = zadanie1.EmitujacyObwod()
+    linia = zadanie2.LiniaTEM().geometria()
+
+    def sprawdz(zapytanie,odpowiedz):
+        if zapytanie['zadanie'] == 'pole':
+            wynik = np.array(odpowiedz['E']['re']) + 1j*np.array(odpowiedz['E']['im'])
+            wzorzec = obwod.poleE(np.array(zapytanie['theta']),zapytanie['phi'],zapytanie['r'],zapytanie['f'])
+        else:
+            wynik = np.array(odpowiedz['Vne']['re']) + 1j*np.array(odpowiedz['Vne']['im'])
+            wzorzec = bezstanowe.odpowiedzLinii(linia,zadanie2.WektoryFali((1.0, 1.0, 0.0),\
+                (-1.0, 1.0, 0.0), (0.0, 0.0, 1.0)),np.array(zapytanie['f']),zapytanie['model'])[0]
+        if not np.allclose(wynik, wzorzec, rtol=1.0E-12, atol=0.0):
+            raise Exception("Odpowiedź serwisu różni się od obliczenia bezpośredniego!")
+
+    duze = {'zadanie': 'pole', 'theta': np.linspace(0.0, 2.0*np.pi, 1000).tolist(), 'phi': 0.0, 'r': 1.0E4,\
+        'f': list(zadanie1.EmitujacyObwod.f)}
+    zbytDlugie = (json.dumps({'id': 'zbytDlugie', 'zadanie': 'pole', 'r': 1.0E4,\
+        'theta': np.linspace(0.0, 1.0, limitWiersza // 8).tolist()}) + '\n').encode()
+
+    async def sprawdzLimitWiersza(gniazdo):
+        czytnik, pisarz = await asyncio.open_unix_connection(gniazdo, limit=limitWiersza)
+        try:
+            pisarz.write(zbytDlugie + (json.dumps({'id': 'metryki', 'zadanie': 'metryki'}) + '\n').encode())
+            await pisarz.drain()
+            odpowiedzi = [json.loads(await czytnik.readline()) for x in range(2)]
+        finally:
+            pisarz.close()
+        if sorted('blad' in odpowiedz for odpowiedz in odpowiedzi) != [False, True]:
+            raise Exception("Serwis nie odrzucił zbyt długiego zapytania lub zerwał połączenie!")
+
+    async def obciazenie(okno,gniazdo):
+        uslugi = serwis.Serwis(liczbaProcesow, oknoLaczenia=okno, limitWiersza=limitWiersza)
+        await uslugi.start(gniazdo)
+        klient = await serwis.Klient.polacz(gniazdo, limitWiersza=limitWiersza)
+        try:
+            proba = [duze] + zapytania[:2*wspolbieznosc]
+            for zapytanie, odpowiedz in zip(proba, await asyncio.gather(*map(klient.zapytaj, proba))):
+                sprawdz(zapytanie, odpowiedz)
+            await sprawdzLimitWiersza(gniazdo)
+            raport = await serwis.generatorObciazenia(klient, zapytania, wspolbieznosc)
+            raport['zapytaniaNaPorcje'] = uslugi.metryki()['zapytaniaNaPorcje']
+        finally:
+            await klient.zamknij()
+            await uslugi.zamknij()
+        return raport
+
+    raporty = {}
+    with tempfile.TemporaryDirectory() as katalog:
+        for okno in okna:
+            raporty[okno] = asyncio.run(obciazenie(okno, os.path.join(katalog, 'serwis.sock')))
+    return raporty
+
+# Pakiety graficzne, których nie wolno ładować przy imporcie modułów obliczeniowych
+PAKIETY_GRAFICZNE = ('matplotlib', 'visual', 'vpython', 'tkinter')
+
+def benchmarkImportu(modul,powtorzenia=5,limitCzasu=None):
+    """
+    Mierzy czas uruchomienia świeżego interpretera z importem zadanego modułu [s]
+    i sprawdza, że import nie ładuje pakietów graficznych (PAKIETY_GRAFICZNE).
+    Gdy podano limitCzasu [s], przekroczenie go zgłaszane jest jako wyjątek.
+    Zwraca najkrótszy zmierzony czas [s].
+    """
+    kod = "import sys, {0}; print(','.join(sorted(set(m.split('.')[0] for m in sys.modules) & set({1!r}))))"\
+        .format(modul, PAKIETY_GRAFICZNE)
+    czasy = []
+    for x in range(powtorzenia):
+        start = time.perf_counter()
+        wynik = subprocess.run([sys.executable, '-c', kod], capture_output=True, text=True, check=True)
+        czasy.append(time.perf_counter() - start)
+        if wynik.stdout.strip():
+            raise Exception("Import modułu " + modul + " ładuje pakiety graficzne: " + wynik.stdout.strip())
+    if limitCzasu is not None and min(czasy) > limitCzasu:
+        raise Exception("Import modułu {} trwa {:.3f} [s], dłużej niż {:.3f} [s]!".format(modul, min(czasy), limitCzasu))
+    return min(czasy)
+
+def zestawBenchmarkow(szybki=False):
+    """
+    Uruchamia pełen zestaw pomiarów i zwraca płaski słownik metryk
+    (nazwa z jednostką w nawiasach kwadratowych -> wartość).
+    W trybie szybkim pomijane są największe siatki i obwody.
+    """
+    metryki = {}
+    for modul in ('zadanie1', 'zadanie2'):
+        metryki['import.{} [s]'.format(modul)] = benchmarkImportu(modul)
+    for pomiar in benchmarkPrzemiatania(\
+            rozdzielczosci=(4.0, 2.0) if szybki else (4.0, 2.0, 1.0),\
+            liczbyDipoli=(6, 1000) if szybki else (6, 1000, 10000)):
+        nazwa = 'zadanie1.wzor.{:g}st.{}dip'.format(pomiar['rozdzielczosc'], pomiar['dipole'])
+        metryki[nazwa + ' [pkt/s]'] = pomiar['punktyNaSekunde']
+        metryki[nazwa + '.pamiec [B]'] = pomiar['pamiecSzczytowa']
+    for pomiar in benchmarkPrzemiatania(rozdzielczosci=(2.0,), liczbyDipoli=(1000,), model='geometryczny'):
+        metryki['zadanie1.wzor.geometryczny.2st.1000dip [pkt/s]'] = pomiar['punktyNaSekunde']
+    for operacja, wydajnosc in benchmarkPunktow(10**5 if szybki else 10**6).items():
+        metryki['punkty.{} [pkt/s]'.format(operacja)] = wydajnosc
+    pomiar = benchmarkPolaBliskiego(20 if szybki else 40)
+    metryki['zadanie1.mapaPola [pkt/s]'] = pomiar['punktyNaSekunde']
+    metryki['zadanie1.mapaPola.pamiec [B]'] = pomiar['pamiecSzczytowa']
+    for sciezka, wydajnosc in benchmarkLiniiTEM(100 if szybki else 1000).items():
+        metryki['zadanie2.widmo.{} [f/s]'.format(sciezka)] = wydajnosc
+    metryki['zadanie2.mtl.{}seg [f/s]'.format(4*(10 if szybki else 100))] = benchmarkMTL(\
+        liczbaCzesci=10 if szybki else 100)
+    rozwiazanie = zadanie2.Rozwiazanie()
+    rozwiazanie.fala = falaTestowa()
+    metryki['zadanie2.widmo.pamiec [B]'] = zmierzPamiecSzczytowa(rozwiazanie.odpowiedz)[1]
+    for nazwa, czas in benchmarkPrzebiegow(10**5 if szybki else 10**6).items():
+        metryki['przebiegi.{} [s]'.format(nazwa)] = czas
+    for tryb, wydajnosc in benchmarkWspolbieznosci(16 if szybki else 64).items():
+        metryki['wspolbieznosc.{} [zad/s]'.format(tryb)] = wydajnosc
+    for okno, raport in benchmarkSerwisu(500 if szybki else 2000).items():
+        nazwa = 'serwis.okno{:g}ms'.format(1.0E3*okno)
+        metryki[nazwa + ' [zap/s]'] = raport['przepustowosc']
+        metryki[nazwa + '.p50 [s]'] = raport['p50']
+        metryki[nazwa + '.p99 [s]'] = raport['p99']
+    for model, bajty in benchmarkPamieciDipoli(10000 if szybki else 100000).items():
+        metryki['zadanie1.dipole.{} [B/dipol]'.format(model)] = bajty
+    return metryki
+
+# Jednostki metryk, dla których większa wartość oznacza lepszą wydajność
+JEDNOSTKI_WYDAJNOSCI = ('[pkt/s]', '[f/s]', '[zad/s]', '[zap/s]')
+
+def wersjaKodu():
+    'Skrót bieżącej rewizji git (z dopiskiem +zmiany przy niezatwierdzonych zmianach) lub None.'
+    katalog = os.path.dirname(os.path.abspath(__file__))
+    try:
+        rewizja = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=katalog,\
+            capture_output=True, text=True, check=True).stdout.strip()
+        zmiany = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=katalog,\
+            capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return rewizja + ('+zmiany' if zmiany else '')
+
+def zapiszHistorie(plik,metryki):
+    'Dopisuje do pliku historii (JSONL) wpis z metrykami, wersją kodu i opisem środowiska.'
+    wpis = {\
+        'czas': datetime.datetime.now().isoformat(timespec='seconds'),\
+        'wersja': wersjaKodu(),\
+        'python': platform.python_version(),\
+        'numpy': np.__version__,\
+        'platforma': platform.platform(),\
+        'rdzenie': multiprocessing.cpu_count(),\
+        'metryki': metryki}
+    with open(plik, 'a') as strumien:
+        strumien.write(json.dumps(wpis) + '\n')
+    return wpis
+
+def wczytajHistorie(plik):
+    'Zwraca listę wpisów z pliku historii (pusta lista, gdy plik nie istnieje).'
+    if not os.path.exists(plik):
+        return []
+    with open(plik) as strumien:
+        return [json.loads(linia) for linia in strumien if linia.strip()]
+
+def regresje(poprzednie,metryki,tolerancja=0.2):
+    """
+    Porównuje metryki z metrykami poprzedniego wpisu historii. Zwraca listę krotek
+    (nazwa, poprzednia wartość, bieżąca wartość) metryk pogorszonych względnie o więcej
+    niż tolerancja: wydajność (JEDNOSTKI_WYDAJNOSCI) spadła albo czas lub pamięć wzrosły.
+    """
+    pogorszone = []
+    for nazwa, wartosc in sorted(metryki.items()):
+        poprzednia = poprzednie.get(nazwa)
+        if not poprzednia or not wartosc:
+            continue
+        if nazwa.endswith(JEDNOSTKI_WYDAJNOSCI):
+            zmiana = poprzednia/wartosc - 1.0
+        else:
+            zmiana = wartosc/poprzednia - 1.0
+        if zmiana > tolerancja:
+            pogorszone.append((nazwa, poprzednia, wartosc))
+    return pogorszone
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description="Pomiary wydajności rozwiązań obu zadań.")
+    parser.add_argument('--historia', default='benchmarki.jsonl',\
+        help="plik historii (JSONL), do którego dopisywany jest bieżący pomiar")
+    parser.add_argument('--szybki', action='store_true', help="pomiń największe siatki i obwody")
+    parser.add_argument('--tolerancja', type=float, default=0.2,\
+        help="względne pogorszenie metryki zgłaszane jako regresja (domyślnie 0.2)")
+    parser.add_argument('--skalowanie', action='store_true',\
+        help="zmierz także skalowanie obliczeń z liczbą procesów")
+    argumenty = parser.parse_args()
+
+    historia = wczytajHistorie(argumenty.historia)
+    metryki = zestawBenchmarkow(argumenty.szybki)
+    for nazwa, wartosc in sorted(metryki.items()):
+        print("  {:45s} {:14.6g}".format(nazwa, wartosc))
+    zapiszHistorie(argumenty.historia, metryki)
+
+    if argumenty.skalowanie:
+        print("Skalowanie obliczeń wzoru promieniowania z liczbą procesów (zadanie 1):")
+        print("(liczba rdzeni: {})".format(multiprocessing.cpu_count()))
+        for liczbaProcesow, czas, przyspieszenie in benchmarkRownoleglosci():
+            print("  procesy: {:3d}   czas: {:8.3f} [s]   przyspieszenie: {:5.2f}x".format(\
+                liczbaProcesow, czas, przyspieszenie))
+
+    if historia:
+        print("Porównanie z wpisem z {} (wersja {}):".format(historia[-1]['czas'], historia[-1]['wersja']))
+        pogorszone = regresje(historia[-1]['metryki'], metryki, argumenty.tolerancja)
+        for nazwa, poprzednia, wartosc in pogorszone:
+            print("  REGRESJA {:45s} {:14.6g} -> {:14.6g}".format(nazwa, poprzednia, wartosc))
+        if pogorszone:
+            sys.exit(1)
+        print("  brak regresji")
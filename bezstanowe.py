@@ -0,0 +1,166 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Bezstanowe API obliczeń obu zadań, bezpieczne przy współbieżnym wywoływaniu.
+# Obwód (zadanie 1), linia i fala (zadanie 2) przekazywane są jako niezmienne krotki
+# z tablicami tylko do odczytu, a funkcje zwracają wyniki zamiast zapisywać je w obiektach,
+# więc wiele wątków lub zadań asyncio może jednocześnie liczyć na wspólnej geometrii.
+# Jądra NumPy zwalniają GIL podczas operacji na dużych tablicach, dlatego pula wątków
+# (Wykonawca) przyspiesza obliczenia na wielu rdzeniach bez kopiowania danych do procesów.
+# Przykład:
+#     obwod = bezstanowe.obwodDipoli(zadanie1.EmitujacyObwod())
+#     with bezstanowe.Wykonawca(4) as wykonawca:
+#         wzor = wykonawca.wzorPromieniowania(obwod, listaTheta, listaPhi, 1.0E4, f)
+#         Vne = wykonawca.odpowiedzLinii(geometria, fala, f).result()[0]
+#     wyniki = asyncio.run(wykonawca.poleEAsync(obwod, theta, phi, r, f))    # z pętli asyncio
+
+import asyncio
+import functools
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import zadanie1
+import zadanie2
+
+# Niezmienny opis obwodu zadania 1: długości dipoli [m], ich położenia w układzie polarnym
+# theta [rad], phi [rad], r [m] (theta opisuje zarazem orientację dipola) i prądy [A].
+ObwodDipoli = namedtuple('ObwodDipoli', 'dlugosci theta phi r prady')
+
+rozmiarPorcjiPunktow = zadanie1.Rozwiazanie.rozmiarPorcji        # liczba punktów obliczanych naraz
+
+def obwodDipoli(obwod):
+    """
+    Niezmienna kopia dipoli obwodu (ObwodDipoli) z obiektu EmitujacyObwod lub ZbiorDipoli.
+    Tryb siatkowania zależy od częstotliwości, więc dla takiego obwodu należy podać
+    siatkę dla wybranej częstotliwości (EmitujacyObwod.siatka). Funkcje modułu liczą pole
+    w modelu 'biegunowym' obwodu.
+    """
+    if isinstance(obwod, zadanie1.EmitujacyObwod):
+        if obwod.model != 'biegunowy':
+            raise Exception("Obliczenia bezstanowe obsługują tylko model biegunowy obwodu!")
+        if obwod.siatkowanie:
+            raise Exception("Obwód w trybie siatkowania - podaj siatkę dipoli (EmitujacyObwod.siatka)!")
+        obwod = obwod.dipole
+    return ObwodDipoli(\
+        dlugosci = zadanie2.tablicaTylkoDoOdczytu(obwod.dlugosci, np.float64),\
+        theta = zadanie2.tablicaTylkoDoOdczytu(obwod.theta, np.float64),\
+        phi = zadanie2.tablicaTylkoDoOdczytu(obwod.phi, np.float64),\
+        r = zadanie2.tablicaTylkoDoOdczytu(obwod.r, np.float64),\
+        prady = zadanie2.tablicaTylkoDoOdczytu(obwod.prady, np.complex128))
+
+def poleE(obwod,theta,phi,r,f):
+    """
+    Bezstanowa wersja EmitujacyObwod.poleE dla obwodu ObwodDipoli: zespolony tensor pola E
+    o kształcie wspólnym dla theta, phi, r rozszerzonym o oś częstotliwości f.
+    Współczynniki dipoli liczone są na bieżąco (bez pamięci współczynników obwodu),
+    a dipole sumowane porcjami jak w ZbiorDipoli.poleE.
+    """
+    rozmiarPorcjiDipoli = zadanie1.ZbiorDipoli.rozmiarPorcjiDla(np.broadcast(theta, phi, r).size, np.size(f))
+    wynik = 0.0
+    for poczatek in range(0, max(obwod.dlugosci.size, 1), rozmiarPorcjiDipoli):
+        porcja = slice(poczatek, poczatek + rozmiarPorcjiDipoli)
+        wynik = wynik + zadanie1.poleEDipoli(f,obwod.dlugosci[porcja],obwod.theta[porcja],\
+            obwod.r[porcja],obwod.prady[porcja],theta,phi,r)
+    return wynik
+
+def porcjePunktow(listaTheta,listaPhi):
+    """
+    Dzieli siatkę theta x phi na porcje po rozmiarPorcjiPunktow punktów (theta zewnętrznie,
+    phi wewnętrznie, jak w Rozwiazanie.porcje). Zwraca listę krotek (wycinek, theta, phi).
+    """
+    listaTheta = np.asarray(listaTheta, dtype=float)        # [rad]
+    listaPhi = np.asarray(listaPhi, dtype=float)            # [rad]
+    liczbaPunktow = listaTheta.size * listaPhi.size
+    porcje = []
+    for poczatek in range(0, liczbaPunktow, rozmiarPorcjiPunktow):
+        indeksy = np.arange(poczatek, min(poczatek + rozmiarPorcjiPunktow, liczbaPunktow))
+        indeksyTheta, indeksyPhi = np.unravel_index(indeksy, (listaTheta.size, listaPhi.size))
+        porcje.append((slice(indeksy[0], indeksy[-1] + 1), listaTheta[indeksyTheta], listaPhi[indeksyPhi]))
+    return porcje
+
+def wzorPromieniowania(obwod,listaTheta,listaPhi,r,f):
+    """
+    Bezstanowa wersja Rozwiazanie.wzorPromieniowania: pełny wzór promieniowania obwodu
+    ObwodDipoli na siatce theta x phi x f w odległości r [m]. Zwraca nową zespoloną
+    tablicę o kształcie (theta, phi, f).
+    """
+    f = np.asarray(f, dtype=float).ravel()                    # [Hz]
+    wynik = np.empty((np.size(listaTheta), np.size(listaPhi), f.size), dtype=complex)
+    punkty = wynik.reshape(-1, f.size)                        # widok, bez kopiowania
+    for wycinek, theta, phi in porcjePunktow(listaTheta,listaPhi):
+        punkty[wycinek] = poleE(obwod,theta,phi,r,f)
+    return wynik
+
+def odpowiedzLinii(geometria,fala,f,model='skupiony'):
+    """
+    Bezstanowa odpowiedź linii zadania 2 (zadanie2.GeometriaLinii, np. LiniaTEM.geometria())
+    na falę zadanie2.WektoryFali dla tablicy częstotliwości f, w modelu 'skupiony' lub 'mtl'.
+    Zwraca krotkę (Vne, Vfe, V, I) jak Rozwiazanie.odpowiedz.
+    """
+    if model == 'mtl':
+        return zadanie2.odpowiedzLiniiDlugiej(geometria,fala,f)
+    if model != 'skupiony':
+        raise Exception("Nieznany model linii: " + str(model))
+    return zadanie2.odpowiedzLiniiSkupionej(geometria,fala,f)
+
+class Wykonawca:
+    """
+    Pula wątków wykonująca bezstanowe funkcje modułu. Metody poleE i odpowiedzLinii
+    zwracają obiekty concurrent.futures.Future, wzorPromieniowania rozdziela porcje siatki
+    między wątki i zwraca gotową tablicę, a metody *Async oczekują na wynik w pętli asyncio
+    (loop.run_in_executor), nie blokując jej na czas obliczeń.
+    """
+
+    def __init__(self,liczbaWatkow=None):
+        'Utworzenie puli liczbaWatkow wątków (domyślnie po jednym na rdzeń).'
+        self.liczbaWatkow = liczbaWatkow or os.cpu_count() or 1
+        self.pula = ThreadPoolExecutor(self.liczbaWatkow)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *wyjatek):
+        self.zamknij()
+        return False
+
+    def zamknij(self):
+        'Czeka na zakończenie zleconych obliczeń i zamyka pulę.'
+        self.pula.shutdown(wait=True)
+
+    def poleE(self,obwod,theta,phi,r,f):
+        'Zleca obliczenie poleE (patrz funkcja modułu); zwraca Future.'
+        return self.pula.submit(poleE,obwod,theta,phi,r,f)
+
+    def odpowiedzLinii(self,geometria,fala,f,model='skupiony'):
+        'Zleca obliczenie odpowiedzLinii (patrz funkcja modułu); zwraca Future.'
+        return self.pula.submit(odpowiedzLinii,geometria,fala,f,model)
+
+    def wzorPromieniowania(self,obwod,listaTheta,listaPhi,r,f):
+        'Wzór promieniowania (patrz funkcja modułu) liczony porcjami punktów równolegle w puli.'
+        f = np.asarray(f, dtype=float).ravel()                # [Hz]
+        wynik = np.empty((np.size(listaTheta), np.size(listaPhi), f.size), dtype=complex)
+        punkty = wynik.reshape(-1, f.size)
+        zlecenia = [(wycinek, self.pula.submit(poleE,obwod,theta,phi,r,f))\
+            for wycinek, theta, phi in porcjePunktow(listaTheta,listaPhi)]
+        for wycinek, zlecenie in zlecenia:
+            punkty[wycinek] = zlecenie.result()
+        return wynik
+
+    async def _wykonajAsync(self,funkcja,*argumenty):
+        petla = asyncio.get_running_loop()
+        return await petla.run_in_executor(self.pula, functools.partial(funkcja, *argumenty))
+
+    async def poleEAsync(self,obwod,theta,phi,r,f):
+        'Oczekuje w pętli asyncio na wynik poleE liczony w puli wątków.'
+        return await self._wykonajAsync(poleE,obwod,theta,phi,r,f)
+
+    async def wzorPromieniowaniaAsync(self,obwod,listaTheta,listaPhi,r,f):
+        'Oczekuje w pętli asyncio na wzór promieniowania liczony w puli wątków.'
+        return await self._wykonajAsync(wzorPromieniowania,obwod,listaTheta,listaPhi,r,f)
+
+    async def odpowiedzLiniiAsync(self,geometria,fala,f,model='skupiony'):
+        'Oczekuje w pętli asyncio na wynik odpowiedzLinii liczony w puli wątków.'
+        return await self._wykonajAsync(odpowiedzLinii,geometria,fala,f,model)
@@ -0,0 +1,126 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Czytnik plików wejściowych NEC (np. Z1.nec) opisujących geometrię przewodów.
+# Obsługiwane karty:
+#   GW - prosty przewód (tag, liczba segmentów, x1 y1 z1, x2 y2 z2, promień),
+#   GS - skalowanie wszystkich współrzędnych,
+#   EX - pobudzenie,
+#   FR - lista częstotliwości,
+#   RP - specyfikacja wzoru promieniowania.
+# Pozostałe karty (CM, CE, GE, XQ, EN, ...) są pomijane.
+
+from math import pi
+
+import numpy as np
+
+class TaliaNEC:
+    """
+    Zawartość wczytanego pliku NEC: geometria przewodów, pobudzenia, częstotliwości
+    i specyfikacja wzoru promieniowania. Współrzędne przewodów przechowywane są
+    w tablicach NumPy o kształcie (liczba przewodów, 3).
+    """
+
+    def __init__(self):
+        'Utworzenie pustej talii NEC.'
+        self.tagi = np.zeros(0, dtype=int)                    # numery (tagi) przewodów
+        self.liczbySegmentow = np.zeros(0, dtype=int)        # liczba segmentów każdego przewodu
+        self.poczatki = np.zeros((0, 3))                    # [m] początki przewodów
+        self.konce = np.zeros((0, 3))                        # [m] końce przewodów
+        self.promienie = np.zeros(0)                        # [m] promienie przewodów
+        self.pobudzenia = []                                # lista krotek (typ, tag, segment, wartość zespolona)
+        self.f = np.zeros(0)                                # [Hz] częstotliwości z kart FR
+        self.theta = np.zeros(0)                            # [rad] kąty theta (od osi z) z karty RP
+        self.phi = np.zeros(0)                                # [rad] kąty phi (od osi x) z karty RP
+        self.r = None                                        # [m] odległość z karty RP (None - brak)
+        self.komentarze = []                                # treść kart CM
+
+    def segmenty(self):
+        """
+        Dzieli przewody na segmenty zgodnie z liczbą segmentów z kart GW.
+        Zwraca krotkę (srodki, kierunki, dlugosci): środki segmentów (S,3) [m],
+        wektory jednostkowe kierunku przepływu prądu (S,3) i długości segmentów (S,) [m].
+        """
+        return podzielOdcinki(self.poczatki,self.konce,self.liczbySegmentow)
+
+def podzielOdcinki(poczatki,konce,liczbyCzesci):
+    """
+    Dzieli każdy odcinek (poczatki[i], konce[i]) na liczbyCzesci[i] równych części.
+    Zwraca krotkę (srodki, kierunki, dlugosci): środki części (S,3) [m],
+    wektory jednostkowe kierunku odcinków (S,3) i długości części (S,) [m].
+    """
+    wektory = konce - poczatki
+    dlugosciOdcinkow = np.sqrt((wektory**2).sum(axis=1))
+    indeksy = np.repeat(np.arange(len(wektory)), liczbyCzesci)
+    numery = np.arange(indeksy.size) - np.repeat(np.cumsum(liczbyCzesci) - liczbyCzesci, liczbyCzesci)
+    ulamki = (numery + 0.5) / liczbyCzesci[indeksy]
+    srodki = poczatki[indeksy] + ulamki[:, np.newaxis] * wektory[indeksy]
+    kierunki = (wektory / dlugosciOdcinkow[:, np.newaxis])[indeksy]
+    dlugosci = (dlugosciOdcinkow / liczbyCzesci)[indeksy]
+    return srodki, kierunki, dlugosci
+
+def _pola(linia):
+    'Dzieli kartę NEC na nazwę i listę pól (separatorami mogą być spacje, tabulatory i przecinki).'
+    pola = linia.replace(',', ' ').split()
+    return pola[0].upper(), pola[1:]
+
+def wczytajNEC(plik):
+    """
+    Wczytuje plik NEC (ścieżkę lub otwarty plik tekstowy) w jednym przebiegu i zwraca TaliaNEC.
+    Karty GW są zbierane do list i zamieniane na tablice dopiero na końcu,
+    więc koszt rośnie liniowo z liczbą przewodów.
+    """
+    if isinstance(plik, str):
+        with open(plik) as strumien:
+            return wczytajNEC(strumien)
+
+    talia = TaliaNEC()
+    gw = []                        # wiersze kart GW: tag, segmenty, x1, y1, z1, x2, y2, z2, promień
+    f = []                        # [Hz]
+    skala = 1.0
+
+    for linia in plik:
+        if not linia.strip():
+            continue
+        karta, pola = _pola(linia)
+        if karta == 'CM':
+            talia.komentarze.append(linia.strip()[2:].strip())
+        elif karta == 'GW':
+            if len(pola) < 9:
+                raise Exception("Niepełna karta GW: " + linia.strip())
+            gw.append(pola[:9])
+        elif karta == 'GS':
+            skala *= float(pola[2])
+        elif karta == 'EX':
+            talia.pobudzenia.append((\
+                int(pola[0]),\
+                int(pola[1]),\
+                int(pola[2]),\
+                complex(float(pola[4]), float(pola[5]) if len(pola) > 5 else 0.0)))
+        elif karta == 'FR':
+            # FR IFRQ NFRQ - - FMHZ DELFRQ; IFRQ = 0 krok liniowy, 1 krok logarytmiczny
+            krok = float(pola[5]) if len(pola) > 5 else 0.0
+            numery = np.arange(max(int(pola[1]), 1))
+            if int(pola[0]) == 1:
+                f.extend(float(pola[4]) * krok**numery * 1.0E6)
+            else:
+                f.extend((float(pola[4]) + krok*numery) * 1.0E6)
+        elif karta == 'RP':
+            # RP I0 NTH NPH XNDA THETS PHIS DTH DPH RFLD
+            thetaStart, phiStart, dTheta, dPhi = (float(x) for x in pola[4:8])
+            talia.theta = (pi/180.0) * (thetaStart + dTheta*np.arange(max(int(pola[1]), 1)))
+            talia.phi = (pi/180.0) * (phiStart + dPhi*np.arange(max(int(pola[2]), 1)))
+            if len(pola) > 8 and float(pola[8]) > 0.0:
+                talia.r = float(pola[8])
+        elif karta in ('EN',):
+            break
+
+    if gw:
+        gw = np.array(gw, dtype=float)
+        talia.tagi = gw[:, 0].astype(int)
+        talia.liczbySegmentow = np.maximum(gw[:, 1].astype(int), 1)
+        talia.poczatki = gw[:, 2:5] * skala
+        talia.konce = gw[:, 5:8] * skala
+        talia.promienie = gw[:, 8] * skala
+    talia.f = np.array(f)
+    return talia
@@ -0,0 +1,241 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Opcjonalne pomiary etapów obliczeń obu zadań (czas, liczba wywołań, liczba punktów
+# i częstotliwości, alokacje pamięci). Domyślnie wyłączone: etap() zwraca wtedy wspólny,
+# pusty menedżer kontekstu, a mierz() tylko sprawdza jedną zmienną globalną.
+# Przykład:
+#     with instrumentacja.Instrumentacja(sledzAlokacje=True) as pomiar:
+#         zadanie1.Rozwiazanie(r=1.0E4).poleE()
+#     pomiar.zapiszJSON('pomiar.json')        # raport etapów
+#     pomiar.zapiszPstats('pomiar.prof')        # do przeglądania przez pstats / snakeviz
+# Pomiary obejmują tylko bieżący proces (procesy robocze puli nie są mierzone). Etapy mierzone są
+# we wszystkich wątkach, każdy wątek ma własny stos etapów (wywołujący i czas własny dotyczą
+# etapów tego samego wątku); alokacje pamięci (tracemalloc działa na cały proces) śledzone są
+# tylko w wątku, który włączył pomiary.
+
+import cProfile
+import functools
+import json
+import marshal
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+_aktywna = None            # bieżąca Instrumentacja (None - pomiary wyłączone)
+
+class _PustyEtap:
+    'Menedżer kontekstu nic nie robiący, zwracany przez etap() przy wyłączonych pomiarach.'
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *wyjatek):
+        return False
+
+_PUSTY_ETAP = _PustyEtap()
+
+def wlaczona():
+    'Czy pomiary są włączone.'
+    return _aktywna is not None
+
+def etap(nazwa,punkty=0,czestotliwosci=0):
+    """
+    Menedżer kontekstu mierzący etap obliczeń o zadanej nazwie, w którym obliczane są
+    wartości w zadanej liczbie punktów i częstotliwości. Przy wyłączonych pomiarach nic nie robi.
+    """
+    if _aktywna is None:
+        return _PUSTY_ETAP
+    return _aktywna.etap(nazwa,punkty,czestotliwosci)
+
+def mierz(nazwa):
+    'Dekorator mierzący każde wywołanie funkcji jako etap o zadanej nazwie.'
+    def dekorator(funkcja):
+        @functools.wraps(funkcja)
+        def mierzona(*argumenty, **nazwane):
+            if _aktywna is None:
+                return funkcja(*argumenty, **nazwane)
+            with _aktywna.etap(nazwa):
+                return funkcja(*argumenty, **nazwane)
+        return mierzona
+    return dekorator
+
+class Instrumentacja:
+    """
+    Zbiór pomiarów etapów obliczeń. Włączany metodą wlacz() lub blokiem with.
+    Dla każdego etapu zbierane są: łączny czas [s], czas własny (bez etapów zagnieżdżonych) [s],
+    liczba wywołań, liczba punktów i częstotliwości, a przy sledzAlokacje także przyrost
+    zaalokowanej pamięci i szczytowa pamięć ponad stan z początku etapu [B] (tracemalloc).
+    """
+
+    def __init__(self,sledzAlokacje=False):
+        'Utworzenie pustego zbioru pomiarów.'
+        self.sledzAlokacje = sledzAlokacje
+        self.etapy = {}                # nazwa -> słownik statystyk etapu
+        self._watki = threading.local()    # stos otwartych etapów każdego wątku (patrz _stos)
+        self._blokada = threading.Lock()    # chroni statystyki etapów przy pomiarach z wielu wątków
+        self._watekAlokacji = None    # identyfikator wątku, w którym śledzone są alokacje
+        self._uruchomionoTracemalloc = False
+        self._poprzednia = None
+
+    def wlacz(self):
+        'Włącza pomiary (zastępując bieżącą instrumentację, przywracaną przez wylacz).'
+        global _aktywna
+        self._poprzednia = _aktywna
+        self._watekAlokacji = threading.get_ident()
+        if self.sledzAlokacje and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._uruchomionoTracemalloc = True
+        _aktywna = self
+        return self
+
+    def wylacz(self):
+        'Wyłącza pomiary.'
+        global _aktywna
+        _aktywna = self._poprzednia
+        if self._uruchomionoTracemalloc:
+            tracemalloc.stop()
+            self._uruchomionoTracemalloc = False
+        return self
+
+    def __enter__(self):
+        return self.wlacz()
+
+    def __exit__(self, *wyjatek):
+        self.wylacz()
+        return False
+
+    @property
+    def _stos(self):
+        'Otwarte etapy bieżącego wątku: [nazwa, czas startu, czas dzieci, pamięć, szczyt].'
+        stos = getattr(self._watki, 'stos', None)
+        if stos is None:
+            stos = self._watki.stos = []
+        return stos
+
+    def _statystyki(self,nazwa):
+        if nazwa not in self.etapy:
+            self.etapy[nazwa] = {\
+                'wywolania': 0, 'czas': 0.0, 'czasWlasny': 0.0,\
+                'punkty': 0, 'czestotliwosci': 0,\
+                'alokacje': 0, 'pamiecSzczytowa': 0,\
+                'wywolujacy': {}}
+        return self.etapy[nazwa]
+
+    @contextmanager
+    def etap(self,nazwa,punkty=0,czestotliwosci=0):
+        'Mierzy etap obliczeń (patrz etap na poziomie modułu).'
+        stos = self._stos
+        alokacje = self.sledzAlokacje and tracemalloc.is_tracing() and threading.get_ident() == self._watekAlokacji
+        pamiec = szczyt = 0
+        if alokacje:
+            pamiec, szczyt = tracemalloc.get_traced_memory()
+            if stos:
+                # szczyt etapu nadrzędnego sprzed zerowania licznika szczytu
+                stos[-1][4] = max(stos[-1][4], szczyt)
+            tracemalloc.reset_peak()
+        wpis = [nazwa, time.perf_counter(), 0.0, pamiec, 0]
+        stos.append(wpis)
+        try:
+            yield
+        finally:
+            czas = time.perf_counter() - wpis[1]
+            stos.pop()
+            if alokacje:
+                biezaca, szczyt = tracemalloc.get_traced_memory()
+                szczyt = max(szczyt, wpis[4])
+                if stos:
+                    stos[-1][4] = max(stos[-1][4], szczyt)
+            wywolujacy = stos[-1][0] if stos else None
+            if stos:
+                stos[-1][2] += czas
+            with self._blokada:
+                statystyki = self._statystyki(nazwa)
+                statystyki['wywolania'] += 1
+                statystyki['czas'] += czas
+                statystyki['czasWlasny'] += czas - wpis[2]
+                statystyki['punkty'] += punkty
+                statystyki['czestotliwosci'] += czestotliwosci
+                if alokacje:
+                    statystyki['alokacje'] += biezaca - pamiec
+                    statystyki['pamiecSzczytowa'] = max(statystyki['pamiecSzczytowa'], szczyt - pamiec)
+                poprzednie = statystyki['wywolujacy'].get(wywolujacy, (0, 0.0))
+                statystyki['wywolujacy'][wywolujacy] = (poprzednie[0] + 1, poprzednie[1] + czas)
+
+    def raport(self):
+        """
+        Zwraca słownik statystyk etapów (nazwa -> statystyki) nadający się do zapisu w JSON,
+        uzupełniony o liczbę punktów i częstotliwości na sekundę.
+        """
+        raport = {}
+        with self._blokada:
+            etapy = [(nazwa, dict(statystyki, wywolujacy=dict(statystyki['wywolujacy'])))\
+                for nazwa, statystyki in self.etapy.items()]
+        for nazwa, statystyki in etapy:
+            wpis = dict(statystyki)
+            wpis['wywolujacy'] = dict((str(wywolujacy), liczba)\
+                for wywolujacy, (liczba, czas) in statystyki['wywolujacy'].items())
+            if statystyki['czas'] > 0.0:
+                wpis['punktyNaSekunde'] = statystyki['punkty']/statystyki['czas']
+                wpis['czestotliwosciNaSekunde'] = statystyki['czestotliwosci']/statystyki['czas']
+            raport[nazwa] = wpis
+        return raport
+
+    def zapiszJSON(self,plik):
+        'Zapisuje raport etapów do pliku JSON.'
+        with open(plik, 'w') as strumien:
+            json.dump(self.raport(), strumien, indent=1, sort_keys=True)
+
+    def zapiszPstats(self,plik):
+        """
+        Zapisuje pomiary etapów w formacie zrzutu cProfile, czytelnym dla pstats.Stats(plik)
+        i narzędzi graficznych; etapy występują w nim jako funkcje ('<etap>', 0, nazwa).
+        """
+        def klucz(nazwa):
+            return ('<etap>', 0, nazwa)
+        statystyki = {}
+        for nazwa, etap in self.etapy.items():
+            wywolujacy = dict((klucz(nadrzedny), (liczba, liczba, 0.0, czas))\
+                for nadrzedny, (liczba, czas) in etap['wywolujacy'].items() if nadrzedny is not None)
+            statystyki[klucz(nazwa)] = (etap['wywolania'], etap['wywolania'],\
+                etap['czasWlasny'], etap['czas'], wywolujacy)
+        with open(plik, 'wb') as strumien:
+            marshal.dump(statystyki, strumien)
+
+    def wyczysc(self):
+        'Usuwa zebrane pomiary.'
+        with self._blokada:
+            self.etapy = {}
+
+@contextmanager
+def profiluj(plik):
+    'Profiluje blok kodu modułem cProfile i zapisuje wynik do pliku (format pstats).'
+    profil = cProfile.Profile()
+    profil.enable()
+    try:
+        yield profil
+    finally:
+        profil.disable()
+        profil.dump_stats(plik)
+
+def uruchom(funkcja,plikPomiarow=None,plikProfilu=None):
+    """
+    Wykonuje funkcję bez argumentów, zapisując pomiary etapów do plikPomiarow
+    (JSON, a dla rozszerzenia .prof zrzut w formacie pstats) i profil cProfile do plikProfilu.
+    Bez plików funkcja wykonywana jest bez pomiarów. Zwraca wynik funkcji.
+    """
+    if plikProfilu is not None:
+        with profiluj(plikProfilu):
+            return uruchom(funkcja,plikPomiarow)
+    if plikPomiarow is None:
+        return funkcja()
+    with Instrumentacja(sledzAlokacje=True) as pomiar:
+        wynik = funkcja()
+    if plikPomiarow.endswith('.prof'):
+        pomiar.zapiszPstats(plikPomiarow)
+    else:
+        pomiar.zapiszJSON(plikPomiarow)
+    return wynik
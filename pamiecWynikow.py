@@ -0,0 +1,174 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Trwała, adresowana treścią pamięć wyników obliczeń na dysku.
+# Kluczem wyniku jest skrót (wyniki.skrot) geometrii, stałych, pobudzenia i specyfikacji siatki,
+# więc identyczne zadania z kolejnych uruchomień odczytywane są z dysku zamiast liczone od nowa.
+
+import fcntl
+import json
+import os
+import time
+import uuid
+from contextlib import contextmanager
+
+from wyniki import WynikObliczen
+
+class PamiecWynikow:
+    """
+    Katalog z wynikami (wyniki.WynikObliczen zapisanymi jako <klucz>.npy + <klucz>.npy.json)
+    o ograniczonym łącznym rozmiarze. Po przekroczeniu rozmiarMaksymalny usuwane są wyniki
+    najdawniej używane (czas modyfikacji pliku jest odświeżany przy każdym trafieniu).
+    Zapis jest atomowy (plik tymczasowy + os.replace), a liczniki i usuwanie chronione są
+    blokadą pliku, więc z jednej pamięci może korzystać jednocześnie wiele procesów.
+    Pliki tymczasowe przerwanych zapisów starsze niż wiekPlikowTymczasowych usuwa usunNadmiar.
+    """
+
+    PLIK_BLOKADY = '.blokada'
+    PLIK_STATYSTYK = 'statystyki.json'
+    wiekPlikowTymczasowych = 3600.0        # [s] wiek, po którym plik tymczasowy uznawany jest za porzucony
+
+    def __init__(self,katalog,rozmiarMaksymalny=1024**3):
+        'Otwiera (tworząc w razie potrzeby) pamięć wyników w katalogu; rozmiar maksymalny w bajtach.'
+        self.katalog = katalog
+        self.rozmiarMaksymalny = rozmiarMaksymalny
+        os.makedirs(katalog, exist_ok=True)
+
+    def _sciezka(self,klucz):
+        return os.path.join(self.katalog, klucz + '.npy')
+
+    @staticmethod
+    def _usun(*pliki):
+        'Usuwa pliki, pomijając te, których już nie ma.'
+        for plik in pliki:
+            try:
+                os.remove(plik)
+            except OSError:
+                pass
+
+    @contextmanager
+    def _blokada(self):
+        'Wyłączna blokada pamięci między procesami.'
+        with open(os.path.join(self.katalog, self.PLIK_BLOKADY), 'a') as plik:
+            fcntl.flock(plik, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(plik, fcntl.LOCK_UN)
+
+    def _zliczaj(self,nazwa):
+        'Zwiększa trwały licznik (trafienia/chybienia) o jeden.'
+        with self._blokada():
+            statystyki = self._wczytajStatystyki()
+            statystyki[nazwa] = statystyki.get(nazwa, 0) + 1
+            sciezka = os.path.join(self.katalog, self.PLIK_STATYSTYK)
+            with open(sciezka + '.tmp', 'w') as plik:
+                json.dump(statystyki, plik)
+            os.replace(sciezka + '.tmp', sciezka)
+
+    def _wczytajStatystyki(self):
+        try:
+            with open(os.path.join(self.katalog, self.PLIK_STATYSTYK)) as plik:
+                return json.load(plik)
+        except (IOError, ValueError):
+            return {}
+
+    def pobierz(self,klucz):
+        'Zwraca zapamiętany wynik (odwzorowany w pamięci, tylko do odczytu) lub None.'
+        sciezka = self._sciezka(klucz)
+        try:
+            wynik = WynikObliczen.wczytaj(sciezka)
+            os.utime(sciezka)
+        except (IOError, OSError, ValueError):
+            self._zliczaj('chybienia')
+            return None
+        self._zliczaj('trafienia')
+        return wynik
+
+    def zapisz(self,klucz,wynik):
+        'Zapisuje wynik pod kluczem (atomowo) i usuwa najdawniej używane wyniki ponad limit rozmiaru.'
+        sciezka = self._sciezka(klucz)
+        tymczasowa = os.path.join(self.katalog, '.{}.{}.npy'.format(klucz, uuid.uuid4().hex))
+        try:
+            wynik.zapisz(tymczasowa)
+            # najpierw metadane, potem dane - czytelnik widzący plik .npy zawsze znajdzie jego opis
+            os.replace(tymczasowa + '.json', sciezka + '.json')
+            os.replace(tymczasowa, sciezka)
+        finally:
+            # po udanym zapisie plików tymczasowych już nie ma, po nieudanym nie zostają w katalogu
+            self._usun(tymczasowa, tymczasowa + '.json')
+        self.usunNadmiar()
+
+    def oblicz(self,klucz,funkcja):
+        'Zwraca wynik spod klucza, a w razie braku oblicza go funkcją bez argumentów i zapamiętuje.'
+        wynik = self.pobierz(klucz)
+        if wynik is None:
+            wynik = funkcja()
+            self.zapisz(klucz, wynik)
+        return wynik
+
+    def _wpisy(self):
+        'Lista krotek (czas użycia, rozmiar [B], ścieżka .npy) zapamiętanych wyników.'
+        wpisy = []
+        for nazwa in os.listdir(self.katalog):
+            if nazwa.startswith('.') or not nazwa.endswith('.npy'):
+                continue
+            sciezka = os.path.join(self.katalog, nazwa)
+            try:
+                stan = os.stat(sciezka)
+                rozmiar = stan.st_size + os.path.getsize(sciezka + '.json')
+            except OSError:
+                continue
+            wpisy.append((stan.st_mtime, rozmiar, sciezka))
+        return wpisy
+
+    def _plikiTymczasowe(self,wiek=0.0):
+        'Lista ścieżek plików tymczasowych zapisu (.<klucz>.<uuid>.npy[.json]) starszych niż wiek [s].'
+        granica = time.time() - wiek
+        pliki = []
+        for nazwa in os.listdir(self.katalog):
+            if not nazwa.startswith('.') or nazwa == self.PLIK_BLOKADY:
+                continue
+            sciezka = os.path.join(self.katalog, nazwa)
+            try:
+                if os.stat(sciezka).st_mtime < granica:
+                    pliki.append(sciezka)
+            except OSError:
+                continue
+        return pliki
+
+    def usunNadmiar(self):
+        """
+        Usuwa porzucone pliki tymczasowe (starsze niż wiekPlikowTymczasowych) oraz najdawniej
+        używane wyniki, dopóki łączny rozmiar przekracza rozmiarMaksymalny.
+        """
+        with self._blokada():
+            self._usun(*self._plikiTymczasowe(self.wiekPlikowTymczasowych))
+            wpisy = sorted(self._wpisy())
+            rozmiar = sum(wpis[1] for wpis in wpisy)
+            for czas, rozmiarWpisu, sciezka in wpisy:
+                if rozmiar <= self.rozmiarMaksymalny:
+                    break
+                self._usun(sciezka, sciezka + '.json')
+                rozmiar -= rozmiarWpisu
+
+    def statystyki(self):
+        'Zwraca słownik z trwałymi licznikami trafień i chybień, skutecznością i rozmiarem pamięci.'
+        statystyki = self._wczytajStatystyki()
+        trafienia = statystyki.get('trafienia', 0)
+        chybienia = statystyki.get('chybienia', 0)
+        wpisy = self._wpisy()
+        return {\
+            'trafienia': trafienia,\
+            'chybienia': chybienia,\
+            'skutecznosc': trafienia/(trafienia + chybienia) if trafienia + chybienia else 0.0,\
+            'wyniki': len(wpisy),\
+            'rozmiar': sum(wpis[1] for wpis in wpisy),\
+            'rozmiarMaksymalny': self.rozmiarMaksymalny}
+
+    def wyczysc(self):
+        'Usuwa wszystkie wyniki i zeruje liczniki.'
+        with self._blokada():
+            for czas, rozmiar, sciezka in self._wpisy():
+                self._usun(sciezka, sciezka + '.json')
+            self._usun(os.path.join(self.katalog, self.PLIK_STATYSTYK))
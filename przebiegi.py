@@ -0,0 +1,70 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Obliczenia w dziedzinie czasu dla obu zadań: przebieg czasowy pobudzenia (próbki co dt)
+# zamieniany jest na widmo transformatą rFFT, każdy prążek widma mnożony jest przez
+# transmitancję układu (wszystkie prążki naraz), a odpowiedź wraca do dziedziny czasu przez irFFT.
+# Przebiegi traktowane są jako okresowe (okres N*dt), więc rekord powinien być dłuższy
+# niż czas zanikania odpowiedzi.
+
+from math import exp
+
+import numpy as np
+
+def widmo(probki,dt):
+    """
+    Widmo jednostronne przebiegu zadanego próbkami (ostatnia oś) co dt [s].
+    Zwraca krotkę (f, X): częstotliwości prążków [Hz] i zespolone współczynniki rFFT.
+    """
+    probki = np.asarray(probki, dtype=float)
+    return np.fft.rfftfreq(probki.shape[-1], dt), np.fft.rfft(probki)
+
+def odpowiedzCzasowa(probki,dt,transmitancja):
+    """
+    Odpowiedź układu liniowego na przebieg zadany próbkami co dt [s].
+    transmitancja to funkcja tablicy częstotliwości f [Hz] (F,) zwracająca zespoloną
+    transmitancję o kształcie (..., F); wywoływana jest raz, dla wszystkich prążków naraz.
+    Zwraca rzeczywistą tablicę próbek odpowiedzi o kształcie (..., N).
+    """
+    probki = np.asarray(probki, dtype=float)
+    f, X = widmo(probki,dt)
+    return np.fft.irfft(transmitancja(f) * X, probki.shape[-1])
+
+def czasy(liczbaProbek,dt):
+    'Chwile czasowe kolejnych próbek [s].'
+    return dt * np.arange(liczbaProbek)
+
+def zegarTrapezowy(liczbaProbek,dt,okres,czasNarastania,czasOpadania=None,wypelnienie=0.5,amplituda=1.0):
+    """
+    Przebieg zegarowy o kształcie trapezu: okres, czasy narastania i opadania [s]
+    (czas opadania domyślnie równy czasowi narastania), wypełnienie mierzone w połowie
+    amplitudy. Zwraca tablicę liczbaProbek próbek co dt [s].
+    """
+    if czasOpadania is None:
+        czasOpadania = czasNarastania
+    if czasNarastania <= 0.0 or czasOpadania <= 0.0:
+        raise Exception("Czasy narastania i opadania zegara muszą być dodatnie!")
+    faza = np.mod(czasy(liczbaProbek,dt), okres)
+    gora = wypelnienie*okres - 0.5*(czasNarastania + czasOpadania)        # [s] czas trwania stanu wysokiego
+    if gora < 0.0 or gora + czasNarastania + czasOpadania > okres:
+        raise Exception("Czasy narastania i opadania nie mieszczą się w okresie zegara!")
+    przebieg = np.clip(faza/czasNarastania, 0.0, 1.0)
+    opadanie = faza - czasNarastania - gora
+    przebieg = np.where(opadanie > 0.0, np.clip(1.0 - opadanie/czasOpadania, 0.0, 1.0), przebieg)
+    return amplituda * przebieg
+
+def impulsESD(liczbaProbek,dt,szczyt=3.75,opoznienie=0.0):
+    """
+    Prąd wyładowania elektrostatycznego (suma dwóch funkcji Heidlera o parametrach
+    wg IEC 61000-4-2 dla 4 kV, przeskalowana do wartości szczytowej ok. szczyt [A];
+    domyślnie 3.75 A, czyli 1 kV), rozpoczynający się po czasie opoznienie [s].
+    Zwraca tablicę liczbaProbek próbek co dt [s].
+    """
+    t = np.maximum(czasy(liczbaProbek,dt) - opoznienie, 0.0)
+    prad = np.zeros_like(t)
+    # (I [A], tau1 [s], tau2 [s]) składowych dla 4 kV (szczyt ok. 15 A); n = 1.8
+    for I, tau1, tau2 in ((16.6, 1.1E-9, 2.0E-9), (9.3, 12.0E-9, 37.0E-9)):
+        korekta = exp(-(tau1/tau2) * (1.8*tau2/tau1)**(1.0/1.8))
+        x = (t/tau1)**1.8
+        prad += I/korekta * x/(1.0 + x) * np.exp(-t/tau2)
+    return szczyt/15.0 * prad
@@ -0,0 +1,132 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Zbiory punktów w przestrzeni przechowywane jako tablice NumPy, wspólne dla obu zadań.
+# Zamiast obiektów z pojedynczym punktem (UkladPolarny, UkladKartezjanski) N punktów trzymanych
+# jest w jednej tablicy (N, 3), a przeliczenia współrzędnych, wektory względne między M źródłami
+# i N obserwatorami oraz rzuty na wersory liczone są naraz dla wszystkich punktów.
+# Współrzędne sferyczne w konwencji fizycznej: theta od osi z, phi od osi x w płaszczyźnie XY.
+
+import numpy as np
+
+def kartezjanskie(theta,phi,r):
+    """
+    Przelicza współrzędne sferyczne theta [rad], phi [rad], r [m] (tablice rozgłaszane do wspólnego
+    kształtu P) na tablicę współrzędnych kartezjańskich o kształcie P + (3,) [m].
+    """
+    theta, phi, r = np.broadcast_arrays(\
+        np.asarray(theta, dtype=float), np.asarray(phi, dtype=float), np.asarray(r, dtype=float))
+    rzutXY = r*np.sin(theta)
+    return np.stack((rzutXY*np.cos(phi), rzutXY*np.sin(phi), r*np.cos(theta)), axis=-1)
+
+def sferyczne(xyz):
+    'Przelicza tablicę współrzędnych kartezjańskich (..., 3) [m] na krotkę (theta, phi, r) tablic (...).'
+    xyz = np.asarray(xyz, dtype=float)
+    x, y, z = xyz[..., 0], xyz[..., 1], xyz[..., 2]
+    r = np.sqrt(x*x + y*y + z*z)
+    return np.arctan2(np.hypot(x, y), z), np.arctan2(y, x), r
+
+def wersorySferyczne(theta,phi):
+    """
+    Wersory układu sferycznego (r, theta, phi) w punktach o kątach theta, phi [rad].
+    Zwraca krotkę trzech tablic o kształcie P + (3,).
+    """
+    theta, phi = np.broadcast_arrays(np.asarray(theta, dtype=float), np.asarray(phi, dtype=float))
+    sinTheta, cosTheta = np.sin(theta), np.cos(theta)
+    sinPhi, cosPhi = np.sin(phi), np.cos(phi)
+    wersorR = np.stack((sinTheta*cosPhi, sinTheta*sinPhi, cosTheta), axis=-1)
+    wersorTheta = np.stack((cosTheta*cosPhi, cosTheta*sinPhi, -sinTheta), axis=-1)
+    wersorPhi = np.stack((-sinPhi, cosPhi, np.zeros_like(phi)), axis=-1)
+    return wersorR, wersorTheta, wersorPhi
+
+def _tablica(punkty):
+    'Tablica (..., 3) współrzędnych zbioru punktów lub tablicy.'
+    if isinstance(punkty, ZbiorPunktow):
+        return punkty.xyz
+    return np.asarray(punkty, dtype=float)
+
+def wektoryWzgledne(zrodla,obserwatory):
+    """
+    Wektory od M źródeł do N obserwatorów (ZbiorPunktow lub tablice (M, 3) i (N, 3)) [m].
+    Zwraca tablicę o kształcie (N, M, 3): obserwatory w pierwszej osi, źródła w drugiej,
+    tak aby sumowanie wkładów źródeł odbywało się wzdłuż ostatniej osi wyniku skalarnego.
+    """
+    return _tablica(obserwatory)[:, np.newaxis, :] - _tablica(zrodla)[np.newaxis, :, :]
+
+def odleglosci(zrodla,obserwatory):
+    'Odległości (N, M) [m] od M źródeł do N obserwatorów (patrz wektoryWzgledne).'
+    wektory = wektoryWzgledne(zrodla,obserwatory)
+    return np.sqrt(rzut(wektory, wektory))
+
+def rzut(wektory,wersory):
+    """
+    Iloczyn skalarny wzdłuż ostatniej osi (o długości 3) tablic wektorów i wersorów
+    rozgłaszanych do wspólnego kształtu, np. rzut wektorów (N, M, 3) na wersory (M, 3).
+    """
+    wektory, wersory = _tablica(wektory), _tablica(wersory)
+    return np.einsum('...i,...i->...', *np.broadcast_arrays(wektory, wersory))
+
+class ZbiorPunktow:
+    """
+    Zbiór N punktów w przestrzeni przechowywany jako ciągła tablica xyz (N, 3) [m].
+    Zastępuje tablice obiektów UkladPolarny / UkladKartezjanski: przeliczenia współrzędnych
+    i odległości liczone są jednym wywołaniem NumPy dla całego zbioru.
+    """
+
+    __slots__ = ('xyz',)
+
+    def __init__(self,xyz):
+        'Utworzenie zbioru z tablicy współrzędnych kartezjańskich (..., 3), spłaszczanej do (N, 3).'
+        self.xyz = np.ascontiguousarray(np.reshape(np.asarray(xyz, dtype=float), (-1, 3)))    # [m]
+
+    @classmethod
+    def zKartezjanskich(cls,x,y,z):
+        'Tworzy zbiór ze współrzędnych x, y, z [m] (tablice rozgłaszane do wspólnego kształtu).'
+        return cls(np.stack(np.broadcast_arrays(\
+            np.asarray(x, dtype=float), np.asarray(y, dtype=float), np.asarray(z, dtype=float)), axis=-1))
+
+    @classmethod
+    def zeSferycznych(cls,theta,phi,r):
+        'Tworzy zbiór ze współrzędnych sferycznych theta, phi [rad], r [m] (patrz kartezjanskie).'
+        return cls(kartezjanskie(theta,phi,r))
+
+    def __len__(self):
+        return len(self.xyz)
+
+    def __getitem__(self,indeksy):
+        'Zwraca podzbiór punktów (wycinek lub tablica indeksów) jako nowy ZbiorPunktow.'
+        return ZbiorPunktow(self.xyz[indeksy])
+
+    @property
+    def nbytes(self):
+        'Rozmiar tablicy współrzędnych w bajtach.'
+        return self.xyz.nbytes
+
+    @property
+    def x(self):
+        return self.xyz[:, 0]
+
+    @property
+    def y(self):
+        return self.xyz[:, 1]
+
+    @property
+    def z(self):
+        return self.xyz[:, 2]
+
+    def sferyczne(self):
+        'Współrzędne sferyczne punktów: krotka (theta, phi, r) tablic (N,).'
+        return sferyczne(self.xyz)
+
+    def odleglosci(self):
+        'Odległości punktów od początku układu (N,) [m].'
+        return np.sqrt(rzut(self.xyz, self.xyz))
+
+    def wersory(self):
+        'Wersory kierunków punktów od początku układu (N, 3) (dla punktu w początku - wektor zerowy).'
+        odleglosci = self.odleglosci()
+        return self.xyz / np.where(odleglosci > 0.0, odleglosci, 1.0)[:, np.newaxis]
+
+    def przesuniete(self,wektor):
+        'Zwraca nowy zbiór przesunięty o wektor (3,) lub tablicę wektorów (N, 3) [m].'
+        return ZbiorPunktow(self.xyz + np.asarray(wektor, dtype=float))
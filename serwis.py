@@ -0,0 +1,501 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Lokalny serwis obliczeń obu zadań dla narzędzi stanowiska testowego. Długo działający proces
+# asyncio przyjmuje zapytania przez gniazdo uniksowe (lub TCP na localhost), a obliczenia
+# wykonuje w rozgrzanej puli procesów, w których geometrie (EmitujacyObwod, LiniaTEM) są
+# zbudowane raz, przy starcie. Drobne zapytania o tę samą geometrię, nadchodzące w oknie
+# oknoLaczenia, łączone są w jedną wektorową porcję obliczeń.
+#
+# Protokół: jeden obiekt JSON w wierszu w obie strony; odpowiedzi mogą przychodzić w innej
+# kolejności niż zapytania i są rozpoznawane po polu 'id'. Zapytania:
+#     {"id": 1, "zadanie": "pole", "theta": [...], "phi": 0.0, "r": 1.0E4, "f": [...],
+#      "geometria": "domyslna", "model": "biegunowy"}
+#         -> {"id": 1, "E": {"re": [...], "im": [...]}}    (kształt theta/phi rozszerzony o oś f)
+#     {"id": 2, "zadanie": "linia", "f": [...], "fala": {"k": [...], "E": [...], "H": [...]},
+#      "geometria": "domyslna", "model": "skupiony"}
+#         -> {"id": 2, "Vne": {"re": [...], "im": [...]}, "Vfe": {...}}
+#     {"id": 3, "zadanie": "metryki"} -> {"id": 3, "metryki": {...}}
+# Błędne zapytanie daje odpowiedź {"id": ..., "blad": "opis"}.
+# Przykład:
+#     python serwis.py serwuj --gniazdo /tmp/ke.sock --procesy 2 --nec Z1.nec
+#     python serwis.py obciazenie --gniazdo /tmp/ke.sock --zapytania 2000 --wspolbieznosc 64
+
+import argparse
+import asyncio
+import collections
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import bezstanowe
+import czytnikNEC
+import zadanie1
+import zadanie2
+
+limitWiersza = 1 << 28            # [B] maksymalna długość wiersza JSON zapytania lub odpowiedzi
+
+# Geometrie zbudowane w procesie roboczym puli (nazwa -> obiekt)
+_obwodyProcesu = None            # nazwa -> zadanie1.EmitujacyObwod
+_linieProcesu = None            # nazwa -> zadanie2.GeometriaLinii
+
+def nazwaGeometrii(plikNEC):
+    'Nazwa geometrii z pliku NEC w zapytaniach (nazwa pliku bez rozszerzenia).'
+    return os.path.splitext(os.path.basename(plikNEC))[0]
+
+async def czytajWiersz(czytnik):
+    """
+    Czyta jeden wiersz z czytnika asyncio. Zwraca b'' na końcu strumienia, a None dla wiersza
+    dłuższego niż limit czytnika - taki wiersz jest pomijany do końca, więc kolejne wiersze
+    połączenia czytane są dalej poprawnie.
+    """
+    try:
+        return await czytnik.readuntil(b'\n')
+    except asyncio.IncompleteReadError as blad:
+        return blad.partial
+    except asyncio.LimitOverrunError as blad:
+        pominiete = blad.consumed
+    while True:
+        try:
+            await czytnik.readexactly(pominiete)
+            await czytnik.readuntil(b'\n')
+            return None
+        except asyncio.IncompleteReadError:
+            return b''
+        except asyncio.LimitOverrunError as blad:
+            pominiete = blad.consumed
+
+def _inicjalizujProces(plikiNEC):
+    'Buduje w procesie roboczym obwody i linie, aby nie tworzyć ich przy każdym zapytaniu.'
+    global _obwodyProcesu, _linieProcesu
+    _obwodyProcesu = {'domyslna': zadanie1.EmitujacyObwod()}
+    for plik in plikiNEC:
+        _obwodyProcesu[nazwaGeometrii(plik)] = zadanie1.EmitujacyObwod.zTaliNEC(czytnikNEC.wczytajNEC(plik))
+    _linieProcesu = {'domyslna': zadanie2.LiniaTEM().geometria()}
+
+def _rozgrzej():
+    'Jednorazowe małe obliczenie rozgrzewające proces roboczy (importy, pamięci współczynników).'
+    for obwod in _obwodyProcesu.values():
+        obwod.poleE(0.0,0.0,1.0,obwod.f)
+    return os.getpid()
+
+def _polePorcji(geometria,model,r,theta,phi,f):
+    'Pole E porcji punktów (theta, phi) w odległości r dla częstotliwości f, w procesie roboczym.'
+    obwod = _obwodyProcesu[geometria]
+    obwod.model = model
+    return obwod.poleE(theta,phi,r,f)
+
+def _liniaPorcji(geometria,model,fala,f):
+    'Napięcia (Vne, Vfe) linii oświetlanej falą dla częstotliwości f, w procesie roboczym.'
+    return bezstanowe.odpowiedzLinii(_linieProcesu[geometria],fala,f,model)[:2]
+
+def _zespolone(tablica):
+    'Zespolona tablica jako słownik list części rzeczywistych i urojonych (do zapisu w JSON).'
+    return {'re': tablica.real.tolist(), 'im': tablica.imag.tolist()}
+
+class Serwis:
+    """
+    Serwis obliczeń z rozgrzaną pulą liczbaProcesow procesów i łączeniem zapytań.
+    Zapytania o ten sam klucz (rodzaj, geometria, model oraz odległość lub fala) zebrane
+    w czasie oknoLaczenia [s] od pierwszego z nich liczone są jedną porcją: punkty są
+    sklejane, a częstotliwości sumowane, po czym każde zapytanie dostaje swój wycinek wyniku.
+    Porcja wysyłana jest wcześniej, gdy liczba punktów (lub częstotliwości linii) osiągnie
+    maksymalnaPorcja. Zapytania i odpowiedzi dłuższe niż limitWiersza [B] zastępowane są
+    odpowiedzią z błędem.
+    """
+
+    def __init__(self,liczbaProcesow=2,plikiNEC=(),oknoLaczenia=0.002,maksymalnaPorcja=4096,\
+            liczbaProbekOpoznien=10000,limitWiersza=limitWiersza):
+        'Przygotowanie serwisu (pula procesów tworzona jest przy starcie).'
+        self.liczbaProcesow = liczbaProcesow
+        self.plikiNEC = tuple(plikiNEC)
+        self.oknoLaczenia = oknoLaczenia                    # [s]
+        self.maksymalnaPorcja = maksymalnaPorcja
+        self.limitWiersza = limitWiersza                    # [B]
+        self.geometrie = ('domyslna',) + tuple(nazwaGeometrii(plik) for plik in self.plikiNEC)
+        self.pula = None
+        self.serwer = None
+        self.oczekujace = {}                                # klucz -> [lista (dane, przyszłość), uchwyt zegara]
+        self.opoznienia = collections.deque(maxlen=liczbaProbekOpoznien)    # [s] ostatnie czasy obsługi
+        self.liczniki = collections.Counter()
+        self.czasStartu = None
+
+    def uruchomPule(self):
+        'Tworzy pulę procesów i rozgrzewa każdy proces roboczy.'
+        self.pula = ProcessPoolExecutor(self.liczbaProcesow, initializer=_inicjalizujProces,\
+            initargs=(self.plikiNEC,))
+        for zlecenie in [self.pula.submit(_rozgrzej) for x in range(self.liczbaProcesow)]:
+            zlecenie.result()
+
+    async def start(self,gniazdo=None,host='127.0.0.1',port=0):
+        """
+        Uruchamia pulę i serwer nasłuchujący na gnieździe uniksowym gniazdo
+        lub, gdy go nie podano, na porcie TCP host:port (port 0 - dowolny wolny).
+        Zwraca obiekt serwera asyncio.
+        """
+        if self.pula is None:
+            await asyncio.get_running_loop().run_in_executor(None, self.uruchomPule)
+        if gniazdo is not None:
+            if os.path.exists(gniazdo):
+                os.remove(gniazdo)
+            self.serwer = await asyncio.start_unix_server(self._obsluzPolaczenie, path=gniazdo,\
+                limit=self.limitWiersza)
+        else:
+            self.serwer = await asyncio.start_server(self._obsluzPolaczenie, host, port,\
+                limit=self.limitWiersza)
+        self.czasStartu = time.perf_counter()
+        return self.serwer
+
+    async def zamknij(self):
+        'Zamyka serwer i pulę procesów.'
+        if self.serwer is not None:
+            self.serwer.close()
+            await self.serwer.wait_closed()
+        if self.pula is not None:
+            self.pula.shutdown(wait=True)
+            self.pula = None
+
+    async def _obsluzPolaczenie(self,czytnik,pisarz):
+        'Czyta zapytania z połączenia i odsyła odpowiedzi, gdy tylko są gotowe.'
+        blokada = asyncio.Lock()
+        zadania = set()
+
+        async def odpowiedz(wiersz):
+            if wiersz is None:
+                wynik = self._blad(None, "Zapytanie przekracza limit długości wiersza ({} B)!".format(self.limitWiersza))
+            else:
+                try:
+                    zapytanie = json.loads(wiersz)
+                except ValueError:
+                    wynik = self._blad(None, "Niepoprawny JSON zapytania!")
+                else:
+                    wynik = await self.obsluz(zapytanie)
+            dane = (json.dumps(wynik) + '\n').encode()
+            if len(dane) > self.limitWiersza:
+                dane = (json.dumps(self._blad(wynik.get('id'), "Odpowiedź przekracza limit długości wiersza"\
+                    " ({} B) - podziel zapytanie!".format(self.limitWiersza))) + '\n').encode()
+            async with blokada:
+                pisarz.write(dane)
+                await pisarz.drain()
+
+        try:
+            while True:
+                wiersz = await czytajWiersz(czytnik)
+                if wiersz == b'':
+                    break
+                zadanie = asyncio.ensure_future(odpowiedz(wiersz))
+                zadania.add(zadanie)
+                zadanie.add_done_callback(zadania.discard)
+            await asyncio.gather(*zadania)
+        except ConnectionError:
+            pass
+        finally:
+            pisarz.close()
+
+    def _blad(self,identyfikator,opis):
+        'Odpowiedź z błędem dla zapytania, którego nie udało się odczytać lub odesłać.'
+        self.liczniki['bledy'] += 1
+        return {'id': identyfikator, 'blad': opis}
+
+    async def obsluz(self,zapytanie):
+        'Obsługuje jedno zapytanie (słownik) i zwraca słownik odpowiedzi.'
+        start = time.perf_counter()
+        identyfikator = zapytanie.get('id') if isinstance(zapytanie, dict) else None
+        try:
+            if not isinstance(zapytanie, dict):
+                raise Exception("Zapytanie musi być obiektem JSON!")
+            if zapytanie.get('zadanie') == 'metryki':
+                return {'id': identyfikator, 'metryki': self.metryki()}
+            klucz, dane, rozmiar = self._przygotuj(zapytanie)
+            odpowiedz = await self._dolacz(klucz, dane, rozmiar)
+            odpowiedz['id'] = identyfikator
+        except Exception as blad:
+            self.liczniki['bledy'] += 1
+            odpowiedz = {'id': identyfikator, 'blad': str(blad)}
+        self.liczniki['zapytania'] += 1
+        self.opoznienia.append(time.perf_counter() - start)
+        return odpowiedz
+
+    def _przygotuj(self,zapytanie):
+        """
+        Sprawdza zapytanie i zwraca krotkę (klucz łączenia, dane zapytania, rozmiar),
+        gdzie rozmiar to liczba punktów (pole) lub częstotliwości (linia).
+        """
+        geometria = zapytanie.get('geometria', 'domyslna')
+        if zapytanie.get('zadanie') == 'pole':
+            if geometria not in self.geometrie:
+                raise Exception("Nieznana geometria: " + str(geometria))
+            model = zapytanie.get('model', zadanie1.EmitujacyObwod.model)
+            if model not in ('biegunowy', 'geometryczny'):
+                raise Exception("Nieznany model obwodu: " + str(model))
+            if 'r' not in zapytanie:
+                raise Exception("Brak odległości obliczeń r!")
+            theta, phi = np.broadcast_arrays(\
+                np.asarray(zapytanie.get('theta', 0.0), dtype=float),\
+                np.asarray(zapytanie.get('phi', 0.0), dtype=float))
+            f = np.asarray(zapytanie.get('f', zadanie1.EmitujacyObwod.f), dtype=float).ravel()
+            klucz = ('pole', geometria, model, float(zapytanie['r']))
+            return klucz, (theta, phi, f), theta.size
+        if zapytanie.get('zadanie') == 'linia':
+            if geometria != 'domyslna':
+                raise Exception("Nieznana geometria linii: " + str(geometria))
+            model = zapytanie.get('model', zadanie2.Rozwiazanie.model)
+            if model not in ('skupiony', 'mtl'):
+                raise Exception("Nieznany model linii: " + str(model))
+            if 'f' not in zapytanie:
+                raise Exception("Brak częstotliwości f!")
+            opisFali = zapytanie.get('fala', {'k': (1.0, 1.0, 0.0), 'E': (-1.0, 1.0, 0.0), 'H': (0.0, 0.0, 1.0)})
+            fala = zadanie2.WektoryFali(*[tuple(float(x) for x in opisFali[nazwa]) for nazwa in ('k', 'E', 'H')])
+            f = np.asarray(zapytanie['f'], dtype=float).ravel()
+            return ('linia', geometria, model, fala), f, f.size
+        raise Exception("Nieznany rodzaj zapytania: " + str(zapytanie.get('zadanie')))
+
+    def _dolacz(self,klucz,dane,rozmiar):
+        'Dołącza zapytanie do porcji o danym kluczu; zwraca przyszłość z odpowiedzią.'
+        petla = asyncio.get_running_loop()
+        przyszlosc = petla.create_future()
+        porcja = self.oczekujace.get(klucz)
+        if porcja is None:
+            porcja = self.oczekujace[klucz] = [[], petla.call_later(self.oknoLaczenia, self._wyslij, klucz), 0]
+        porcja[0].append((dane, przyszlosc))
+        porcja[2] += rozmiar
+        if porcja[2] >= self.maksymalnaPorcja:
+            self._wyslij(klucz)
+        return przyszlosc
+
+    def _wyslij(self,klucz):
+        'Zamyka porcję o danym kluczu i zleca jej obliczenie.'
+        porcja = self.oczekujace.pop(klucz, None)
+        if porcja is None:
+            return
+        porcja[1].cancel()
+        asyncio.ensure_future(self._policz(klucz, porcja[0]))
+
+    async def _policz(self,klucz,wpisy):
+        'Liczy porcję w puli procesów i rozdziela wynik między zapytania.'
+        self.liczniki['porcje'] += 1
+        self.liczniki['zapytaniaWPorcjach'] += len(wpisy)
+        petla = asyncio.get_running_loop()
+        try:
+            if klucz[0] == 'pole':
+                rodzaj, geometria, model, r = klucz
+                theta = np.concatenate([dane[0].ravel() for dane, przyszlosc in wpisy])
+                phi = np.concatenate([dane[1].ravel() for dane, przyszlosc in wpisy])
+                f = np.unique(np.concatenate([dane[2] for dane, przyszlosc in wpisy]))
+                E = await petla.run_in_executor(self.pula, _polePorcji, geometria, model, r, theta, phi, f)
+                poczatek = 0
+                for (thetaZapytania, phiZapytania, fZapytania), przyszlosc in wpisy:
+                    wiersze = E[poczatek:poczatek + thetaZapytania.size]
+                    poczatek += thetaZapytania.size
+                    wynik = wiersze[:, np.searchsorted(f, fZapytania)]
+                    if not przyszlosc.done():
+                        przyszlosc.set_result({'E': _zespolone(wynik.reshape(thetaZapytania.shape + (fZapytania.size,)))})
+            else:
+                rodzaj, geometria, model, fala = klucz
+                f = np.unique(np.concatenate([dane for dane, przyszlosc in wpisy]))
+                Vne, Vfe = await petla.run_in_executor(self.pula, _liniaPorcji, geometria, model, fala, f)
+                for fZapytania, przyszlosc in wpisy:
+                    indeksy = np.searchsorted(f, fZapytania)
+                    if not przyszlosc.done():
+                        przyszlosc.set_result({'Vne': _zespolone(Vne[indeksy]), 'Vfe': _zespolone(Vfe[indeksy])})
+        except Exception as blad:
+            for dane, przyszlosc in wpisy:
+                if not przyszlosc.done():
+                    przyszlosc.set_exception(blad)
+
+    def metryki(self):
+        """
+        Słownik metryk serwisu: liczby zapytań, błędów i porcji, średni rozmiar porcji
+        (zapytań na porcję), przepustowość od startu [zapytania/s] oraz percentyle
+        czasu obsługi ostatnich zapytań p50, p99 [s].
+        """
+        czas = time.perf_counter() - self.czasStartu if self.czasStartu is not None else 0.0
+        opoznienia = np.array(self.opoznienia)
+        return {\
+            'zapytania': self.liczniki['zapytania'],\
+            'bledy': self.liczniki['bledy'],\
+            'porcje': self.liczniki['porcje'],\
+            'zapytaniaNaPorcje': self.liczniki['zapytaniaWPorcjach']/self.liczniki['porcje']\
+                if self.liczniki['porcje'] else 0.0,\
+            'oczekujace': sum(len(porcja[0]) for porcja in self.oczekujace.values()),\
+            'przepustowosc': self.liczniki['zapytania']/czas if czas > 0.0 else 0.0,\
+            'p50': float(np.percentile(opoznienia, 50)) if opoznienia.size else None,\
+            'p99': float(np.percentile(opoznienia, 99)) if opoznienia.size else None,\
+            'procesy': self.liczbaProcesow,\
+            'geometrie': list(self.geometrie)}
+
+class Klient:
+    """
+    Klient asyncio serwisu: wysyła zapytania jednym połączeniem i dopasowuje odpowiedzi
+    po polu 'id', więc wiele zapytań może oczekiwać na odpowiedź jednocześnie.
+    Zapytania dłuższe niż limitWiersza [B] odrzucane są przed wysłaniem.
+    """
+
+    def __init__(self,czytnik,pisarz,limitWiersza=limitWiersza):
+        'Klient na otwartym połączeniu (patrz polacz).'
+        self.czytnik = czytnik
+        self.pisarz = pisarz
+        self.limitWiersza = limitWiersza    # [B]
+        self.oczekujace = {}            # id -> przyszłość odpowiedzi
+        self.numer = 0
+        self.odbior = asyncio.ensure_future(self._odbieraj())
+
+    @classmethod
+    async def polacz(cls,gniazdo=None,host='127.0.0.1',port=None,limitWiersza=limitWiersza):
+        'Łączy się z serwisem przez gniazdo uniksowe lub TCP host:port.'
+        if gniazdo is not None:
+            czytnik, pisarz = await asyncio.open_unix_connection(gniazdo, limit=limitWiersza)
+        else:
+            czytnik, pisarz = await asyncio.open_connection(host, port, limit=limitWiersza)
+        return cls(czytnik, pisarz, limitWiersza)
+
+    async def _odbieraj(self):
+        try:
+            while True:
+                wiersz = await czytajWiersz(self.czytnik)
+                if wiersz == b'':
+                    break
+                if wiersz is None:
+                    # odpowiedzi nie da się przypisać do zapytania - błąd dla wszystkich oczekujących
+                    oczekujace, self.oczekujace = self.oczekujace, {}
+                    for przyszlosc in oczekujace.values():
+                        if not przyszlosc.done():
+                            przyszlosc.set_exception(Exception(\
+                                "Odpowiedź przekracza limit długości wiersza ({} B)!".format(self.limitWiersza)))
+                    continue
+                odpowiedz = json.loads(wiersz)
+                przyszlosc = self.oczekujace.pop(odpowiedz.get('id'), None)
+                if przyszlosc is not None and not przyszlosc.done():
+                    przyszlosc.set_result(odpowiedz)
+        finally:
+            for przyszlosc in self.oczekujace.values():
+                if not przyszlosc.done():
+                    przyszlosc.set_exception(ConnectionError("Serwis zamknął połączenie!"))
+
+    async def zapytaj(self,zapytanie):
+        'Wysyła zapytanie (słownik bez id) i zwraca odpowiedź; odpowiedź z błędem zgłaszana jest wyjątkiem.'
+        self.numer += 1
+        identyfikator = self.numer
+        dane = (json.dumps(dict(zapytanie, id=identyfikator)) + '\n').encode()
+        if len(dane) > self.limitWiersza:
+            raise Exception("Zapytanie przekracza limit długości wiersza ({} B)!".format(self.limitWiersza))
+        przyszlosc = asyncio.get_running_loop().create_future()
+        self.oczekujace[identyfikator] = przyszlosc
+        self.pisarz.write(dane)
+        await self.pisarz.drain()
+        odpowiedz = await przyszlosc
+        if 'blad' in odpowiedz:
+            raise Exception(odpowiedz['blad'])
+        return odpowiedz
+
+    async def zamknij(self):
+        'Zamyka połączenie.'
+        self.pisarz.close()
+        await self.odbior
+
+def zapytaniaTestowe(liczba,ziarno=0):
+    """
+    Mieszanka drobnych zapytań typowych dla stanowiska testowego: pole E obwodu w jednym
+    kierunku dla częstotliwości zadania oraz napięcia linii dla kilku częstotliwości.
+    """
+    losowe = np.random.default_rng(ziarno)
+    zapytania = []
+    for numer in range(liczba):
+        if numer % 2 == 0:
+            zapytania.append({'zadanie': 'pole', 'theta': [float(losowe.uniform(0.0, 2.0*np.pi))],\
+                'phi': 0.0, 'r': 1.0E4, 'f': list(zadanie1.EmitujacyObwod.f)})
+        else:
+            zapytania.append({'zadanie': 'linia', 'f': np.logspace(0, 8, 8).tolist(),\
+                'model': 'mtl' if numer % 4 == 1 else 'skupiony'})
+    return zapytania
+
+async def generatorObciazenia(klient,zapytania,wspolbieznosc=32):
+    """
+    Wysyła zapytania przez klienta, utrzymując co najwyżej wspolbieznosc zapytań w toku.
+    Zwraca słownik: liczba zapytań i błędów, czas [s], przepustowość [zapytania/s]
+    oraz percentyle opóźnienia widzianego przez klienta p50, p99 [s].
+    """
+    semafor = asyncio.Semaphore(wspolbieznosc)
+    opoznienia = []
+    bledy = 0
+
+    async def wyslij(zapytanie):
+        nonlocal bledy
+        async with semafor:
+            start = time.perf_counter()
+            try:
+                await klient.zapytaj(zapytanie)
+            except Exception:
+                bledy += 1
+            opoznienia.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[wyslij(zapytanie) for zapytanie in zapytania])
+    czas = time.perf_counter() - start
+    return {\
+        'zapytania': len(zapytania),\
+        'bledy': bledy,\
+        'czas': czas,\
+        'przepustowosc': len(zapytania)/czas,\
+        'p50': float(np.percentile(opoznienia, 50)),\
+        'p99': float(np.percentile(opoznienia, 99))}
+
+async def _serwuj(argumenty):
+    serwis = Serwis(argumenty.procesy, argumenty.nec or (), argumenty.okno)
+    serwer = await serwis.start(argumenty.gniazdo, argumenty.host, argumenty.port or 0)
+    adresy = ', '.join(str(gniazdo.getsockname()) for gniazdo in serwer.sockets)
+    print("Serwis nasłuchuje: {}".format(adresy), flush=True)
+    try:
+        await serwer.serve_forever()
+    finally:
+        await serwis.zamknij()
+
+async def _obciazenie(argumenty):
+    klient = await Klient.polacz(argumenty.gniazdo, argumenty.host, argumenty.port)
+    try:
+        raport = await generatorObciazenia(klient, zapytaniaTestowe(argumenty.zapytania), argumenty.wspolbieznosc)
+        raport['serwis'] = (await klient.zapytaj({'zadanie': 'metryki'}))['metryki']
+    finally:
+        await klient.zamknij()
+    return raport
+
+async def _metryki(argumenty):
+    klient = await Klient.polacz(argumenty.gniazdo, argumenty.host, argumenty.port)
+    try:
+        return (await klient.zapytaj({'zadanie': 'metryki'}))['metryki']
+    finally:
+        await klient.zamknij()
+
+def wierszPolecen(argumenty=None):
+    'Obsługa wiersza poleceń serwisu. Zwraca kod wyjścia programu.'
+    parser = argparse.ArgumentParser(description='Lokalny serwis obliczeń zadań 1 i 2.')
+    parser.add_argument('polecenie', choices=('serwuj', 'obciazenie', 'metryki'))
+    parser.add_argument('--gniazdo', help='ścieżka gniazda uniksowego (domyślnie TCP)')
+    parser.add_argument('--host', default='127.0.0.1', help='adres TCP')
+    parser.add_argument('--port', type=int, help='port TCP')
+    parser.add_argument('--procesy', type=int, default=2, help='liczba procesów roboczych')
+    parser.add_argument('--nec', nargs='+', help='pliki NEC z dodatkowymi geometriami obwodu')
+    parser.add_argument('--okno', type=float, default=0.002, help='[s] okno łączenia zapytań')
+    parser.add_argument('--zapytania', type=int, default=1000, help='liczba zapytań generatora obciążenia')
+    parser.add_argument('--wspolbieznosc', type=int, default=32, help='liczba zapytań w toku')
+    argumenty = parser.parse_args(argumenty)
+    if argumenty.gniazdo is None and argumenty.port is None and argumenty.polecenie != 'serwuj':
+        parser.error("podaj --gniazdo lub --port serwisu")
+
+    if argumenty.polecenie == 'serwuj':
+        try:
+            asyncio.run(_serwuj(argumenty))
+        except KeyboardInterrupt:
+            pass
+    elif argumenty.polecenie == 'obciazenie':
+        print(json.dumps(asyncio.run(_obciazenie(argumenty)), indent=1))
+    else:
+        print(json.dumps(asyncio.run(_metryki(argumenty)), indent=1))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(wierszPolecen())
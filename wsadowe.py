@@ -0,0 +1,85 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Tryb wsadowy wspólny dla obu zadań: wykonywanie zadań z pliku JSONL i obsługa wiersza poleceń
+# (plik wyniku, pamięć wyników, plik zadań, pomiary i profil). Moduł zadania dostarcza własną
+# funkcję wykonajZadanie(parametry) i argumenty wiersza poleceń opisujące parametry zadania.
+# Przykład:
+#     parser = argparse.ArgumentParser(description='Zadanie')
+#     parser.add_argument('-r', '--odleglosc', type=float)
+#     return wsadowe.wierszPolecen(parser, wykonajZadanie, argumenty)
+
+import json
+import os
+
+import instrumentacja
+
+# Argumenty wiersza poleceń sterujące trybem wsadowym (nie są parametrami zadania)
+ARGUMENTY_STERUJACE = ('zadania', 'katalog', 'pomiary', 'profil')
+
+def parametr(parametry,klucz,typ,domyslna=None):
+    """
+    Wartość parametru zadania klucz rzutowana na typ (np. float, int) lub domyslna, gdy
+    parametru nie podano. Dla typu int odrzucane są wartości niecałkowite (np. 10.5).
+    Wartość, której nie da się rzutować, zgłaszana jest wyjątkiem ValueError z nazwą parametru.
+    """
+    wartosc = parametry.get(klucz)
+    if wartosc is None:
+        return domyslna
+    try:
+        if typ is int:
+            liczba = float(wartosc)
+            if liczba != int(liczba):
+                raise ValueError
+            return int(liczba)
+        return typ(wartosc)
+    except (TypeError, ValueError):
+        raise ValueError("Parametr zadania '{}' musi być typu {}, podano: {!r}".format(\
+            klucz, typ.__name__, wartosc))
+
+def wykonajZadania(wykonajZadanie,plikZadan,katalog='.'):
+    """
+    Wykonuje kolejno zadania z pliku JSONL (jeden słownik parametrów wykonajZadanie w wierszu),
+    czytając plik strumieniowo. Zadania bez klucza 'wyjscie' zapisywane są w katalogu
+    jako zadanie_<numer wiersza>.txt. Zwraca liczbę wykonanych zadań.
+    """
+    liczbaZadan = 0
+    with open(plikZadan) as zadania:
+        for numer, linia in enumerate(zadania, 1):
+            if not linia.strip():
+                continue
+            parametry = json.loads(linia)
+            parametry.setdefault('wyjscie', os.path.join(katalog, 'zadanie_{}.txt'.format(numer)))
+            wykonajZadanie(parametry)
+            liczbaZadan += 1
+    return liczbaZadan
+
+def wierszPolecen(parser,wykonajZadanie,argumenty=None,sprawdz=None):
+    """
+    Obsługa wiersza poleceń trybu wsadowego. Do parsera (argparse) z argumentami parametrów
+    zadania dodaje argumenty wspólne, po czym wykonuje zadania z pliku JSONL (--zadania)
+    albo jedno zadanie opisane argumentami. Opcjonalna funkcja sprawdz(parser, argumenty)
+    sprawdza argumenty pojedynczego zadania (np. wywołując parser.error).
+    Zwraca kod wyjścia programu.
+    """
+    parser.add_argument('--pamiec', help='katalog trwałej pamięci wyników')
+    parser.add_argument('-o', '--wyjscie', default='wynik.txt', help='plik wyniku (pojedyncze zadanie)')
+    parser.add_argument('--zadania', help='plik JSONL z parametrami zadań, po jednym w wierszu')
+    parser.add_argument('--katalog', default='.', help='katalog wyników zadań z pliku JSONL')
+    parser.add_argument('--pomiary', help='plik raportu pomiarów etapów obliczeń (.json lub .prof)')
+    parser.add_argument('--profil', help='plik profilu cProfile (format pstats)')
+    argumenty = parser.parse_args(argumenty)
+
+    if argumenty.zadania:
+        liczbaZadan = instrumentacja.uruchom(\
+            lambda: wykonajZadania(wykonajZadanie, argumenty.zadania, argumenty.katalog),\
+            argumenty.pomiary, argumenty.profil)
+        print("Wykonano zadań: {}".format(liczbaZadan))
+        return 0
+    if sprawdz is not None:
+        sprawdz(parser, argumenty)
+    parametry = dict((klucz, wartosc) for klucz, wartosc in vars(argumenty).items()\
+        if wartosc is not None and klucz not in ARGUMENTY_STERUJACE)
+    print("Zapisano: {}".format(instrumentacja.uruchom(lambda: wykonajZadanie(parametry),\
+        argumenty.pomiary, argumenty.profil)))
+    return 0
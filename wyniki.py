@@ -0,0 +1,101 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Kolumnowe przechowywanie wyników obliczeń obu zadań w tablicach NumPy,
+# opcjonalnie odwzorowanych w pamięci (memmap) na plik .npy na dysku.
+
+import hashlib
+import json
+
+import numpy as np
+
+def skrot(*skladniki):
+    """
+    Stabilny skrót (SHA-256, zapis szesnastkowy) dowolnych tablic NumPy, liczb i napisów,
+    np. geometrii obwodu. Tablice wchodzą do skrótu wraz z typem i kształtem.
+    """
+    suma = hashlib.sha256()
+    for skladnik in skladniki:
+        if isinstance(skladnik, np.ndarray):
+            tablica = np.ascontiguousarray(skladnik)
+            suma.update(str((tablica.dtype.str, tablica.shape)).encode())
+            suma.update(tablica.tobytes())
+        else:
+            suma.update(repr(skladnik).encode())
+        suma.update(b'|')
+    return suma.hexdigest()
+
+class WynikObliczen:
+    """
+    Wynik obliczeń w prealokowanej tablicy NumPy, do której solwery zapisują bezpośrednio.
+    Opisany jest osiami (np. theta, phi, f - po jednej tablicy na wymiar tablicy danych)
+    oraz metadanymi (np. skrót geometrii). Przy podaniu pliku .npy tablica jest odwzorowana
+    w pamięci (memmap), więc wynik nie musi mieścić się w pamięci operacyjnej;
+    metadane zapisywane są obok, w pliku <plik>.json.
+    """
+
+    def __init__(self,osie,dtype=complex,plik=None,metadane=None):
+        """
+        Utworzenie wyniku o kształcie wyznaczonym przez osie (lista par (nazwa, wartości)).
+        Zawartość tablicy danych nie jest inicjalizowana.
+        """
+        self.osie = [(nazwa, np.asarray(wartosci)) for nazwa, wartosci in osie]
+        self.metadane = dict(metadane or {})
+        self.plik = plik
+        ksztalt = tuple(len(wartosci) for nazwa, wartosci in self.osie)
+        if plik is None:
+            self.dane = np.empty(ksztalt, dtype=dtype)
+        else:
+            self.dane = np.lib.format.open_memmap(plik, mode='w+', dtype=dtype, shape=ksztalt)
+            self._zapiszMetadane(plik)
+
+    def os(self,nazwa):
+        'Zwraca wartości osi o zadanej nazwie.'
+        return dict(self.osie)[nazwa]
+
+    def _opis(self):
+        'Opis osi i metadanych w postaci nadającej się do zapisu w JSON.'
+        return {\
+            'osie': [(nazwa, wartosci.tolist()) for nazwa, wartosci in self.osie],\
+            'metadane': self.metadane}
+
+    def _zapiszMetadane(self,plik):
+        with open(plik + '.json', 'w') as strumien:
+            json.dump(self._opis(), strumien)
+
+    def zapisz(self,plik):
+        """
+        Zapisuje wynik do pliku. Dla rozszerzenia .npz zapisuje w jednym archiwum dane,
+        osie i metadane; w przeciwnym razie dane trafiają do pliku .npy (który można potem
+        czytać bez kopiowania, patrz wczytaj), a osie i metadane do pliku <plik>.json.
+        """
+        if plik.endswith('.npz'):
+            osie = dict(('os_' + nazwa, wartosci) for nazwa, wartosci in self.osie)
+            np.savez(plik, dane=self.dane, opis=json.dumps(self._opis()), **osie)
+            return
+        if plik == self.plik:
+            self.dane.flush()
+        else:
+            np.save(plik, self.dane)
+        self._zapiszMetadane(plik)
+
+    @classmethod
+    def wczytaj(cls,plik,mmap=True):
+        """
+        Wczytuje wynik zapisany metodą zapisz. Pliki .npy są domyślnie odwzorowywane
+        w pamięci tylko do odczytu (bez kopiowania danych); archiwa .npz wczytywane są w całości.
+        """
+        wynik = cls.__new__(cls)
+        if plik.endswith('.npz'):
+            with np.load(plik) as archiwum:
+                opis = json.loads(str(archiwum['opis']))
+                wynik.dane = archiwum['dane']
+            wynik.plik = None
+        else:
+            with open(plik + '.json') as strumien:
+                opis = json.load(strumien)
+            wynik.dane = np.load(plik, mmap_mode='r' if mmap else None)
+            wynik.plik = plik
+        wynik.osie = [(nazwa, np.asarray(wartosci)) for nazwa, wartosci in opis['osie']]
+        wynik.metadane = opis['metadane']
+        return wynik
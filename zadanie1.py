@@ -22,7 +22,18 @@
 # zadanie sprowadza się do obliczenia pola elektrycznego od każdego fragmentu przewodu, traktując taki fragment jako dipol Hertza, w zadanej odległości rx, gdzie x to numer fragmentu, a następnie zsumowanie wszystkich składowych pola elektrycznego.
 
 from cmath import pi,sin,exp,sqrt
-import matplotlib.pyplot as plt
+import argparse
+import multiprocessing
+import sys
+import threading
+from collections import OrderedDict
+import czytnikNEC
+import instrumentacja
+import pamiecWynikow
+import przebiegi
+import punkty
+import wsadowe
+import wyniki
 import numpy as np
 
 t = 0.0        # [s] moment w propagacji fali
@@ -47,6 +58,90 @@ def I0(f):
     'Obliczenie prądu odniesienia (I0) dla zadanej częstotliwości.'
     return Constants.q0 * 2.0 * pi * f
 
+def wspolczynnikiDipola(f):
+    """
+    Obliczenie współczynników wzoru dipola Hertza zależnych tylko od częstotliwości:
+    liczby falowej beta, amplitudy I0*beta^2/(4*pi*Eps*2*pi*f) (bez długości dipola i odległości)
+    oraz fazy czasowej 2*pi*f*t. Działa zarówno dla liczb, jak i tablic częstotliwości.
+    """
+    b = beta(f)                                                        # [1/m]
+    amplituda = I0(f) * b**2 / (4.0 * pi * Constants.Eps * 2.0 * pi * f)
+    faza = 2.0*pi*f * t                                                # [rad]
+    return b, amplituda, faza
+
+class PamiecWspolczynnikow:
+    """
+    Pamięć podręczna współczynników wzoru dipola Hertza (patrz wspolczynnikiDipola),
+    współdzielona przez wszystkie dipole obwodu i wszystkie punkty obserwacji.
+    Kluczem wpisu jest cała tablica częstotliwości (kształt i bajty tablicy oraz chwila t),
+    więc trafienie to jedno wyszukanie w słowniku, a chybienie - jedno wektorowe wywołanie
+    wspolczynnikiDipola. Przechowuje co najwyżej rozmiarMaksymalny częstotliwości, usuwając
+    najdawniej używane wpisy (LRU); dłuższa tablica (np. widmo przebiegu czasowego) zostaje
+    w pamięci jako jedyny wpis. Liczniki trafien i chybien (liczone w częstotliwościach)
+    pozwalają ocenić skuteczność pamięci przy długich przemiataniach.
+    Dostęp do pamięci jest chroniony blokadą, więc obwód można współdzielić między wątkami.
+    """
+    
+    def __init__(self,rozmiarMaksymalny=1024):
+        'Utworzenie pustej pamięci o zadanym rozmiarze maksymalnym.'
+        if rozmiarMaksymalny < 1:
+            raise Exception("Rozmiar pamięci współczynników musi być dodatni!")
+        self.rozmiarMaksymalny = rozmiarMaksymalny
+        self.wpisy = OrderedDict()        # (kształt f, bajty f, t) -> (beta, amplituda, faza)
+        self.rozmiar = 0                # liczba częstotliwości we wszystkich wpisach
+        self.trafienia = 0
+        self.chybienia = 0
+        self.blokada = threading.Lock()
+        
+    def wspolczynniki(self,f):
+        'Zwraca współczynniki (beta, amplituda, faza) dla jednej częstotliwości.'
+        b, amplituda, faza = self.wspolczynnikiTablicy(float(f))
+        return float(b), float(amplituda), float(faza)
+        
+    def wspolczynnikiTablicy(self,f):
+        """
+        Zwraca współczynniki (beta, amplituda, faza) jako tablice (tylko do odczytu)
+        o kształcie tablicy częstotliwości f.
+        """
+        f = np.asarray(f, dtype=float)
+        klucz = (f.shape, f.tobytes(), t)
+        with self.blokada:
+            wpis = self.wpisy.get(klucz)
+            if wpis is not None:
+                self.trafienia += f.size
+                self.wpisy.move_to_end(klucz)
+                return wpis
+            self.chybienia += f.size
+        # obliczenie poza blokadą, aby inne wątki nie czekały na chybienie
+        wpis = tuple(np.broadcast_to(wspolczynnik, f.shape) for wspolczynnik in wspolczynnikiDipola(f))
+        with self.blokada:
+            if klucz not in self.wpisy:
+                self.wpisy[klucz] = wpis
+                self.rozmiar += f.size
+                while self.rozmiar > self.rozmiarMaksymalny and len(self.wpisy) > 1:
+                    usuniety = self.wpisy.popitem(last=False)[1]
+                    self.rozmiar -= usuniety[0].size
+            return self.wpisy[klucz]
+        
+    def statystyki(self):
+        'Zwraca słownik z licznikami trafień i chybień oraz skutecznością pamięci.'
+        zapytania = self.trafienia + self.chybienia
+        return {\
+            'trafienia': self.trafienia,\
+            'chybienia': self.chybienia,\
+            'skutecznosc': self.trafienia/zapytania if zapytania else 0.0,\
+            'rozmiar': self.rozmiar,\
+            'wpisy': len(self.wpisy),\
+            'rozmiarMaksymalny': self.rozmiarMaksymalny}
+            
+    def wyczysc(self):
+        'Usuwa wszystkie wpisy i zeruje liczniki.'
+        with self.blokada:
+            self.wpisy.clear()
+            self.rozmiar = 0
+            self.trafienia = 0
+            self.chybienia = 0
+
 
 class UkladPolarny:
     """
@@ -54,6 +149,8 @@ class UkladPolarny:
     do zastosowania w rozwiązaniu zadania pierwszego.
     """
     
+    __slots__ = ('theta', 'phi', 'r')
+    
     def __init__(self,theta,phi,r):
         'Inicjalizacja położenia w układzie polarnym.'
         self.theta = theta        # [rad] 
@@ -67,6 +164,8 @@ class UkladPolarny:
 class PetlaZPradem:
     'Model pętli z prądem złożonej z dipoli Hertza.'
     
+    __slots__ = ('dlugosc', 'theta', 'phi', 'r')
+    
     def __init__(self,dlugosc,polozenieWUkladziePolarnym):
         'Konstruktor pętli z prądem o podanej długości i położeniu w układzie polarnym.'
         self.dlugosc = dlugosc
@@ -77,6 +176,8 @@ class PetlaZPradem:
 class DipolHertza:
     'Model dipolu Hertza.'
     
+    __slots__ = ('dlugosc', 'theta', 'phi', 'r')
+    
     def __init__(self,dlugosc,polozenieWUkladziePolarnym):
         'Konstruktor dipola Hertrza o podanej długości i położeniu w układzie polarnym.'
         self.dlugosc = dlugosc                                    # [m]
@@ -84,17 +185,22 @@ class DipolHertza:
         self.phi = polozenieWUkladziePolarnym.phi                # [rad]
         self.r = polozenieWUkladziePolarnym.r                    # [m]
         
-    def E(self,f,punktWUkladziePolarnym,prad):
+    def E(self,f,punktWUkladziePolarnym,prad,pamiec=None):
         """
         Zwraca wartość pola elektrycznego od dipola Hertza w punkcie zadanym w położeniu polarnym
         i prądzie płynącym w zadanym kierunku.
         Wartość pola elektrycznego jest obliczona jako absolutna względem polożenia dipola.
+        Opcjonalna pamiec (PamiecWspolczynnikow) dostarcza współczynniki zależne od częstotliwości.
         """
         r = punktWUkladziePolarnym.r - self.r                # [m]
         theta = punktWUkladziePolarnym.theta - self.theta    # [rad]
         phi = punktWUkladziePolarnym.phi - self.phi            # [rad]
         I = prad                                            # [A] prąd dipola
         
+        if pamiec is not None:
+            b, amplituda, faza = pamiec.wspolczynniki(f)
+            return I * amplituda * self.dlugosc / r * sin(theta) * exp(1j*(faza - b*r))
+        
         stalaWzoru = (I0(f) * self.dlugosc * beta(f)**2)\
             / (4.0 * pi * Constants.Eps * 2.0 * pi * f * r)\
             * sin(theta)
@@ -104,6 +210,201 @@ class DipolHertza:
         wartoscPolaElektrycznego = I * stalaWzoru * wykladnik
         
         return wartoscPolaElektrycznego
+
+
+def poleEDipoli(f,dlugosc,thetaDipola,rDipola,prad,theta,phi,r,pamiec=None):
+    """
+    Wektorowa (NumPy) wersja DipolHertza.E dla całego zbioru dipoli naraz.
+    Parametry dipoli (dlugosc, thetaDipola, rDipola, prad) są tablicami o długości D,
+    częstotliwości f tablicą o długości F, a współrzędne punktów obserwacji theta, phi, r
+    dowolnymi tablicami dającymi się rozgłosić (broadcast) do wspólnego kształtu P.
+    Zwraca zespolony tensor pola E o kształcie P + (F,), zsumowany po wszystkich dipolach.
+    Podobnie jak w DipolHertza.E, kąt phi nie wchodzi do wzoru - wyznacza jedynie kształt wyniku.
+    Opcjonalna pamiec (PamiecWspolczynnikow) dostarcza współczynniki zależne od częstotliwości.
+    """
+    f = np.asarray(f, dtype=float).reshape(-1, 1)                        # [Hz] kształt (F,1)
+    theta, phi, r = np.broadcast_arrays(theta, phi, r)
+    theta = np.asarray(theta, dtype=float)[..., np.newaxis, np.newaxis]    # [rad] kształt P+(1,1)
+    r = np.asarray(r, dtype=float)[..., np.newaxis, np.newaxis]            # [m] kształt P+(1,1)
+    
+    rWzgledne = r - rDipola                    # [m] kształt P+(1,D)
+    thetaWzgledne = theta - thetaDipola        # [rad] kształt P+(1,D)
+    if pamiec is None:
+        b, amplituda, faza = wspolczynnikiDipola(f)        # kształt (F,1)
+    else:
+        b, amplituda, faza = pamiec.wspolczynnikiTablicy(f)
+    
+    stalaWzoru = amplituda * dlugosc / rWzgledne * np.sin(thetaWzgledne)
+    
+    wykladnik = np.exp(1j*(faza - b*rWzgledne))
+    
+    return (prad * stalaWzoru * wykladnik).sum(axis=-1)
+
+def poleEDipoliGeometryczne(f,dlugosc,srodki,thetaDipola,prad,theta,phi,r,pamiec=None):
+    """
+    Odpowiednik poleEDipoli w pełnej geometrii 3-D (model 'geometryczny' obwodu).
+    Dipole leżą w płaszczyźnie obwodu w punktach srodki (tablica (D,3) lub punkty.ZbiorPunktow) [m]
+    i są skierowane pod kątami thetaDipola, a punkty obserwacji (theta, phi, r) przeliczane są
+    na współrzędne kartezjańskie (patrz punktyZadania). Faza i amplituda fali każdego dipola
+    zależą od rzeczywistej odległości od punktu obserwacji, a czynnik kierunkowy to rzut
+    poprzecznej do kierunku propagacji części wersora dipola na wersor theta punktu obserwacji.
+    Zwraca zespolony tensor pola E (składowa theta) o kształcie P + (F,), zsumowany po dipolach.
+    """
+    f = np.asarray(f, dtype=float).reshape(-1, 1)                        # [Hz] kształt (F,1)
+    ksztalt = np.broadcast(theta, phi, r).shape
+    obserwatory = punktyZadania(theta,phi,r)                            # N = iloczyn wymiarów P
+    wersoryTheta = wersorThetaZadania(*np.broadcast_arrays(theta, phi, r)[:2]).reshape(-1, 1, 3)
+    kierunki = punktyZadania(thetaDipola,0.0,1.0).xyz                    # (D,3) wersory dipoli
+    
+    wektory = punkty.wektoryWzgledne(srodki,obserwatory)                # [m] kształt (N,D,3)
+    odleglosci = np.sqrt(punkty.rzut(wektory,wektory))                    # [m] kształt (N,D)
+    # -(l - (l.R)R).theta: składowa theta pola dalekiego dipola o wersorze l
+    orientacja = punkty.rzut(wektory,kierunki) * punkty.rzut(wektory,wersoryTheta) / odleglosci**2\
+        - punkty.rzut(kierunki,wersoryTheta)
+    if pamiec is None:
+        b, amplituda, faza = wspolczynnikiDipola(f)        # kształt (F,1)
+    else:
+        b, amplituda, faza = pamiec.wspolczynnikiTablicy(f)
+    
+    odleglosci = odleglosci[:, np.newaxis, :]                            # [m] kształt (N,1,D)
+    stalaWzoru = amplituda * dlugosc / odleglosci * orientacja[:, np.newaxis, :]
+    
+    wykladnik = np.exp(1j*(faza - b*odleglosci))
+    
+    return (prad * stalaWzoru * wykladnik).sum(axis=-1).reshape(ksztalt + (f.size,))
+
+def poleBliskieDipoli(f,dlugosc,srodki,thetaDipola,prad,xyz,pamiec=None):
+    """
+    Pełne pole E dipoli Hertza, z członami 1/r, 1/r^2 i 1/r^3, w punktach xyz (N,3) [m] układu
+    kartezjańskiego obwodu (obwód w płaszczyźnie XY, biegun w początku układu). Dipole opisane są
+    jak w poleEDipoliGeometryczne. Zwraca zespolone wektory pola o kształcie (N, F, 3)
+    (składowe x, y, z), zsumowane po dipolach. Normalizacja jest zgodna z poleEDipoliGeometryczne:
+    w strefie dalekiej zostaje człon 1/r, którego składowa theta pokrywa się z tamtym modelem.
+    W środkach dipoli pole jest nieokreślone.
+    """
+    f = np.asarray(f, dtype=float).reshape(-1, 1)                        # [Hz] kształt (F,1)
+    kierunki = punktyZadania(thetaDipola,0.0,1.0).xyz                    # (D,3) wersory dipoli
+    
+    wektory = punkty.wektoryWzgledne(srodki,xyz)                        # [m] kształt (N,D,3)
+    odleglosci = np.sqrt(punkty.rzut(wektory,wektory))                    # [m] kształt (N,D)
+    wersory = wektory / odleglosci[..., np.newaxis]
+    rzutyKierunkow = punkty.rzut(wersory,kierunki)                        # (N,D) cosinus kąta dipol - punkt
+    if pamiec is None:
+        b, amplituda, faza = wspolczynnikiDipola(f)        # kształt (F,1)
+    else:
+        b, amplituda, faza = pamiec.wspolczynnikiTablicy(f)
+    
+    odleglosci = odleglosci[:, np.newaxis, :]                            # [m] kształt (N,1,D)
+    odwrotnosc = 1.0 / (1j*b*odleglosci)                                # 1/(j*beta*r), kształt (N,F,D)
+    stalaWzoru = prad * amplituda * dlugosc / odleglosci * np.exp(1j*(faza - b*odleglosci))
+    # E ~ (l.R)R * (1 + 3/(jbr) + 3/(jbr)^2) - l * (1 + 1/(jbr) + 1/(jbr)^2)
+    czlonR = stalaWzoru * (1.0 + 3.0*odwrotnosc + 3.0*odwrotnosc**2) * rzutyKierunkow[:, np.newaxis, :]
+    czlonL = stalaWzoru * (1.0 + odwrotnosc + odwrotnosc**2)
+    return np.einsum('nfd,ndk->nfk', czlonR, wersory) - np.einsum('nfd,dk->nfk', czlonL, kierunki)
+
+
+class ZbiorDipoli:
+    """
+    Zbiór dipoli Hertza przechowywany kolumnowo, w ciągłych tablicach NumPy
+    (długości, położenia w układzie polarnym i prądy), zamiast jako krotka obiektów DipolHertza.
+    Zgodnie z konwencją EmitujacyObwod kąt theta dipola opisuje zarazem jego orientację.
+    Pole E liczone jest wprost z tablic, porcjami dipoli (patrz rozmiarPorcjiDla), dzięki czemu
+    tablice pośrednie punkty x częstotliwości x dipole nie przekraczają rozmiarPorcjiElementow
+    elementów także dla obwodów z 10^5-10^6 dipolami.
+    Opcjonalne srodki (punkty.ZbiorPunktow) to położenia dipoli w układzie kartezjańskim,
+    potrzebne w modelu 'geometrycznym' (patrz poleEDipoliGeometryczne).
+    """
+    
+    __slots__ = ('dlugosci', 'theta', 'phi', 'r', 'prady', 'srodki')
+    
+    rozmiarPorcji = 4096        # maksymalna liczba dipoli sumowanych w jednym wywołaniu poleEDipoli
+    rozmiarPorcjiElementow = 1 << 18    # liczba trójek (punkt, częstotliwość, dipol) w jednym wywołaniu jądra pola
+    
+    def __init__(self,dlugosci,theta,r,prady,phi=0.0,srodki=None):
+        'Utworzenie zbioru z tablic parametrów dipoli (skalary są rozszerzane do długości zbioru).'
+        self.dlugosci = np.ascontiguousarray(dlugosci, dtype=np.float64)                        # [m]
+        liczba = self.dlugosci.size
+        self.theta = np.ascontiguousarray(np.broadcast_to(theta, liczba), dtype=np.float64)        # [rad]
+        self.phi = np.ascontiguousarray(np.broadcast_to(phi, liczba), dtype=np.float64)            # [rad]
+        self.r = np.ascontiguousarray(np.broadcast_to(r, liczba), dtype=np.float64)                # [m]
+        self.prady = np.ascontiguousarray(np.broadcast_to(prady, liczba), dtype=np.complex128)    # [A]
+        if srodki is not None and not isinstance(srodki, punkty.ZbiorPunktow):
+            srodki = punkty.ZbiorPunktow(srodki)
+        self.srodki = srodki                                                                        # [m]
+        
+    @classmethod
+    def zObiektow(cls,dipole,prad):
+        'Tworzy zbiór z sekwencji obiektów DipolHertza zasilanych prądem prad.'
+        return cls(\
+            dlugosci = [dipol.dlugosc for dipol in dipole],\
+            theta = [dipol.theta for dipol in dipole],\
+            phi = [dipol.phi for dipol in dipole],\
+            r = [dipol.r for dipol in dipole],\
+            prady = prad)
+        
+    def __len__(self):
+        return self.dlugosci.size
+        
+    def __getitem__(self,indeksy):
+        'Zwraca podzbiór dipoli (wycinek lub tablica indeksów) jako nowy ZbiorDipoli.'
+        return ZbiorDipoli(self.dlugosci[indeksy],self.theta[indeksy],self.r[indeksy],\
+            self.prady[indeksy],self.phi[indeksy],None if self.srodki is None else self.srodki[indeksy])
+        
+    @property
+    def nbytes(self):
+        'Rozmiar tablic zbioru w bajtach.'
+        return sum(getattr(self, nazwa).nbytes for nazwa in self.__slots__ if getattr(self, nazwa) is not None)
+        
+    @classmethod
+    def rozmiarPorcjiDla(cls,liczbaPunktow,liczbaF):
+        'Liczba dipoli porcji dla liczbaPunktow punktów i liczbaF częstotliwości (patrz rozmiarPorcjiElementow).'
+        return max(1, min(cls.rozmiarPorcji, cls.rozmiarPorcjiElementow // max(1, liczbaPunktow*liczbaF)))
+        
+    def dipol(self,indeks):
+        'Zwraca pojedynczy dipol zbioru jako obiekt DipolHertza.'
+        return DipolHertza(self.dlugosci[indeks],\
+            UkladPolarny(theta=self.theta[indeks],phi=self.phi[indeks],r=self.r[indeks]))
+        
+    def poleE(self,f,theta,phi,r,pamiec=None,model='biegunowy'):
+        """
+        Zwraca zespolony tensor pola E od wszystkich dipoli zbioru o kształcie wspólnym
+        dla theta, phi, r rozszerzonym o oś częstotliwości f. Model 'biegunowy' to wzór zadania
+        (poleEDipoli), a 'geometryczny' - pełna geometria 3-D (poleEDipoliGeometryczne, wymaga srodki).
+        """
+        if model == 'geometryczny':
+            if self.srodki is None:
+                raise Exception("Model geometryczny wymaga położeń dipoli (srodki)!")
+            def porcjaPola(porcja):
+                return poleEDipoliGeometryczne(f,self.dlugosci[porcja],self.srodki.xyz[porcja],\
+                    self.theta[porcja],self.prady[porcja],theta,phi,r,pamiec)
+        elif model == 'biegunowy':
+            def porcjaPola(porcja):
+                return poleEDipoli(f,self.dlugosci[porcja],self.theta[porcja],self.r[porcja],\
+                    self.prady[porcja],theta,phi,r,pamiec)
+        else:
+            raise Exception("Nieznany model obwodu: " + str(model))
+        rozmiarPorcji = self.rozmiarPorcjiDla(np.broadcast(theta, phi, r).size, np.size(f))
+        if len(self) <= rozmiarPorcji:
+            return porcjaPola(slice(None))
+        wynik = 0.0
+        for poczatek in range(0, len(self), rozmiarPorcji):
+            wynik = wynik + porcjaPola(slice(poczatek, poczatek + rozmiarPorcji))
+        return wynik
+        
+    def poleBliskie(self,f,xyz,pamiec=None):
+        """
+        Zwraca pełne pole E (patrz poleBliskieDipoli) od wszystkich dipoli zbioru w punktach
+        xyz (N,3) [m] jako zespoloną tablicę (N, F, 3). Wymaga położeń dipoli (srodki).
+        """
+        if self.srodki is None:
+            raise Exception("Pole bliskie wymaga położeń dipoli (srodki)!")
+        rozmiarPorcji = self.rozmiarPorcjiDla(len(xyz), np.size(f))
+        wynik = 0.0
+        for poczatek in range(0, max(len(self), 1), rozmiarPorcji):
+            porcja = slice(poczatek, poczatek + rozmiarPorcji)
+            wynik = wynik + poleBliskieDipoli(f,self.dlugosci[porcja],self.srodki.xyz[porcja],\
+                self.theta[porcja],self.prady[porcja],xyz,pamiec)
+        return wynik
         
         
 # Przedstawienie badanego obwodu elektrycznego
@@ -147,11 +448,23 @@ class EmitujacyObwod:
         500.0E6     # trzecia badana częstotliwość fali \
         )
     
+    rozmiarPamieciWspolczynnikow = 4096        # maksymalna liczba częstotliwości w pamięci współczynników
+    siatkowanie = False                        # czy dzielić odcinki na krótsze dipole zależnie od częstotliwości
+    ulamekDlugosciFali = 20.0                # dipol siatki nie jest dłuższy niż lambda/ulamekDlugosciFali
+    model = 'biegunowy'                        # model pola: 'biegunowy' (wzór zadania) lub 'geometryczny' (3-D)
+    
+    # Wierzchołki obwodu ze szkicu (w jednostkach B, biegun 'o' w początku układu),
+    # w kolejności przepływu prądu, począwszy od górnego lewego rogu
+    wierzcholki = (\
+        (0.0, 1.0), (3.0, 1.0), (3.0, 0.0), (2.0, 0.0), (2.0, -1.0),\
+        (1.0, -1.0), (1.0, 0.0), (0.0, 0.0), (0.0, 1.0))
+    
+    @instrumentacja.mierz('EmitujacyObwod.__init__')
     def __init__(self):
         'Konstruktor analizowanego obwodu.'
         # Obliczam odległości polarne 'r' środków poszczególnych odcinków obwodu
         odleglosc_srodka_1 = sqrt(self.B*self.B + (1.5*self.B)**2).real
-        odleglosc_srodka_2 = sqrt(3.0*self.B + (0.5*self.B)**2).real
+        odleglosc_srodka_2 = sqrt((3.0*self.B)**2 + (0.5*self.B)**2).real
         odleglosc_srodka_3 = 2.5*self.B
         odleglosc_srodka_4 = sqrt((2.0*self.B)**2 + (-0.5*self.B)**2).real
         odleglosc_srodka_5 = sqrt((1.5*self.B)**2 + (-1.0*self.B)**2).real
@@ -194,21 +507,238 @@ class EmitujacyObwod:
             self.dipol_7,\
             self.dipol_8,\
             )
+        
+        # Parametry dipoli zebrane w tablice, z których korzystają obliczenia pola
+        self.dipole = ZbiorDipoli.zObiektow(self.obwod,self.A)
+        
+        # Odcinki obwodu w układzie kartezjańskim płaszczyzny obwodu, potrzebne do siatkowania
+        # i do modelu geometrycznego (dipole leżą w środkach odcinków)
+        wierzcholki = np.array([w + (0.0,) for w in self.wierzcholki]) * self.B
+        self.poczatki = wierzcholki[:-1]        # [m]
+        self.konce = wierzcholki[1:]            # [m]
+        self.dipole.srodki = punkty.ZbiorPunktow(0.5*(self.poczatki + self.konce))
+        
+        self.przygotujPamiec()
+        
+    def przygotujPamiec(self):
+        'Tworzy puste pamięci współczynników i siatek obwodu.'
+        # Współczynniki zależne od częstotliwości, wspólne dla wszystkich dipoli i punktów
+        self.pamiecWspolczynnikow = PamiecWspolczynnikow(self.rozmiarPamieciWspolczynnikow)
+        # Siatki dipoli dla trybu siatkowania: podział odcinków -> ZbiorDipoli
+        self.siatki = {}
+        self.podzialyCzestotliwosci = {}        # [Hz] -> klucz podziału odcinków w self.siatki
+        
+    @classmethod
+    def zTaliNEC(cls,talia,A=None):
+        """
+        Tworzy obwód z geometrii wczytanej z pliku NEC (czytnikNEC.TaliaNEC).
+        Każdy segment przewodu z karty GW staje się dipolem Hertza. Przewody powinny
+        leżeć na płaszczyźnie XY, a biegunem układu jest początek układu współrzędnych NEC.
+        Zgodnie z konwencją obwodu kąt theta dipola to kierunek przepływu prądu mierzony
+        od osi y (,,do góry'') w stronę osi x, a r to odległość środka segmentu od bieguna.
+        Pobudzenie z kart EX nie wyznacza prądu (brak impedancji), więc amplitudę
+        prądu A można podać jawnie; domyślnie pozostaje EmitujacyObwod.A.
+        Częstotliwości z kart FR (jeżeli są) zastępują EmitujacyObwod.f.
+        """
+        srodki, kierunki, dlugosci = talia.segmenty()
+        obwod = cls.__new__(cls)
+        if A is not None:
+            obwod.A = A
+        if len(talia.f):
+            obwod.f = tuple(talia.f.tolist())
+        obwod.obwod = ()
+        thetaDipoli, rDipoli = parametryPolarne(srodki,kierunki)                            # [rad], [m]
+        obwod.dipole = ZbiorDipoli(dlugosci,thetaDipoli,rDipoli,obwod.A,srodki=srodki)
+        obwod.poczatki = srodki - 0.5*dlugosci[:, np.newaxis]*kierunki                        # [m]
+        obwod.konce = srodki + 0.5*dlugosci[:, np.newaxis]*kierunki                            # [m]
+        obwod.przygotujPamiec()
+        return obwod
+        
+    def skrot(self):
+        'Stabilny skrót geometrii i zasilania obwodu (dipole, odcinki, prąd, ustawienia siatkowania).'
+        return wyniki.skrot(\
+            self.dipole.dlugosci, self.dipole.theta, self.dipole.phi, self.dipole.r, self.dipole.prady,\
+            self.poczatki, self.konce, self.siatkowanie, self.ulamekDlugosciFali, self.model)
+        
+    @instrumentacja.mierz('EmitujacyObwod.siatka')
+    def siatka(self,f):
+        """
+        Zwraca siatkę dipoli (ZbiorDipoli) dla częstotliwości f: każdy odcinek obwodu
+        jest dzielony na najmniejszą liczbę równych części nie dłuższych niż
+        lambda/ulamekDlugosciFali. Częstotliwości o tym samym podziale współdzielą jedną
+        siatkę, więc liczba siatek zależy od rozmiaru elektrycznego obwodu,
+        a nie od długości listy częstotliwości.
+        """
+        klucz = self.podzialyCzestotliwosci.get(f)
+        if klucz is None:
+            klucz = self._podzial(Constants.c / f / self.ulamekDlugosciFali)
+            self.podzialyCzestotliwosci[f] = klucz
+        return self.siatki[klucz]
+        
+    def podzielony(self,dlugoscMaksymalna):
+        """
+        Zwraca zbiór dipoli (ZbiorDipoli), w którym każdy odcinek obwodu podzielono na najmniejszą
+        liczbę równych części nie dłuższych niż dlugoscMaksymalna [m], np. do obliczeń pola
+        bliskiego w odległości porównywalnej z długością odcinków.
+        """
+        return self.siatki[self._podzial(dlugoscMaksymalna)]
+        
+    def _podzial(self,dlugoscMaksymalna):
+        'Tworzy (jeżeli trzeba) siatkę dipoli o częściach nie dłuższych niż dlugoscMaksymalna; zwraca jej klucz.'
+        dlugosciOdcinkow = np.sqrt(((self.konce - self.poczatki)**2).sum(axis=1))
+        liczbyCzesci = np.maximum(np.ceil(dlugosciOdcinkow / dlugoscMaksymalna), 1).astype(int)
+        klucz = liczbyCzesci.tobytes()
+        if klucz not in self.siatki:
+            srodki, kierunki, dlugosci = czytnikNEC.podzielOdcinki(self.poczatki,self.konce,liczbyCzesci)
+            thetaDipoli, rDipoli = parametryPolarne(srodki,kierunki)
+            prady = np.repeat(self.dipole.prady, liczbyCzesci)            # [A] prąd odcinka w każdej części
+            self.siatki[klucz] = ZbiorDipoli(dlugosci,thetaDipoli,rDipoli,prady,srodki=srodki)
+        return klucz
             
     def E(self,punktWUkladziePolarnym):
         """
         Zwraca wartość amplitudy pola elektrycznego, promieniowanego od obwodu,
         w zadanym w układzie polarnym punkcie.
         """
-        wartoscPolaEWPunkcie = 0.0        # [V/m] wartość natężenia pola, inicjalizacja
-        rozwiazania = []                # lista rozwiązań dla wszystkich podanych częstotliwości fali
-        for fx in self.f:
-            for dipol in self.obwod:
-                wartoscPolaEWPunkcie += dipol.E(fx,punktWUkladziePolarnym,self.A)
-            amplitudaPolaEWPunkcie = abs(wartoscPolaEWPunkcie)
-            rozwiazania.append(amplitudaPolaEWPunkcie)
-            
-        return rozwiazania
+        wartoscPolaEWPunkcie = self.poleE(\
+            punktWUkladziePolarnym.theta,\
+            punktWUkladziePolarnym.phi,\
+            punktWUkladziePolarnym.r)        # [V/m] lista rozwiązań dla wszystkich podanych częstotliwości fali
+        return np.abs(wartoscPolaEWPunkcie).tolist()
+        
+    @instrumentacja.mierz('EmitujacyObwod.poleE')
+    def poleE(self,theta,phi,r,f=None):
+        """
+        Zwraca zespolony tensor pola elektrycznego, promieniowanego od obwodu, dla tablic
+        współrzędnych theta, phi, r oraz tablicy częstotliwości f (domyślnie self.f).
+        Wynik ma kształt wspólny dla theta, phi, r rozszerzony o oś częstotliwości.
+        Model pola wybiera atrybut model (patrz ZbiorDipoli.poleE).
+        """
+        if f is None:
+            f = self.f
+        if not self.siatkowanie:
+            return self.dipole.poleE(f,theta,phi,r,self.pamiecWspolczynnikow,self.model)
+        
+        # Tryb siatkowania: częstotliwości o wspólnej siatce liczone są jednym wywołaniem
+        f = np.asarray(f, dtype=float).ravel()
+        wynik = np.empty(np.broadcast(theta, phi, r).shape + (f.size,), dtype=complex)
+        for siatka, indeksy in self.grupySiatek(f):
+            wynik[..., indeksy] = siatka.poleE(f[indeksy],theta,phi,r,self.pamiecWspolczynnikow,self.model)
+        return wynik
+        
+    def grupySiatek(self,f):
+        'Dzieli tablicę częstotliwości f na grupy o wspólnej siatce: lista krotek (siatka, indeksy f).'
+        grupy = {}
+        for indeks, fx in enumerate(np.ravel(f).tolist()):
+            siatka = self.siatka(fx)
+            grupy.setdefault(id(siatka), (siatka, []))[1].append(indeks)
+        return list(grupy.values())
+        
+    @instrumentacja.mierz('EmitujacyObwod.poleBliskie')
+    def poleBliskie(self,xyz,f=None,dlugoscDipola=None):
+        """
+        Zwraca pełne pole E obwodu (człony 1/r, 1/r^2, 1/r^3, patrz poleBliskieDipoli) w punktach
+        xyz (N,3) [m] (tablica lub punkty.ZbiorPunktow) dla tablicy częstotliwości f (domyślnie self.f)
+        jako zespoloną tablicę (N, F, 3) składowych x, y, z. Przy podaniu dlugoscDipola [m] odcinki
+        dzielone są na dipole nie dłuższe niż dlugoscDipola (patrz podzielony), co jest potrzebne
+        w odległościach porównywalnych z długością odcinków; w przeciwnym razie użyte są dipole
+        obwodu lub - w trybie siatkowania - siatki poszczególnych częstotliwości.
+        """
+        if f is None:
+            f = self.f
+        f = np.asarray(f, dtype=float).ravel()
+        if isinstance(xyz, punkty.ZbiorPunktow):
+            xyz = xyz.xyz
+        xyz = np.asarray(xyz, dtype=float).reshape(-1, 3)
+        if dlugoscDipola is not None:
+            return self.podzielony(dlugoscDipola).poleBliskie(f,xyz,self.pamiecWspolczynnikow)
+        if not self.siatkowanie:
+            return self.dipole.poleBliskie(f,xyz,self.pamiecWspolczynnikow)
+        wynik = np.empty((len(xyz), f.size, 3), dtype=complex)
+        for siatka, indeksy in self.grupySiatek(f):
+            wynik[:, indeksy] = siatka.poleBliskie(f[indeksy],xyz,self.pamiecWspolczynnikow)
+        return wynik
+        
+    def wzorPrzyrostowy(self,theta,phi,r,f=None):
+        """
+        Tworzy WzorPrzyrostowy z dipolami obwodu na zadanej siatce punktów i częstotliwości.
+        Wzór przyrostowy liczy pole modelu 'biegunowego' ze stałego zbioru dipoli, więc
+        dla innego modelu lub obwodu w trybie siatkowania (dipole zależne od częstotliwości)
+        zgłaszany jest wyjątek zamiast wyniku niezgodnego z poleE.
+        """
+        if self.model != 'biegunowy':
+            raise Exception("Wzór przyrostowy obsługuje tylko model biegunowy obwodu!")
+        if self.siatkowanie:
+            raise Exception("Wzór przyrostowy nie obsługuje trybu siatkowania obwodu!")
+        wzor = WzorPrzyrostowy(theta,phi,r,self.f if f is None else f,self.pamiecWspolczynnikow)
+        for indeks in range(len(self.dipole)):
+            wzor.dodaj(self.dipole.dlugosci[indeks],self.dipole.theta[indeks],self.dipole.r[indeks],\
+                self.dipole.prady[indeks],self.dipole.phi[indeks])
+        return wzor
+
+
+class WzorPrzyrostowy:
+    """
+    Pole E obwodu na stałej siatce punktów i częstotliwości, aktualizowane przyrostowo.
+    Pole jest liniową superpozycją wkładów poszczególnych dipoli, więc przechowywany jest
+    wkład każdego dipola oraz ich suma. Dodanie, usunięcie lub przesunięcie jednego dipola
+    kosztuje O(siatka): odejmowany jest stary wkład i dodawany nowy, bez przeliczania
+    pozostałych dipoli. Pamięć rośnie jak dipole x siatka.
+    """
+    
+    def __init__(self,theta,phi,r,f,pamiec=None):
+        'Przygotowanie pustej siatki obliczeń (bez dipoli).'
+        self.theta, self.phi, self.r = np.broadcast_arrays(\
+            np.asarray(theta, dtype=float), np.asarray(phi, dtype=float), np.asarray(r, dtype=float))
+        self.f = np.asarray(f, dtype=float).ravel()        # [Hz]
+        self.pamiec = pamiec
+        self.dipole = {}            # numer dipola -> (dlugosc, theta, r, prad, phi)
+        self.wklady = {}            # numer dipola -> wkład dipola w pole E na siatce
+        self.E = np.zeros(self.theta.shape + (self.f.size,), dtype=complex)    # [V/m] pole wypadkowe
+        self._kolejnyNumer = 0
+        
+    def _wklad(self,dlugosc,theta,r,prad,phi):
+        'Pole E pojedynczego dipola na siatce.'
+        return poleEDipoli(self.f,np.array([dlugosc]),np.array([theta]),np.array([r]),\
+            np.array([prad]),self.theta,self.phi,self.r,self.pamiec)
+        
+    def dodaj(self,dlugosc,theta,r,prad,phi=0.0):
+        'Dodaje dipol i zwraca jego numer, używany przy usuwaniu i przesuwaniu.'
+        numer = self._kolejnyNumer
+        self._kolejnyNumer += 1
+        self.dipole[numer] = (dlugosc, theta, r, prad, phi)
+        self.wklady[numer] = self._wklad(dlugosc,theta,r,prad,phi)
+        self.E += self.wklady[numer]
+        return numer
+        
+    def usun(self,numer):
+        'Usuwa dipol o zadanym numerze.'
+        self.E -= self.wklady.pop(numer)
+        del self.dipole[numer]
+        
+    def zmien(self,numer,dlugosc=None,theta=None,r=None,prad=None,phi=None):
+        'Zmienia parametry (np. położenie) dipola; parametry niepodane pozostają bez zmian.'
+        stare = self.dipole[numer]
+        nowe = tuple(stara if nowa is None else nowa\
+            for stara, nowa in zip(stare, (dlugosc, theta, r, prad, phi)))
+        wklad = self._wklad(*nowe)
+        self.E += wklad - self.wklady[numer]
+        self.dipole[numer] = nowe
+        self.wklady[numer] = wklad
+        
+    def przelicz(self):
+        'Sumuje od nowa zapamiętane wkłady dipoli, usuwając błędy zaokrągleń nagromadzone przez edycje.'
+        self.E = np.zeros_like(self.E)
+        for wklad in self.wklady.values():
+            self.E += wklad
+        return self.E
+        
+    def zbiorDipoli(self):
+        'Zwraca bieżące dipole jako ZbiorDipoli (np. do pełnego przeliczenia w EmitujacyObwod).'
+        if not self.dipole:
+            return ZbiorDipoli(np.zeros(0),np.zeros(0),np.zeros(0),np.zeros(0))
+        dlugosci, theta, r, prady, phi = (np.array(x) for x in zip(*self.dipole.values()))
+        return ZbiorDipoli(dlugosci,theta,r,prady,phi)
 
             
 # -----------------------------------------------------------
@@ -233,37 +763,553 @@ class Rozwiazanie:
     """
 
     rozdzielczoscTheta = 1            # [stopien] rozdzielczość za jaką będzie rozwiązywane zadanie, musi być typu integer
+    rozmiarPorcji = 4096            # maksymalna liczba punktów (theta, phi) obliczanych naraz w trybie przemiatania
+    rozmiarPorcjiF = 64                # maksymalna liczba częstotliwości obliczanych naraz w trybie przemiatania
+    rozmiarPorcjiElementow = ZbiorDipoli.rozmiarPorcjiElementow    # liczba trójek (punkt, częstotliwość, dipol) porcji przemiatania
+    rozmiarPorcjiWidma = 1 << 16    # liczba par (punkt, prążek widma) obliczanych naraz w trybie przebiegów czasowych
+    rozmiarPorcjiObjetosci = 1 << 18    # liczba trójek (punkt, częstotliwość, dipol) obliczanych naraz w mapach pola bliskiego
     
-    def __init__(self,r,phi=0.0):
+    def __init__(self,r,phi=0.0,obwod=None):
         'Przygotuj potrzebne obiekty i zmienne do obliczeń.'
-        self.obwod = EmitujacyObwod()
+        self.obwod = obwod if obwod is not None else EmitujacyObwod()
         self.r = r                    # [m] odległość obliczanego rozwiązania od bieguna
         self.phi = phi                # [rad] kąt obrotowy obliczanego rozwiązania względem osi wiodącej
-        self.listaKatow = [(pi/180.0)*kat for kat in range(0, 361, self.rozdzielczoscTheta)]    # [rad]
+        
+    @property
+    def listaKatow(self):
+        'Lista kątów theta [rad] od 0 do 360 stopni z krokiem rozdzielczoscTheta (liczona przy każdym odczycie).'
+        return [(pi/180.0)*kat for kat in range(0, 361, self.rozdzielczoscTheta)]    # [rad]
         
     def poleE(self):
         'Obliczenie natężenia pola E (składowa E(theta)) wokół układu przewodów.'
-        self.listaKatow = [(pi/180.0)*kat for kat in range(0, 361, self.rozdzielczoscTheta)]    # [rad]
-        self.listaPunktow = []         # lista punktów w układzie polarnym, dla których wykonuję obliczenia
-        poleE = []                    # obliczone pole elektryczne wokół badanego obwodu w zadanej odległości i nachyleniu
-        for x in range(len(self.listaKatow)):
-            self.listaPunktow.append(\
-                UkladPolarny(r=self.r,phi=self.phi,theta=self.listaKatow[x]) )
-        for punkt in self.listaPunktow:
-            poleE.append(self.obwod.E(punkt))
-        return poleE
-        
-    #def rysujRozwiazanie(self):
-        #'Rysuje rozwiązanie zadania pierwszego na wykresie polarnym.'
-        #return 0.0
+        # punkty w układzie polarnym, dla których wykonuję obliczenia, zebrane w tablice
+        # (zmienne lokalne - wywołanie nie zmienia stanu rozwiązania)
+        listaKatow = self.listaKatow                                # [rad]
+        listaPunktow = UkladPolarny(r=self.r,phi=self.phi,theta=np.asarray(listaKatow))
+        with instrumentacja.etap('Rozwiazanie.poleE',len(listaKatow),len(self.obwod.f)):
+            # obliczone pole elektryczne wokół badanego obwodu w zadanej odległości i nachyleniu
+            poleE = self.obwod.poleE(listaPunktow.theta,listaPunktow.phi,listaPunktow.r)
+            return np.abs(poleE).tolist()
+        
+    @classmethod
+    def zPlikuNEC(cls,plik,r=None,A=None):
+        """
+        Przygotowuje rozwiązanie na podstawie pliku NEC: obwód z kart GW, częstotliwości z kart FR
+        i odległość z karty RP (chyba że podano r). Siatka kątów karty RP jest dostępna
+        jako self.katyNEC, w konwencji kątów zadania (patrz katyZNEC), np.:
+            rozwiazanie = Rozwiazanie.zPlikuNEC('Z1.nec')
+            wzor = rozwiazanie.wzorPromieniowania(*rozwiazanie.katyNEC)
+        """
+        talia = czytnikNEC.wczytajNEC(plik)
+        if r is None:
+            r = talia.r
+        if r is None:
+            raise Exception("Brak odległości obliczeń: podaj r lub kartę RP z polem RFLD!")
+        rozwiazanie = cls(r=r,obwod=EmitujacyObwod.zTaliNEC(talia,A))
+        rozwiazanie.talia = talia
+        rozwiazanie.katyNEC = katyZNEC(talia.theta,talia.phi)
+        return rozwiazanie
+        
+    def porcje(self,listaTheta,listaPhi,f=None):
+        """
+        Dzieli siatkę theta x phi x f na porcje (co najwyżej rozmiarPorcji punktów na rozmiarPorcjiF
+        częstotliwości), w których liczba trójek (punkt, częstotliwość, dipol) nie przekracza
+        rozmiarPorcjiElementow, więc pamięć obliczeń nie zależy od liczby dipoli obwodu.
+        Zwraca generator krotek (theta, phi, f) opisujących kolejne porcje.
+        Punkty są numerowane wierszami: theta zewnętrznie, phi wewnętrznie.
+        """
+        listaTheta = np.asarray(listaTheta, dtype=float)        # [rad]
+        listaPhi = np.asarray(listaPhi, dtype=float)            # [rad]
+        if f is None:
+            f = self.obwod.f
+        f = np.asarray(f, dtype=float).ravel()                    # [Hz]
+        liczbaDipoli = self.liczbaDipoliPorcji(f)
+        liczbaF = max(1, min(f.size, self.rozmiarPorcjiF, self.rozmiarPorcjiElementow // liczbaDipoli))
+        liczbaPunktowPorcji = max(1, min(self.rozmiarPorcji, self.rozmiarPorcjiElementow // (liczbaF*liczbaDipoli)))
+        liczbaPunktow = listaTheta.size * listaPhi.size
+        for poczatekF in range(0, f.size, liczbaF):
+            porcjaF = f[poczatekF:poczatekF + liczbaF]
+            for poczatek in range(0, liczbaPunktow, liczbaPunktowPorcji):
+                indeksy = np.arange(poczatek, min(poczatek + liczbaPunktowPorcji, liczbaPunktow))
+                indeksyTheta, indeksyPhi = np.unravel_index(indeksy, (listaTheta.size, listaPhi.size))
+                yield listaTheta[indeksyTheta], listaPhi[indeksyPhi], porcjaF
+        
+    def liczbaDipoliPorcji(self,f,dlugoscDipola=None):
+        """
+        Liczba dipoli obwodu w aktywnym trybie (dipole, siatka dla najwyższej częstotliwości f
+        lub podział na dipole o długości dlugoscDipola) ograniczona do ZbiorDipoli.rozmiarPorcji,
+        tj. liczba dipoli sumowanych w jednym wywołaniu jądra pola.
+        """
+        if dlugoscDipola is not None:
+            liczbaDipoli = len(self.obwod.podzielony(dlugoscDipola))
+        elif self.obwod.siatkowanie:
+            liczbaDipoli = len(self.obwod.siatka(float(np.max(f))))
+        else:
+            liczbaDipoli = len(self.obwod.dipole)
+        return max(1, min(liczbaDipoli, ZbiorDipoli.rozmiarPorcji))
+        
+    def przemiatanie(self,listaTheta,listaPhi,f=None,liczbaProcesow=1):
+        """
+        Generator przemiatający pełną siatkę theta x phi x f w odległości self.r.
+        Siatka jest przechodzona porcjami (patrz Rozwiazanie.porcje), więc zużycie pamięci
+        nie zależy od gęstości siatki. Każda porcja to krotka (theta, phi, f, E), gdzie E
+        jest zespoloną tablicą o kształcie (len(theta), len(f)).
+        Dla liczbaProcesow > 1 porcje są liczone w puli procesów, ale oddawane w tej samej
+        kolejności i z tymi samymi wartościami (bit w bit) co w trybie szeregowym.
+        """
+        porcje = self.porcje(listaTheta,listaPhi,f)
+        if liczbaProcesow == 1:
+            for theta, phi, porcjaF in porcje:
+                yield theta, phi, porcjaF, self.obwod.poleE(theta,phi,self.r,porcjaF)
+            return
+        with multiprocessing.Pool(liczbaProcesow,_inicjalizujProces,(self.obwod,self.r)) as pula:
+            for theta, phi, porcjaF, E in pula.imap(_poleEPorcji, porcje):
+                yield theta, phi, porcjaF, E
+                
+    def wzorPromieniowania(self,listaTheta,listaPhi,f=None,liczbaProcesow=1,wynik=None):
+        """
+        Oblicza pełny wzór promieniowania na siatce theta x phi x f (opcjonalnie w puli
+        liczbaProcesow procesów). Zwraca zespoloną tablicę o kształcie (theta, phi, f);
+        jeżeli podano prealokowaną tablicę wynik (np. odwzorowaną w pamięci), porcje
+        są zapisywane bezpośrednio do niej.
+        """
+        if f is None:
+            f = self.obwod.f
+        f = np.asarray(f, dtype=float).ravel()                    # [Hz]
+        liczbaTheta, liczbaPhi = np.size(listaTheta), np.size(listaPhi)
+        if wynik is None:
+            wynik = np.empty((liczbaTheta, liczbaPhi, f.size), dtype=complex)
+        punkty = wynik.reshape(liczbaTheta*liczbaPhi, f.size)    # widok, bez kopiowania
+        punkt, czestotliwosc = 0, 0
+        with instrumentacja.etap('Rozwiazanie.wzorPromieniowania',len(punkty),f.size):
+            for theta, phi, porcjaF, E in self.przemiatanie(listaTheta,listaPhi,f,liczbaProcesow):
+                punkty[punkt:punkt + len(theta), czestotliwosc:czestotliwosc + porcjaF.size] = E
+                punkt += len(theta)
+                if punkt == len(punkty):
+                    punkt, czestotliwosc = 0, czestotliwosc + porcjaF.size
+        return wynik
+        
+    @instrumentacja.mierz('Rozwiazanie.wynikWzoru')
+    def wynikWzoru(self,listaTheta,listaPhi,f=None,liczbaProcesow=1,plik=None,pamiec=None):
+        """
+        Oblicza wzór promieniowania (patrz wzorPromieniowania) wprost do wyniki.WynikObliczen
+        z osiami theta, phi, f i skrótem geometrii obwodu w metadanych. Przy podaniu pliku .npy
+        wynik jest odwzorowany w pamięci na dysku, więc nie powstaje jego kopia w pamięci.
+        Przy podaniu pamiec (pamiecWynikow.PamiecWynikow) wynik jest najpierw szukany w pamięci
+        pod kluczem kluczWzoru, a nowo obliczony jest w niej zapamiętywany.
+        """
+        if f is None:
+            f = self.obwod.f
+        f = np.ravel(f)
+        
+        def oblicz():
+            wynik = wyniki.WynikObliczen(\
+                osie = (('theta', listaTheta), ('phi', listaPhi), ('f', f)),\
+                plik = plik,\
+                metadane = {'r': self.r, 'geometria': self.obwod.skrot(), 'model': self.obwod.model})
+            self.wzorPromieniowania(listaTheta,listaPhi,f,liczbaProcesow,wynik.dane)
+            if plik is not None:
+                wynik.dane.flush()
+            return wynik
         
+        if pamiec is None:
+            return oblicz()
+        return pamiec.oblicz(self.kluczWzoru(listaTheta,listaPhi,f), oblicz)
+        
+    def kluczWzoru(self,listaTheta,listaPhi,f):
+        'Klucz wzoru promieniowania w pamięci wyników: geometria, stałe, pobudzenie i siatka obliczeń.'
+        return wyniki.skrot('zadanie1.wzorPromieniowania',\
+            self.obwod.skrot(),\
+            (Constants.c0, Constants.c, Constants.Eps, Constants.q0, t),\
+            float(self.r),\
+            np.asarray(listaTheta, dtype=float),\
+            np.asarray(listaPhi, dtype=float),\
+            np.asarray(f, dtype=float))
+                
+    def zapiszPrzemiatanie(self,plik,listaTheta,listaPhi,f=None):
+        """
+        Zapisuje wynik przemiatania do otwartego pliku tekstowego porcja po porcji,
+        w wierszach: theta [rad], phi [rad], f [Hz], |E| [V/m].
+        Zwraca liczbę zapisanych wierszy.
+        """
+        liczbaWierszy = 0
+        for theta, phi, porcjaF, E in self.przemiatanie(listaTheta,listaPhi,f):
+            wiersze = np.column_stack((\
+                np.repeat(theta, porcjaF.size),\
+                np.repeat(phi, porcjaF.size),\
+                np.tile(porcjaF, theta.size),\
+                np.abs(E).ravel()))
+            np.savetxt(plik, wiersze, fmt='%.9e')
+            liczbaWierszy += len(wiersze)
+        return liczbaWierszy
+        
+    @instrumentacja.mierz('Rozwiazanie.maksimumPola')
+    def maksimumPola(self,f=None,tolerancja=1.0E-6,liczbaTheta=72,zakresPhi=None,liczbaPhi=9):
+        """
+        Wyszukiwanie maksimum |E| (i kierunku, w którym występuje) dla każdej częstotliwości
+        z f (domyślnie self.obwod.f) w odległości self.r, bez gęstej siatki kątów.
+        Najpierw zgrubne przeszukanie siatki liczbaTheta x liczbaPhi, potem lokalne
+        doprecyzowanie metodą złotego podziału, na przemian wzdłuż theta i phi, aż do
+        osiągnięcia tolerancji kąta [rad]. Kąt phi przeszukiwany jest w zakresPhi
+        (para [rad]); domyślnie pozostaje stały i równy self.phi.
+        Zwraca krotkę tablic (maksE, theta, phi, liczbaObliczen) o długości liczby częstotliwości
+        oraz liczbę punktów siatki, której wymagałoby przeszukanie z tą samą tolerancją.
+        """
+        if f is None:
+            f = self.obwod.f
+        f = np.asarray(f, dtype=float).ravel()
+        if zakresPhi is None:
+            zakresPhi = (self.phi, self.phi)
+        zmiennePhi = zakresPhi[1] > zakresPhi[0]
+        
+        # zgrubne przeszukanie siatki, wspólne dla wszystkich częstotliwości
+        krokTheta = 2.0*pi.real/liczbaTheta
+        siatkaTheta = krokTheta*np.arange(liczbaTheta)
+        siatkaPhi = np.linspace(zakresPhi[0], zakresPhi[1], liczbaPhi if zmiennePhi else 1)
+        krokPhi = siatkaPhi[1] - siatkaPhi[0] if zmiennePhi else 0.0
+        zgrubne = np.abs(self.wzorPromieniowania(siatkaTheta,siatkaPhi,f)).reshape(-1, f.size)
+        
+        maksE = np.empty(f.size)
+        najlepszeTheta = np.empty(f.size)
+        najlepszePhi = np.empty(f.size)
+        liczbaObliczen = np.full(f.size, zgrubne.shape[0])
+        for indeks, fx in enumerate(f):
+            najlepszy = zgrubne[:, indeks].argmax()
+            theta = siatkaTheta[najlepszy // siatkaPhi.size]
+            phi = siatkaPhi[najlepszy % siatkaPhi.size]
+            wartosc = zgrubne[najlepszy, indeks]
+            
+            def amplituda(theta, phi):
+                return abs(self.obwod.poleE(theta,phi,self.r,[fx])[0])
+            
+            for przebieg in range(10):
+                poprzednia = wartosc
+                theta, wartosc, obliczenia = _zlotyPodzial(\
+                    lambda x: amplituda(x, phi), theta - krokTheta, theta + krokTheta, tolerancja)
+                liczbaObliczen[indeks] += obliczenia
+                if zmiennePhi:
+                    phi, wartosc, obliczenia = _zlotyPodzial(\
+                        lambda x: amplituda(theta, x),\
+                        max(phi - krokPhi, zakresPhi[0]), min(phi + krokPhi, zakresPhi[1]), tolerancja)
+                    liczbaObliczen[indeks] += obliczenia
+                if not zmiennePhi or abs(wartosc - poprzednia) <= 1.0E-12*abs(wartosc):
+                    break
+            maksE[indeks] = wartosc
+            najlepszeTheta[indeks] = theta % (2.0*pi.real)
+            najlepszePhi[indeks] = phi
+        
+        punktySiatki = int(np.ceil(2.0*pi.real/tolerancja))
+        if zmiennePhi:
+            punktySiatki *= int(np.ceil((zakresPhi[1] - zakresPhi[0])/tolerancja)) + 1
+        return maksE, najlepszeTheta, najlepszePhi, liczbaObliczen, punktySiatki
+        
+    def transmitancjaPola(self,listaTheta,listaPhi,f,opoznienie=False):
+        """
+        Pole E na siatce theta x phi w odległości self.r na jednostkę prądu obwodu [V/m/A]
+        dla tablicy częstotliwości f, o kształcie (theta, phi, f). Prążki liczone są naraz,
+        porcjami po około rozmiarPorcjiWidma par (punkt, prążek). Bez opóźnienia (domyślnie)
+        usuwane jest opóźnienie propagacji r/c, tj. wynik odpowiada czasowi opóźnionemu t - r/c.
+        Składowa stała (f = 0) w strefie dalekiej jest zerowa.
+        """
+        theta = np.asarray(listaTheta, dtype=float).reshape(-1, 1)                # [rad]
+        phi = np.asarray(listaPhi, dtype=float).reshape(1, -1)                    # [rad]
+        f = np.asarray(f, dtype=float).ravel()                                    # [Hz]
+        wynik = np.zeros((theta.size, phi.size, f.size), dtype=complex)
+        niezerowe = np.flatnonzero(f)
+        rozmiarPorcji = max(1, self.rozmiarPorcjiWidma // (theta.size*phi.size))
+        for poczatek in range(0, niezerowe.size, rozmiarPorcji):
+            indeksy = niezerowe[poczatek:poczatek + rozmiarPorcji]
+            wynik[..., indeksy] = self.obwod.poleE(theta,phi,self.r,f[indeksy])
+        if not opoznienie:
+            wynik *= np.exp(1j*beta(f)*self.r)
+        return wynik / self.obwod.A
+        
+    @instrumentacja.mierz('Rozwiazanie.przebiegPola')
+    def przebiegPola(self,prad,dt,listaTheta,listaPhi=None,opoznienie=False):
+        """
+        Tryb przebiegów czasowych: pole E(t) [V/m] promieniowane przez obwód zasilany prądem
+        o przebiegu zadanym próbkami prad [A] co dt [s] (np. przebiegi.zegarTrapezowy,
+        przebiegi.impulsESD), na siatce theta x phi (domyślnie phi = self.phi) w odległości self.r.
+        Widmo przebiegu (rFFT) mnożone jest przez transmitancjaPola wszystkich prążków naraz,
+        a wynik wraca do dziedziny czasu przez irFFT. Zwraca tablicę o kształcie (theta, phi, N).
+        """
+        if listaPhi is None:
+            listaPhi = [self.phi]
+        return przebiegi.odpowiedzCzasowa(prad,dt,\
+            lambda f: self.transmitancjaPola(listaTheta,listaPhi,f,opoznienie))
+        
+    def porcjeObjetosci(self,x,y,z,f=None,dlugoscDipola=None):
+        """
+        Dzieli siatkę objętościową x x y x z [m] (w układzie kartezjańskim obwodu) i częstotliwości f
+        na porcje, w których liczba trójek (punkt, częstotliwość, dipol) nie przekracza
+        rozmiarPorcjiObjetosci, więc pamięć obliczeń nie zależy od rozmiaru siatki.
+        Zwraca generator krotek (punkty, czestotliwosci, xyz, f): wycinki numerów punktów
+        (numerowanych wierszami: x zewnętrznie, z wewnętrznie) i częstotliwości, współrzędne
+        punktów porcji (P,3) oraz częstotliwości porcji.
+        """
+        x, y, z = (np.asarray(os, dtype=float).ravel() for os in (x, y, z))    # [m]
+        if f is None:
+            f = self.obwod.f
+        f = np.asarray(f, dtype=float).ravel()                                # [Hz]
+        liczbaDipoli = self.liczbaDipoliPorcji(f,dlugoscDipola)
+        liczbaF = max(1, min(f.size, self.rozmiarPorcjiObjetosci // liczbaDipoli))
+        liczbaPunktowPorcji = max(1, self.rozmiarPorcjiObjetosci // (liczbaF*liczbaDipoli))
+        liczbaPunktow = x.size * y.size * z.size
+        for poczatekF in range(0, f.size, liczbaF):
+            czestotliwosci = slice(poczatekF, poczatekF + liczbaF)
+            for poczatek in range(0, liczbaPunktow, liczbaPunktowPorcji):
+                indeksy = np.arange(poczatek, min(poczatek + liczbaPunktowPorcji, liczbaPunktow))
+                ix, iy, iz = np.unravel_index(indeksy, (x.size, y.size, z.size))
+                yield slice(indeksy[0], indeksy[-1] + 1), czestotliwosci,\
+                    np.column_stack((x[ix], y[iy], z[iz])), f[czestotliwosci]
+        
+    def przemiatanieObjetosci(self,x,y,z,f=None,liczbaProcesow=1,dlugoscDipola=None):
+        """
+        Generator pełnego pola E (patrz EmitujacyObwod.poleBliskie) na siatce objętościowej,
+        porcja po porcji (patrz porcjeObjetosci). Każda porcja to krotka (punkty, czestotliwosci, E),
+        gdzie E jest zespoloną tablicą (P, F, 3). Dla liczbaProcesow > 1 porcje liczone są
+        w puli procesów, w tej samej kolejności i z tymi samymi wartościami co szeregowo.
+        """
+        porcje = self.porcjeObjetosci(x,y,z,f,dlugoscDipola)
+        if liczbaProcesow == 1:
+            for punktyPorcji, czestotliwosci, xyz, porcjaF in porcje:
+                yield punktyPorcji, czestotliwosci, self.obwod.poleBliskie(xyz,porcjaF,dlugoscDipola)
+            return
+        zadania = ((punktyPorcji, czestotliwosci, xyz, porcjaF, dlugoscDipola)\
+            for punktyPorcji, czestotliwosci, xyz, porcjaF in porcje)
+        with multiprocessing.Pool(liczbaProcesow,_inicjalizujProces,(self.obwod,self.r)) as pula:
+            for wynik in pula.imap(_poleBliskiePorcji, zadania):
+                yield wynik
+        
+    @instrumentacja.mierz('Rozwiazanie.mapaPola')
+    def mapaPola(self,x,y,z,f=None,liczbaProcesow=1,plik=None,pamiec=None,dlugoscDipola=None):
+        """
+        Mapa pełnego pola E (strefa bliska i daleka) na siatce objętościowej x x y x z [m]
+        w układzie kartezjańskim obwodu, np. do wyboru miejsca dla wrażliwych elementów na płytce.
+        Wynik (wyniki.WynikObliczen o osiach x, y, z, f, skladowa) zapisywany jest porcjami
+        (patrz porcjeObjetosci, opcjonalnie w puli liczbaProcesow procesów), a przy podaniu
+        pliku .npy - wprost do tablicy odwzorowanej w pamięci na dysku. Przy podaniu pamiec
+        (pamiecWynikow.PamiecWynikow) wynik jest najpierw szukany pod kluczem kluczMapy.
+        Dla punktów bliskich obwodu warto podać dlugoscDipola [m] (patrz EmitujacyObwod.poleBliskie).
+        """
+        if f is None:
+            f = self.obwod.f
+        f = np.ravel(f)
+        
+        def oblicz():
+            wynik = wyniki.WynikObliczen(\
+                osie = (('x', x), ('y', y), ('z', z), ('f', f), ('skladowa', ['x', 'y', 'z'])),\
+                plik = plik,\
+                metadane = {'geometria': self.obwod.skrot(), 'dlugoscDipola': dlugoscDipola})
+            punktyWyniku = wynik.dane.reshape(-1, f.size, 3)            # widok, bez kopiowania
+            with instrumentacja.etap('Rozwiazanie.przemiatanieObjetosci',len(punktyWyniku),f.size):
+                for punktyPorcji, czestotliwosci, E in self.przemiatanieObjetosci(\
+                        x,y,z,f,liczbaProcesow,dlugoscDipola):
+                    punktyWyniku[punktyPorcji, czestotliwosci] = E
+            if plik is not None:
+                wynik.dane.flush()
+            return wynik
+        
+        if pamiec is None:
+            return oblicz()
+        return pamiec.oblicz(self.kluczMapy(x,y,z,f,dlugoscDipola), oblicz)
+        
+    def kluczMapy(self,x,y,z,f,dlugoscDipola=None):
+        'Klucz mapy pola w pamięci wyników: geometria, stałe, pobudzenie i siatka obliczeń.'
+        return wyniki.skrot('zadanie1.mapaPola',\
+            self.obwod.skrot(),\
+            (Constants.c0, Constants.c, Constants.Eps, Constants.q0, t),\
+            np.asarray(x, dtype=float),\
+            np.asarray(y, dtype=float),\
+            np.asarray(z, dtype=float),\
+            np.asarray(f, dtype=float),\
+            dlugoscDipola)
+        
+    @instrumentacja.mierz('Rozwiazanie.rysujRozwiazanie')
+    def rysujRozwiazanie(self,dane):
+        """
+        Rysuje rozwiązanie zadania pierwszego (wynik poleE) na wykresach polarnych,
+        po jednym dla każdej częstotliwości. Matplotlib ładowany jest dopiero tutaj,
+        aby same obliczenia nie wymagały bibliotek graficznych.
+        """
+        import matplotlib.pyplot as plt
+        
+        dane = np.asarray(dane)                        # wiersze - punkty, kolumny - częstotliwości
+        theta = np.asarray(self.listaKatow)            # zamiana na typ array, oś theta
+        
+        for indeks, f in enumerate(self.obwod.f):
+            plt.figure()
+            
+            r = dane[:, indeks]                # oś r, widok kolumny bez kopiowania
+            
+            tytul = 'Czestotliwosc ' + '{:.2e}'.format(f) + '[Hz]'
+            plt.title(tytul)
+            plt.ylabel('Pole E [V/m]')
+            plt.ticklabel_format(style='sci')
+            plt.polar(theta,r)                # rysuj wykres polarny
+        
+def _zlotyPodzial(funkcja,a,b,tolerancja):
+    """
+    Maksimum funkcji jednej zmiennej w przedziale [a, b] metodą złotego podziału.
+    Zwraca krotkę (x, funkcja(x), liczba obliczeń funkcji).
+    """
+    wspolczynnik = (sqrt(5.0).real - 1.0)/2.0
+    c = b - wspolczynnik*(b - a)
+    d = a + wspolczynnik*(b - a)
+    fc, fd = funkcja(c), funkcja(d)
+    obliczenia = 2
+    while b - a > tolerancja:
+        if fc > fd:
+            b, d, fd = d, c, fc
+            c = b - wspolczynnik*(b - a)
+            fc = funkcja(c)
+        else:
+            a, c, fc = c, d, fd
+            d = a + wspolczynnik*(b - a)
+            fd = funkcja(d)
+        obliczenia += 1
+    x = 0.5*(a + b)
+    return x, funkcja(x), obliczenia + 1
+
+def parametryPolarne(srodki,kierunki):
+    """
+    Przelicza środki (S,3) i kierunki (S,3) odcinków leżących na płaszczyźnie XY na parametry
+    dipoli w konwencji EmitujacyObwod: kąt theta kierunku prądu mierzony od osi y w stronę osi x
+    oraz odległość r środka odcinka od bieguna. Zwraca krotkę (theta, r) [rad], [m].
+    """
+    theta = np.arctan2(kierunki[:, 0], kierunki[:, 1]) % (2.0*pi.real)
+    r = np.sqrt((srodki**2).sum(axis=1))
+    return theta, r
+
+def punktyZadania(theta,phi,r):
+    """
+    Przelicza punkty zadane w konwencji kątów zadania (theta w płaszczyźnie obwodu od osi y
+    w stronę osi x, phi jako odchylenie od płaszczyzny obwodu, patrz katyZNEC) na punkty.ZbiorPunktow.
+    Tablice theta, phi, r są rozgłaszane do wspólnego kształtu i spłaszczane.
+    """
+    return punkty.ZbiorPunktow.zeSferycznych(np.add(phi, 0.5*pi.real), np.subtract(0.5*pi.real, theta), r)
+
+def wersorThetaZadania(theta,phi):
+    'Wersory kierunku rosnącego kąta theta zadania (..., 3) w punktach o kątach zadania theta, phi.'
+    wersorR, wersorTheta, wersorPhi = punkty.wersorySferyczne(np.add(phi, 0.5*pi.real), np.subtract(0.5*pi.real, theta))
+    return -wersorPhi
+
+def katyZNEC(thetaNEC,phiNEC):
+    """
+    Przelicza kąty wzoru promieniowania NEC (theta od osi z, phi od osi x w płaszczyźnie XY)
+    na kąty zadania: theta mierzone w płaszczyźnie obwodu od osi y w stronę osi x
+    oraz phi jako odchylenie od płaszczyzny obwodu. Zwraca krotkę (listaTheta, listaPhi) [rad].
+    """
+    listaTheta = (0.5*pi.real - np.asarray(phiNEC, dtype=float)) % (2.0*pi.real)
+    listaPhi = np.asarray(thetaNEC, dtype=float) - 0.5*pi.real
+    return listaTheta, listaPhi
+
+# Obsługa puli procesów w trybie równoległym
+_obwodProcesu = None            # obwód i odległość przekazane do procesu roboczego puli
+_rProcesu = None
+
+def _inicjalizujProces(obwod,r):
+    'Zapamiętuje w procesie roboczym obwód i odległość, aby nie przesyłać ich z każdą porcją.'
+    global _obwodProcesu, _rProcesu
+    _obwodProcesu = obwod
+    _rProcesu = r
+    
+def _poleEPorcji(porcja):
+    'Oblicza pole E dla jednej porcji (theta, phi, f) w procesie roboczym puli.'
+    theta, phi, porcjaF = porcja
+    return theta, phi, porcjaF, _obwodProcesu.poleE(theta,phi,_rProcesu,porcjaF)
+
+def _poleBliskiePorcji(porcja):
+    'Oblicza pełne pole E dla jednej porcji siatki objętościowej w procesie roboczym puli.'
+    punktyPorcji, czestotliwosci, xyz, porcjaF, dlugoscDipola = porcja
+    return punktyPorcji, czestotliwosci, _obwodProcesu.poleBliskie(xyz,porcjaF,dlugoscDipola)
+
 # Przydatne narzędzia
+@instrumentacja.mierz('transponuj')
 def transponuj(macierz):
     'Transponuje macierz.'
     return [list(i) for i in zip(*macierz)]
 
+# Tryb wsadowy (bez okien i bez pytań o dane)
+def wykonajZadanie(parametry):
+    """
+    Wykonuje jedno zadanie obliczeniowe opisane słownikiem parametrów i zapisuje wynik
+    do pliku tekstowego parametry['wyjscie'] w wierszach: theta [rad], phi [rad], |E| [V/m]
+    dla kolejnych częstotliwości. Plik z rozszerzeniem .npy lub .npz otrzymuje zespolony
+    wynik binarny (patrz Rozwiazanie.wynikWzoru i wyniki.WynikObliczen). Obsługiwane klucze:
+        odleglosc - [m] odległość obliczeń (wymagana, chyba że podano plik NEC z kartą RP),
+        czestotliwosci - [Hz] lista częstotliwości (domyślnie EmitujacyObwod.f lub karty FR),
+        rozdzielczosc - [stopień] rozdzielczość kąta theta (domyślnie siatka karty RP lub 1),
+        phi - [rad] kąt phi obliczeń (domyślnie 0),
+        nec - plik NEC z geometrią obwodu,
+        procesy - liczba procesów roboczych (domyślnie 1),
+        model - model pola obwodu: 'biegunowy' (domyślny) lub 'geometryczny',
+        pamiec - katalog trwałej pamięci wyników (patrz pamiecWynikow.PamiecWynikow).
+    Zwraca nazwę pliku wyniku.
+    """
+    odleglosc = wsadowe.parametr(parametry, 'odleglosc', float)                # [m]
+    if parametry.get('nec'):
+        rozwiazanie = Rozwiazanie.zPlikuNEC(parametry['nec'],r=odleglosc)
+    elif odleglosc is None:
+        raise ValueError("Brak parametru zadania 'odleglosc' (wymagany bez pliku NEC)")
+    else:
+        rozwiazanie = Rozwiazanie(r=odleglosc)
+    if 'czestotliwosci' in parametry:
+        rozwiazanie.obwod.f = tuple(float(f) for f in parametry['czestotliwosci'])
+    rozwiazanie.phi = wsadowe.parametr(parametry, 'phi', float, rozwiazanie.phi)
+    rozwiazanie.obwod.model = parametry.get('model', rozwiazanie.obwod.model)
+    
+    if parametry.get('nec') and 'rozdzielczosc' not in parametry:
+        listaTheta, listaPhi = rozwiazanie.katyNEC
+    else:
+        rozdzielczosc = wsadowe.parametr(parametry, 'rozdzielczosc', float, Rozwiazanie.rozdzielczoscTheta)    # [stopien]
+        listaTheta = (pi.real/180.0) * np.arange(0.0, 360.0 + 0.5*rozdzielczosc, rozdzielczosc)    # [rad]
+        listaPhi = np.array([rozwiazanie.phi])
+    liczbaProcesow = wsadowe.parametr(parametry, 'procesy', int, 1)
+    pamiec = pamiecWynikow.PamiecWynikow(parametry['pamiec']) if parametry.get('pamiec') else None
+    if parametry['wyjscie'].endswith(('.npy', '.npz')):
+        # zapis binarny: do .npy bezpośrednio przez odwzorowanie w pamięci
+        plik = parametry['wyjscie'] if parametry['wyjscie'].endswith('.npy') else None
+        wynik = rozwiazanie.wynikWzoru(listaTheta,listaPhi,None,liczbaProcesow,plik,pamiec)
+        if wynik.plik != parametry['wyjscie']:
+            wynik.zapisz(parametry['wyjscie'])
+        return parametry['wyjscie']
+    E = rozwiazanie.wynikWzoru(listaTheta,listaPhi,None,liczbaProcesow,None,pamiec).dane
+    
+    theta, phi = np.meshgrid(listaTheta, listaPhi, indexing='ij')
+    naglowek = 'theta[rad] phi[rad] ' + ' '.join('|E|(f={:.6e}Hz)'.format(f) for f in rozwiazanie.obwod.f)
+    np.savetxt(parametry['wyjscie'],\
+        np.column_stack((theta.ravel(), phi.ravel(), np.abs(E).reshape(-1, E.shape[-1]))),\
+        fmt='%.9e', header=naglowek)
+    return parametry['wyjscie']
+    
+def wykonajZadania(plikZadan,katalog='.'):
+    'Wykonuje zadania z pliku JSONL (patrz wsadowe.wykonajZadania). Zwraca liczbę wykonanych zadań.'
+    return wsadowe.wykonajZadania(wykonajZadanie,plikZadan,katalog)
+    
+def wierszPolecen(argumenty=None):
+    'Obsługa wiersza poleceń trybu wsadowego (patrz wsadowe.wierszPolecen). Zwraca kod wyjścia programu.'
+    parser = argparse.ArgumentParser(description=\
+        'Natężenie pola E w strefie dalekiej od ścieżek na płytce PCB (zadanie 1), bez okien.')
+    parser.add_argument('-r', '--odleglosc', type=float, help='[m] odległość obliczeń od obwodu')
+    parser.add_argument('-f', '--czestotliwosci', type=float, nargs='+', help='[Hz] lista częstotliwości')
+    parser.add_argument('--rozdzielczosc', type=float, help='[stopień] rozdzielczość kąta theta')
+    parser.add_argument('--phi', type=float, help='[rad] kąt phi obliczeń')
+    parser.add_argument('--nec', help='plik NEC z geometrią obwodu')
+    parser.add_argument('--procesy', type=int, default=1, help='liczba procesów roboczych')
+    parser.add_argument('--model', choices=('biegunowy', 'geometryczny'), help='model pola obwodu')
+    
+    def sprawdz(parser,argumenty):
+        if argumenty.odleglosc is None and argumenty.nec is None:
+            parser.error("podaj --odleglosc, --nec lub --zadania")
+    
+    return wsadowe.wierszPolecen(parser,wykonajZadanie,argumenty,sprawdz)
+
 if __name__ == '__main__':
     
+    if len(sys.argv) > 1:
+        sys.exit(wierszPolecen())
+    
     print("W jakiej odległości od promieniującego obwodu obliczyć pole E? (np. 30.0E4)")
     odleglosc = float(input("Podaj wartość w metrach [m]: "))
     print("")
@@ -271,23 +1317,7 @@ if __name__ == '__main__':
     rozwiazanie = Rozwiazanie(r=odleglosc)
     
     dane = rozwiazanie.poleE()
-    dane = transponuj(dane)
-    theta = rozwiazanie.listaKatow                
-    
-    indeks = 0
-    
-    for f in rozwiazanie.obwod.f:
-        plt.figure()
-        
-        theta = np.asarray(theta)            # zamiana na typ array, oś theta
-        r = np.asarray(dane[indeks])        # zamiana na typ array, oś r
-        
-        tytul = 'Czestotliwosc ' + '{:.2e}'.format(f) + '[Hz]'
-        plt.title(tytul)
-        plt.ylabel('Pole E [V/m]')
-        plt.ticklabel_format(style='sci')
-        plt.polar(theta,r)                # rysuj wykres polarny
-        indeks += 1
+    rozwiazanie.rysujRozwiazanie(dane)
         
     print("Przybliżenie oparte na prostych wzorach załamuje się dla większych częstotliwości,\n \
         ponieważ dla większych częstotliwości nie jest spełniony warunek na znacznie większą\n \
@@ -296,4 +1326,5 @@ if __name__ == '__main__':
         500 MHz długość fali w próżni to {:.3e} [m], co jest porównywalnym wymiarem z rozmiarami\n \
         badanego obwodu.".format(Constants.c0/500.0E6))
     
+    import matplotlib.pyplot as plt
     plt.show()
@@ -13,10 +13,20 @@
 #podstawie długości jednej sekcji oszacować maksymalną częstotliwość analizy i przeprowadzić
 #obliczenia tylko do tej częstotliwości.
 
+# Biblioteki graficzne (matplotlib, visual) ładowane są dopiero w funkcjach rysujących,
+# aby obliczenia linii TEM można było importować bez nich.
+
 from math import log,pi
-import matplotlib.pyplot as plt
+import argparse
+import sys
+from collections import namedtuple
 import numpy as np
-import visual as v
+import instrumentacja
+import pamiecWynikow
+import przebiegi
+import punkty
+import wsadowe
+import wyniki
 
 class Constants:
     """Stałe potrzebne do jednoznacznego rozwiązania zadania."""
@@ -49,6 +59,22 @@ class UkladKartezjanski:
     #'Sprawdzenie ortogalnosci wektorow w ukladzie kartezjanskim.'
     #if ()
 
+def falePlaskie(theta,phi,polaryzacja=0.0):
+    """
+    Tworzy tablice wektorów (k, E, H) fal płaskich dla kierunków padania zadanych kątami
+    theta (od osi z) i phi (od osi x) [rad] oraz kąta polaryzacji [rad] mierzonego od
+    wersora theta w stronę wersora phi. Argumenty są rozgłaszane do wspólnego kształtu
+    (np. siatki kierunków) i spłaszczane do N fal; wynikiem są trzy tablice o kształcie (N, 3) z wersorami k, E i H = k x E,
+    gotowe do użycia w LiniaTEM.odpowiedzFalWielu.
+    """
+    theta, phi, polaryzacja = (np.ravel(x).astype(float) for x in np.broadcast_arrays(theta, phi, polaryzacja))
+    # fala nadbiega z kierunku (theta, phi), więc propaguje się ku początkowi układu
+    wersorR, wersorTheta, wersorPhi = punkty.wersorySferyczne(theta, phi)
+    k = -wersorR
+    E = np.cos(polaryzacja)[:, np.newaxis]*wersorTheta + np.sin(polaryzacja)[:, np.newaxis]*wersorPhi
+    H = np.cross(k, E)
+    return k, E, H
+
 class FalaPlaska():
     """
     Model fali płaskiej TEM rozchodzącej się w ośrodku izotropowym. Częstotliwość fali może być zewnętrznie zmieniana.
@@ -78,6 +104,7 @@ class LiniaTEM():
     Rne = 50.0                    # [Ohm] obciążenie linii TEM, na wrotach wejściowych pierwszego segmentu
     Rfe = 50.0                     # [Ohm] drugie obciążenie linii TEM, na wrotach wyjściowych ostatniego segmentu
     
+    @instrumentacja.mierz('LiniaTEM.__init__')
     def __init__(self):
         'Utworzenie linii 2-przewodowej z segmentów krótkich linii TEM.'
         
@@ -87,41 +114,187 @@ class LiniaTEM():
             self.SegmentTEM(UkladKartezjanski(1.0,0.0,0.0)),\
             self.SegmentTEM(UkladKartezjanski(0.0,-1.0,0.0))\
             )
+        self.pamiecTransmitancji = None        # (klucz, współczynniki) ostatnio obliczonych transmitancji
         
-    def Vne(self, falaPadajaca):
+    def Vne(self, falaPadajaca, f=None):
         """
         Obliczenie napięcia indukowanego przez falę padającą na linię TEM
         na obciążeniu Rne (na wrotach wejściowych pierwszego segmentu).
         Z uwagi na uproszczony, czyli pozbawiony elementów biernych, model 
         linii, mogę prosto zsumować wszystkie źródła napięciowe i prądowe w obwodzie.
+        Podanie tablicy częstotliwości f zwraca całe widmo napięcia (domyślnie falaPadajaca.f).
         """
         V = 0.0                # [V] napięcie wypadkowe indukowany przez pole magnetyczne na linii TEM
         I = 0.0                # [I] prąd wypadkowy powodowany przez pole elektryczne na linii TEM
         Rne = self.Rne
         Rfe = self.Rfe
         for segment in self.segmenty:
-            V += segment.V(falaPadajaca)
-            I += segment.I(falaPadajaca)
+            V += segment.V(falaPadajaca, f)
+            I += segment.I(falaPadajaca, f)
         Vne = (Rne)/(Rne+Rfe)*V - (Rne*Rfe)/(Rne+Rfe)*I
         return Vne
         
-    def Vfe(self, falaPadajaca):
+    def Vfe(self, falaPadajaca, f=None):
         """
         Obliczenie napięcia indukowanego przez falę padającą na linię TEM
         na obciążeniu Rfe (na wrotach wyjściowych ostatniego segmentu).
         Z uwagi na uproszczony, czyli pozbawiony elementów biernych, model 
         linii, mogę prosto zsumować wszystkie źródła napięciowe i prądowe w obwodzie.
+        Podanie tablicy częstotliwości f zwraca całe widmo napięcia (domyślnie falaPadajaca.f).
         """
         V = 0.0                # [V] napięcie wypadkowe indukowany przez pole magnetyczne na linii TEM
         I = 0.0                # [I] prąd wypadkowy powodowany przez pole elektryczne na linii TEM
         Rne = self.Rne
         Rfe = self.Rfe
         for segment in self.segmenty:
-            V += segment.V(falaPadajaca)
-            I += segment.I(falaPadajaca)
+            V += segment.V(falaPadajaca, f)
+            I += segment.I(falaPadajaca, f)
         Vfe = -(Rfe)/(Rne+Rfe)*V - (Rne*Rfe)/(Rne+Rfe)*I
         return Vfe
     
+    def odpowiedz(self, falaPadajaca, f=None):
+        """
+        Wspólne obliczenie odpowiedzi linii TEM na falę padającą.
+        Zwraca krotkę (Vne, Vfe, V, I): napięcia na obciążeniach Rne i Rfe oraz wypadkowe
+        źródło napięciowe V i prądowe I linii. Dla tablicy częstotliwości f (domyślnie
+        falaPadajaca.f) wszystkie wielkości są tablicami widma. Każdy punkt częstotliwości
+        to jedno mnożenie przez współczynniki z transmitancje().
+        """
+        if f is None:
+            f = falaPadajaca.f
+        jw = 1j * 2.0*pi*np.asarray(f)            # [rad/s] pulsacja pomnożona przez j
+        Kne, Kfe, KV, KI = self.transmitancje(falaPadajaca)
+        return jw*Kne, jw*Kfe, jw*KV, jw*KI
+        
+    @instrumentacja.mierz('LiniaTEM.transmitancje')
+    def transmitancje(self, falaPadajaca):
+        """
+        Zwraca niezależne od częstotliwości współczynniki linii (Kne, Kfe, KV, KI), takie że
+        Vne = jw*Kne, Vfe = jw*Kfe, V = jw*KV, I = jw*KI. Współczynniki są zapamiętywane
+        dla ostatniej fali padającej i przeliczane, gdy zmieni się fala (wektory k, E, H),
+        geometria segmentów lub obciążenia linii.
+        """
+        klucz = self._kluczTransmitancji(falaPadajaca)
+        pamiec = self.pamiecTransmitancji        # jeden odczyt - wpis może podmienić inny wątek
+        if pamiec is not None and pamiec[0] == klucz:
+            return pamiec[1]
+        KV = 0.0                # [V*s] współczynnik wypadkowego źródła napięciowego linii
+        KI = 0.0                # [A*s] współczynnik wypadkowego źródła prądowego linii
+        Rne = self.Rne
+        Rfe = self.Rfe
+        for segment in self.segmenty:
+            wspV, wspI = segment.wspolczynniki(falaPadajaca)
+            KV += wspV
+            KI += wspI
+        Kne = (Rne)/(Rne+Rfe)*KV - (Rne*Rfe)/(Rne+Rfe)*KI
+        Kfe = -(Rfe)/(Rne+Rfe)*KV - (Rne*Rfe)/(Rne+Rfe)*KI
+        self.pamiecTransmitancji = (klucz, (Kne, Kfe, KV, KI))
+        return Kne, Kfe, KV, KI
+        
+    def polozeniaSegmentow(self):
+        """
+        Zwraca krotkę (poczatki, kierunki, dlugosci): początki segmentów (S, 3) [m], wersory
+        ich kierunków (S, 3) i długości (S,) [m]. Segmenty ułożone są jeden za drugim,
+        od wrót wejściowych (Rne) w początku układu do wrót wyjściowych (Rfe).
+        """
+        kierunki = np.array([(s.kierunek.x, s.kierunek.y, s.kierunek.z) for s in self.segmenty], dtype=float)
+        kierunki /= np.sqrt((kierunki**2).sum(axis=1))[:, np.newaxis]
+        dlugosci = np.array([s.B for s in self.segmenty], dtype=float)
+        przesuniecia = kierunki * dlugosci[:, np.newaxis]
+        return np.cumsum(przesuniecia, axis=0) - przesuniecia, kierunki, dlugosci
+
+    def podzielona(self, liczbaCzesci):
+        'Zwraca nową linię o tym samym przebiegu, w której każdy segment podzielono na liczbaCzesci równych części.'
+        linia = LiniaTEM.__new__(LiniaTEM)
+        linia.Rne = self.Rne
+        linia.Rfe = self.Rfe
+        segmenty = []
+        for segment in self.segmenty:
+            for numer in range(liczbaCzesci):
+                czesc = self.SegmentTEM(segment.kierunek)
+                czesc.B = segment.B / liczbaCzesci
+                segmenty.append(czesc)
+        linia.segmenty = tuple(segmenty)
+        linia.pamiecTransmitancji = None
+        return linia
+
+    @instrumentacja.mierz('LiniaTEM.odpowiedzMTL')
+    def odpowiedzMTL(self, falaPadajaca, f=None):
+        """
+        Odpowiedź linii na falę padającą w modelu linii długiej (MTL). Każdy segment to odcinek
+        bezstratnej linii o indukcyjności L i pojemności C na jednostkę długości, opisany macierzą
+        łańcuchową (ABCD), z rozłożonymi wzdłuż segmentu źródłami napięciowymi i prądowymi
+        pobudzanymi falą padającą (z uwzględnieniem zmiany jej fazy wzdłuż linii). Segmenty
+        łączone są kaskadowo, a napięcia wyznaczane z warunków brzegowych na Rne i Rfe.
+        Model nie wymaga warunku lambda > 8*B, a dla małych częstotliwości pokrywa się z odpowiedz().
+        Wszystkie częstotliwości liczone są naraz: jedno przejście po segmentach to iloczyny
+        stosów macierzy 2x2. Zwraca krotkę (Vne, Vfe, V, I) jak odpowiedz(), gdzie V i I
+        to zastępcze źródło napięciowe i prądowe całej linii.
+        """
+        if f is None:
+            f = falaPadajaca.f
+        return odpowiedzLiniiDlugiej(self.geometria(), wektoryFali(falaPadajaca), f)
+
+    def geometria(self):
+        'Niezmienna kopia geometrii i obciążeń linii (GeometriaLinii) do obliczeń bezstanowych.'
+        poczatki, kierunki, dlugosci = self.polozeniaSegmentow()
+        rzuty = [segment.wektoryRzutowania() for segment in self.segmenty]
+        return GeometriaLinii(\
+            poczatki = tablicaTylkoDoOdczytu(poczatki),\
+            kierunki = tablicaTylkoDoOdczytu(kierunki),\
+            dlugosci = tablicaTylkoDoOdczytu(dlugosci),\
+            C = tablicaTylkoDoOdczytu([segment.C for segment in self.segmenty]),\
+            s = tablicaTylkoDoOdczytu([segment.s for segment in self.segmenty]),\
+            rzutyH = tablicaTylkoDoOdczytu([rzutH for rzutH, rzutE in rzuty]).reshape(-1, 3),\
+            rzutyE = tablicaTylkoDoOdczytu([rzutE for rzutH, rzutE in rzuty]).reshape(-1, 3),\
+            Rne = float(self.Rne),\
+            Rfe = float(self.Rfe))
+
+    def skrot(self):
+        'Stabilny skrót geometrii i obciążeń linii.'
+        segmenty = tuple(\
+            (s.kierunek.x, s.kierunek.y, s.kierunek.z, s.B, s.s, s.d, s.C) for s in self.segmenty)
+        return wyniki.skrot(segmenty, self.Rne, self.Rfe)
+        
+    def odpowiedzFalWielu(self, k, E, H, f):
+        """
+        Wektorowe obliczenie napięć na obciążeniach dla wielu fal padających naraz.
+        k, E, H to tablice (W, 3) wektorów fal (jak w FalaPlaska), f tablica F częstotliwości.
+        Zwraca krotkę (Vne, Vfe) zespolonych tablic o kształcie (W, F).
+        """
+        k = np.asarray(k, dtype=float).reshape(-1, 3)
+        E = np.asarray(E, dtype=float).reshape(-1, 3)
+        H = np.asarray(H, dtype=float).reshape(-1, 3)
+        # sprawdzenie czy fale są TEM (z tolerancją na zaokrąglenia)
+        for nazwa, a, b in (('k i E', k, E), ('k i H', k, H), ('E i H', E, H)):
+            iloczyn = np.abs((a*b).sum(axis=1))
+            skala = np.sqrt((a*a).sum(axis=1) * (b*b).sum(axis=1))
+            if np.any(iloczyn > 1.0E-9*skala):
+                raise Exception("Wektory " + nazwa + " nie są ortogonalne! To nie jest fala TEM!")
+        
+        # współczynniki linii jako funkcje liniowe składowych wektorów E i H fal
+        wspH = np.zeros(3)
+        wspE = np.zeros(3)
+        for segment in self.segmenty:
+            rzutH, rzutE = segment.wektoryRzutowania()
+            wspH += rzutH * Constants.Mi * segment.B*segment.s
+            wspE += rzutE * segment.C * segment.B*segment.s
+        KV = punkty.rzut(H, wspH) * Constants.H            # (W,)
+        KI = punkty.rzut(E, wspE) * Constants.E            # (W,)
+        Rne = self.Rne
+        Rfe = self.Rfe
+        Kne = (Rne)/(Rne+Rfe)*KV - (Rne*Rfe)/(Rne+Rfe)*KI
+        Kfe = -(Rfe)/(Rne+Rfe)*KV - (Rne*Rfe)/(Rne+Rfe)*KI
+        jw = 1j * 2.0*pi*np.asarray(f, dtype=float).ravel()
+        return np.outer(Kne, jw), np.outer(Kfe, jw)
+        
+    def _kluczTransmitancji(self, falaPadajaca):
+        'Klucz opisujący falę padającą, geometrię i obciążenia linii, od których zależą transmitancje.'
+        fala = tuple((w.x, w.y, w.z) for w in (falaPadajaca.k, falaPadajaca.E, falaPadajaca.H))
+        segmenty = tuple(\
+            (s.kierunek.x, s.kierunek.y, s.kierunek.z, s.B, s.s, s.C) for s in self.segmenty)
+        return (fala, segmenty, self.Rne, self.Rfe, Constants.E, Constants.H, Constants.Mi)
+    
     class SegmentTEM():
         """
         Segment krótkiej linii TEM, modelowany jako źródło napięciowe i prądowe.
@@ -141,34 +314,178 @@ class LiniaTEM():
             """
             self.C = (pi*Constants.Eps) / (log((2.0*self.s) / (self.d)))    # [F] pojemność własna segmentu
             self.kierunek = kierunekSegmentu                                # kierunek segmentu w układzie kartezjańskim
-            self.H = None                                                    # pole magnetyczne indukujące napięcie w segmencie
-            self.E = None                                                    # pole elektryczne powodujące przepływ prądu zmiennego w segmencie
-            self.f = None                                                    # częstotliwość fali oświetlającej segment
             
-        def V(self,falaPadajaca):
-            'Obliczenie wartości źródła napięciowego spowodowanego zmiennym polem magnetycznym (wedle prawa Faradaya).'
+        def wektoryRzutowania(self):
+            """
+            Zwraca wektory (rzutH, rzutE) wybierające składowe pola H i E fali, które
+            indukują źródła segmentu (zgodnie z orientacją segmentu, jak w V oraz I).
+            """
+            if self.kierunek.x != 0.0:
+                return np.array([0.0, 1.0, 0.0]), np.array([0.0, 0.0, 1.0])
+            elif self.kierunek.y != 0.0:
+                return np.array([1.0, 0.0, 0.0]), np.array([0.0, 0.0, 1.0])
+            return np.zeros(3), np.zeros(3)
+            
+        def wspolczynniki(self,falaPadajaca):
+            """
+            Zwraca niezależne od częstotliwości współczynniki (wspV, wspI) źródeł segmentu,
+            takie że V = jw*wspV oraz I = jw*wspI. Nie zmienia stanu segmentu.
+            """
             if self.kierunek.x != 0.0:
-                self.H = falaPadajaca.H.y * Constants.H
+                H = falaPadajaca.H.y * Constants.H
+                E = falaPadajaca.E.z * Constants.E
             elif self.kierunek.y != 0.0:
-                self.H = falaPadajaca.H.x * Constants.H
+                H = falaPadajaca.H.x * Constants.H
+                E = falaPadajaca.E.z * Constants.E
             else:
-                self.H = 0.0
-            f = falaPadajaca.f
-            V = 1j * 2.0*pi*f * Constants.Mi * self.H * self.B*self.s
+                H = 0.0
+                E = 0.0
+            return Constants.Mi * H * self.B*self.s, self.C * E * self.B*self.s
+            
+        def V(self,falaPadajaca,f=None):
+            """
+            Obliczenie wartości źródła napięciowego spowodowanego zmiennym polem magnetycznym (wedle prawa Faradaya).
+            Dla tablicy częstotliwości f zwraca tablicę wartości źródła (domyślnie f = falaPadajaca.f).
+            Nie zmienia stanu segmentu.
+            """
+            if self.kierunek.x != 0.0:
+                H = falaPadajaca.H.y * Constants.H            # pole magnetyczne indukujące napięcie w segmencie
+            elif self.kierunek.y != 0.0:
+                H = falaPadajaca.H.x * Constants.H
+            else:
+                H = 0.0
+            if f is None:
+                f = falaPadajaca.f
+            V = 1j * 2.0*pi*f * Constants.Mi * H * self.B*self.s
             return V
             
-        def I(self,falaPadajaca):
-            'Oblicza wartość źródła prądowego spowodowanego zmiennym polem elektrycznym.'
+        def I(self,falaPadajaca,f=None):
+            """
+            Oblicza wartość źródła prądowego spowodowanego zmiennym polem elektrycznym.
+            Dla tablicy częstotliwości f zwraca tablicę wartości źródła (domyślnie f = falaPadajaca.f).
+            Nie zmienia stanu segmentu.
+            """
             if self.kierunek.x != 0.0:
-                self.E = falaPadajaca.E.z * Constants.E
+                E = falaPadajaca.E.z * Constants.E            # pole elektryczne powodujące przepływ prądu w segmencie
             elif self.kierunek.y != 0.0:
-                self.E = falaPadajaca.E.z * Constants.E
+                E = falaPadajaca.E.z * Constants.E
             else:
-                self.E = 0.0
-            f = falaPadajaca.f
-            I = 1j * 2.0*pi*f * self.C * self.E * self.B*self.s
+                E = 0.0
+            if f is None:
+                f = falaPadajaca.f
+            I = 1j * 2.0*pi*f * self.C * E * self.B*self.s
             return I
             
+# Obliczenia bezstanowe: niezmienne opisy linii i fali oraz czyste funkcje odpowiedzi,
+# które niczego nie zapisują w obiektach, więc mogą działać współbieżnie na wspólnej geometrii.
+
+# Geometria linii: początki (S,3) [m], wersory kierunków (S,3) i długości (S,) [m] segmentów,
+# pojemności jednostkowe C (S,) [F/m], odstępy przewodów s (S,) [m], wektory rzutowania pól
+# H i E fali (S,3) (patrz SegmentTEM.wektoryRzutowania) oraz obciążenia Rne, Rfe [Ohm].
+GeometriaLinii = namedtuple('GeometriaLinii', 'poczatki kierunki dlugosci C s rzutyH rzutyE Rne Rfe')
+
+# Fala płaska: wektory k, E, H jako trzyelementowe krotki (jak składowe FalaPlaska).
+WektoryFali = namedtuple('WektoryFali', 'k E H')
+
+def tablicaTylkoDoOdczytu(tablica,typ=float):
+    'Kopia tablicy (o typie elementów typ) zabezpieczona przed zapisem.'
+    tablica = np.array(tablica, dtype=typ)
+    tablica.flags.writeable = False
+    return tablica
+
+def wektoryFali(falaPadajaca):
+    'Niezmienna kopia wektorów fali płaskiej (WektoryFali).'
+    return WektoryFali(*[(float(w.x), float(w.y), float(w.z))\
+        for w in (falaPadajaca.k, falaPadajaca.E, falaPadajaca.H)])
+
+def odpowiedzLiniiSkupionej(geometria, fala, f):
+    """
+    Bezstanowa wersja LiniaTEM.odpowiedz dla geometrii GeometriaLinii, fali WektoryFali
+    i tablicy częstotliwości f. Zwraca krotkę (Vne, Vfe, V, I) o kształcie f.
+    """
+    H = punkty.rzut(geometria.rzutyH, fala.H) * Constants.H                        # [A/m]
+    E = punkty.rzut(geometria.rzutyE, fala.E) * Constants.E                        # [V/m]
+    KV = (Constants.Mi * H * geometria.dlugosci*geometria.s).sum()
+    KI = (geometria.C * E * geometria.dlugosci*geometria.s).sum()
+    Rne = geometria.Rne
+    Rfe = geometria.Rfe
+    Kne = (Rne)/(Rne+Rfe)*KV - (Rne*Rfe)/(Rne+Rfe)*KI
+    Kfe = -(Rfe)/(Rne+Rfe)*KV - (Rne*Rfe)/(Rne+Rfe)*KI
+    jw = 1j * 2.0*pi*np.asarray(f, dtype=float)
+    return jw*Kne, jw*Kfe, jw*KV, jw*KI
+
+def odpowiedzLiniiDlugiej(geometria, fala, f):
+    """
+    Bezstanowa wersja LiniaTEM.odpowiedzMTL dla geometrii GeometriaLinii, fali WektoryFali
+    i tablicy częstotliwości f. Zwraca krotkę (Vne, Vfe, V, I) o kształcie f.
+    """
+    f = np.asarray(f, dtype=float)
+    ksztalt = f.shape
+    omega = 2.0*pi*f.ravel()                                # [rad/s]
+    beta = omega / Constants.c                                # [rad/m] stała fazowa
+
+    poczatki, kierunki, dlugosci = geometria.poczatki, geometria.kierunki, geometria.dlugosci
+    k = np.array(fala.k, dtype=float)
+    k /= np.sqrt(k.dot(k))
+    C, s = geometria.C, geometria.s                                            # [F/m], [m]
+    Hn = punkty.rzut(geometria.rzutyH, fala.H) * Constants.H                    # [A/m]
+    Et = punkty.rzut(geometria.rzutyE, fala.E) * Constants.E                    # [V/m]
+
+    # Segmenty o tych samych parametrach różnią się jedynie fazą fali padającej na ich
+    # początku, więc funkcje częstotliwości liczone są raz dla każdego rodzaju segmentu.
+    rodzaje, numery = np.unique(np.column_stack((kierunki, dlugosci, C, s, Hn, Et)),\
+        axis=0, return_inverse=True)
+    kierunki, dlugosci, C, s, Hn, Et = (rodzaje[:, :3],) + tuple(rodzaje[:, 3:].T)
+    Zc = np.sqrt(Constants.Mi*Constants.Eps) / C[:, np.newaxis]            # [Ohm] impedancja falowa, sqrt(L/C)
+    B = dlugosci[:, np.newaxis]
+    betaB = B * beta
+    gamma = np.outer(punkty.rzut(kierunki, k), beta)                        # [rad/m] zmiana fazy fali wzdłuż segmentu
+
+    def calka(a):
+        'Całka exp(-j*a*x) po długości segmentu, podzielona przez tę długość.'
+        return np.exp(-0.5j*a*B) * np.sinc(a*B/(2.0*pi))
+
+    # źródła rozłożone (na jednostkę długości, dla fazy zerowej na początku segmentu)
+    # przeniesione macierzą łańcuchową na koniec segmentu: całki z cos i sin ważonych fazą fali
+    zrodloV = -1j*omega * (Constants.Mi*Hn*s)[:, np.newaxis]                # [V/m]
+    zrodloI = -1j*omega * (C*Et*s)[:, np.newaxis]                            # [A/m]
+    doPrzodu = np.exp(1j*betaB) * calka(beta + gamma)
+    doTylu = np.exp(-1j*betaB) * calka(gamma - beta)
+    P = 0.5*B * (doPrzodu + doTylu)
+    Q = -0.5j*B * (doPrzodu - doTylu)
+    VF = P*zrodloV - 1j*Zc*Q*zrodloI
+    IF = -1j*Q/Zc*zrodloV + P*zrodloI
+    krokFazy = np.exp(-1j*gamma*B)
+
+    # macierze łańcuchowe rodzajów segmentów element po elemencie: [[A, B], [C, A]]
+    A = np.cos(betaB).astype(complex)
+    sin = np.sin(betaB)
+    Bm = -1j*Zc*sin
+    Cm = -1j*sin/Zc
+
+    # kaskada: [V, I] na końcu linii = Phi [V, I] na początku + [VFt, IFt];
+    # iloczyny macierzy 2x2 liczone naraz dla wszystkich częstotliwości
+    Phi11 = np.ones(beta.size, dtype=complex)
+    Phi12 = np.zeros(beta.size, dtype=complex)
+    Phi21 = np.zeros(beta.size, dtype=complex)
+    Phi22 = np.ones(beta.size, dtype=complex)
+    VFt = np.zeros(beta.size, dtype=complex)
+    IFt = np.zeros(beta.size, dtype=complex)
+    faza = np.exp(-1j*beta*punkty.rzut(poczatki[0], k))
+    for numer in numery.ravel():
+        a, b, c = A[numer], Bm[numer], Cm[numer]
+        Phi11, Phi12, Phi21, Phi22 = a*Phi11 + b*Phi21, a*Phi12 + b*Phi22, c*Phi11 + a*Phi21, c*Phi12 + a*Phi22
+        VFt, IFt = a*VFt + b*IFt + VF[numer]*faza, c*VFt + a*IFt + IF[numer]*faza
+        faza = faza * krokFazy[numer]
+
+    # warunki brzegowe: V(0) = -Rne*I(0), V(koniec) = Rfe*I(koniec)
+    Rne = geometria.Rne
+    Rfe = geometria.Rfe
+    I0 = (Rfe*IFt - VFt) / (Phi12 - Rne*Phi11 - Rfe*Phi22 + Rne*Rfe*Phi21)
+    Vne = -Rne*I0
+    Vfe = (Phi12 - Rne*Phi11)*I0 + VFt
+    return Vne.reshape(ksztalt), Vfe.reshape(ksztalt), -VFt.reshape(ksztalt), -IFt.reshape(ksztalt)
+
 # -----------------------------------------------------------
 # Rozwiązanie zadania i rysowanie wyników na wykresie
 # -----------------------------------------------------------
@@ -187,6 +504,8 @@ class Rozwiazanie:
     
     punktyNaDekadeF = 10            # [Hz] ilość punktów na dekadę częstotliwości w których obliczane będą napięcia na linii TEM
     fmin = 1.0                        # [Hz] częstotliwość początkowa obliczeń
+    rozmiarPorcjiFal = 1024            # liczba fal padających obliczanych naraz w trybie wielu fal
+    model = 'skupiony'                # model linii: 'skupiony' (suma źródeł) lub 'mtl' (LiniaTEM.odpowiedzMTL)
     
     def __init__(self):
         """
@@ -204,36 +523,171 @@ class Rozwiazanie:
             f = self.fmin
         )
         
+    def czestotliwosci(self):
+        """
+        Wyznaczenie logarytmicznej siatki częstotliwości obliczeń od fmin do fmax (włącznie),
+        z punktyNaDekadeF punktami na dekadę.
+        """
+        fstart = log(self.fmin,10)        # [Hz] wykładnik częstotliwości początkowej obliczeń
+        fstop = log(self.fmax,10)        # [Hz] wykładnik częstotliwości końcowej obliczeń
+        return np.geomspace(\
+            start=self.fmin,\
+            stop=self.fmax,\
+            num=int(round(self.punktyNaDekadeF * (fstop - fstart))) + 1
+            )
+        
     def Vne(self):
         'Wyznaczenie zależności napięcia na obciążeniu Rne od częstotliwości podanej fali padającej.'
-        fstart = round(log(self.fmin,10))        # [Hz] wykładnik częstotliwości początkowej obliczeń
-        fstop = round(log(self.fmax,10))        # [Hz] wykładnik częstotliwości końcowej obliczeń
-        self.f = np.logspace(\
-            start=fstart,\
-            stop=fstop,\
-            num=self.punktyNaDekadeF * fstop
-            )
+        czestotliwosci = self.czestotliwosci()
         Vne = []                                # [V] lista obliczonych napięć na obciążeniu Rne
-        for f in self.f:
-            self.fala.f = f
-            Vne.append(self.linia.Vne(self.fala))
+        with instrumentacja.etap('Rozwiazanie.Vne',czestotliwosci=len(czestotliwosci)):
+            for f in czestotliwosci:
+                Vne.append(self.linia.Vne(self.fala, f))
         return Vne
         
     def Vfe(self):
         'Wyznaczenie zależności napięcia na obciążeniu Rfe od częstotliwości podanej fali padającej.'
-        fstart = round(log(self.fmin,10))        # [Hz] wykładnik częstotliwości początkowej obliczeń
-        fstop = round(log(self.fmax,10))        # [Hz] wykładnik częstotliwości końcowej obliczeń
-        self.f = np.logspace(\
-            start=fstart,\
-            stop=fstop,\
-            num=self.punktyNaDekadeF * fstop
-            )
+        czestotliwosci = self.czestotliwosci()
         Vfe = []                                # [V] lista obliczonych napięć na obciążeniu Rne
-        for f in self.f:
-            self.fala.f = f
-            Vfe.append(self.linia.Vfe(self.fala))
+        with instrumentacja.etap('Rozwiazanie.Vfe',czestotliwosci=len(czestotliwosci)):
+            for f in czestotliwosci:
+                Vfe.append(self.linia.Vfe(self.fala, f))
         return Vfe
         
+    def odpowiedz(self,f=None):
+        """
+        Wektorowe wyznaczenie odpowiedzi linii na falę padającą dla całej tablicy częstotliwości
+        naraz (domyślnie siatki z czestotliwosci()), w jednym przejściu po segmentach.
+        Zwraca krotkę zespolonych tablic NumPy (Vne, Vfe, V, I), patrz LiniaTEM.odpowiedz
+        lub - dla model = 'mtl' - LiniaTEM.odpowiedzMTL. Model 'mtl' pozostaje poprawny
+        także powyżej domyślnej fmax = c/(8B), którą można wtedy zwiększyć.
+        """
+        f = self.czestotliwosci() if f is None else np.asarray(f, dtype=float)
+        with instrumentacja.etap('Rozwiazanie.odpowiedz',czestotliwosci=f.size):
+            if self.model == 'mtl':
+                return self.linia.odpowiedzMTL(self.fala, f)
+            if self.model != 'skupiony':
+                raise Exception("Nieznany model linii: " + str(self.model))
+            return self.linia.odpowiedz(self.fala, f)
+        
+    @instrumentacja.mierz('Rozwiazanie.wynikOdpowiedzi')
+    def wynikOdpowiedzi(self,f=None,plik=None,pamiec=None):
+        """
+        Oblicza widma napięć Vne i Vfe (patrz odpowiedz) do wyniki.WynikObliczen o osiach
+        (wielkosc, f), z wektorami fali i skrótem geometrii linii w metadanych.
+        Przy podaniu pliku .npy wynik jest odwzorowany w pamięci na dysku.
+        Przy podaniu pamiec (pamiecWynikow.PamiecWynikow) wynik jest najpierw szukany w pamięci
+        pod kluczem kluczOdpowiedzi, a nowo obliczony jest w niej zapamiętywany.
+        """
+        f = self.czestotliwosci() if f is None else np.asarray(f, dtype=float)
+        
+        def oblicz():
+            Vne, Vfe, V, I = self.odpowiedz(f)
+            wynik = wyniki.WynikObliczen(\
+                osie = (('wielkosc', ['Vne', 'Vfe']), ('f', f)),\
+                plik = plik,\
+                metadane = {\
+                    'fala': [(w.x, w.y, w.z) for w in (self.fala.k, self.fala.E, self.fala.H)],\
+                    'geometria': self.linia.skrot(),\
+                    'model': self.model})
+            wynik.dane[0] = Vne
+            wynik.dane[1] = Vfe
+            if plik is not None:
+                wynik.dane.flush()
+            return wynik
+        
+        if pamiec is None:
+            return oblicz()
+        return pamiec.oblicz(self.kluczOdpowiedzi(f), oblicz)
+        
+    def kluczOdpowiedzi(self,f):
+        """
+        Klucz odpowiedzi linii w pamięci wyników: geometria, stałe czytane przez wybrany model,
+        fala padająca i częstotliwości.
+        """
+        stale = (Constants.E, Constants.H, Constants.Eps, Constants.Mi)
+        if self.model == 'mtl':
+            stale += (Constants.c,)            # stała fazowa beta = omega/c
+        return wyniki.skrot('zadanie2.odpowiedz',\
+            self.model,\
+            self.linia.skrot(),\
+            stale,\
+            [(w.x, w.y, w.z) for w in (self.fala.k, self.fala.E, self.fala.H)],\
+            np.asarray(f, dtype=float))
+        
+    @instrumentacja.mierz('Rozwiazanie.przebiegNapiec')
+    def przebiegNapiec(self,probki,dt):
+        """
+        Tryb przebiegów czasowych: napięcia Vne(t) i Vfe(t) [V] na obciążeniach linii oświetlanej
+        falą self.fala, której natężenie pola E ma przebieg zadany próbkami [V/m] co dt [s]
+        (np. przebiegi.zegarTrapezowy, przebiegi.impulsESD) zamiast stałej amplitudy Constants.E.
+        Widmo przebiegu (rFFT) przechodzi przez odpowiedz() dla wszystkich prążków naraz,
+        a wynik wraca do dziedziny czasu przez irFFT. Model 'skupiony' jest poprawny tylko
+        dla prążków poniżej fmax; dla szybkich zboczy należy użyć model = 'mtl'.
+        Zwraca krotkę tablic (Vne, Vfe) o długości przebiegu.
+        """
+        def transmitancja(f):
+            Vne, Vfe, V, I = self.odpowiedz(f)
+            return np.stack((Vne, Vfe)) / Constants.E
+        Vne, Vfe = przebiegi.odpowiedzCzasowa(probki,dt,transmitancja)
+        return Vne, Vfe
+        
+    def widmoVne(self,f=None):
+        """
+        Wektorowe wyznaczenie widma napięcia na obciążeniu Rne (patrz odpowiedz).
+        Metoda Vne pozostaje jako wzorcowa, skalarna wersja obliczeń.
+        """
+        return self.odpowiedz(f)[0]
+        
+    def widmoVfe(self,f=None):
+        """
+        Wektorowe wyznaczenie widma napięcia na obciążeniu Rfe (patrz odpowiedz).
+        Metoda Vfe pozostaje jako wzorcowa, skalarna wersja obliczeń.
+        """
+        return self.odpowiedz(f)[1]
+        
+    def najgorszyPrzypadek(self,k,E,H,f=None):
+        """
+        Wyznacza obwiednię najgorszego przypadku napięć na obciążeniach po wszystkich falach
+        padających zadanych tablicami (W, 3) wektorów k, E, H (patrz falePlaskie), dla każdej
+        częstotliwości z f (domyślnie siatki z czestotliwosci()). Fale są liczone porcjami po
+        rozmiarPorcjiFal, więc pamięć nie rośnie z liczbą fal. Dla model = 'mtl' każda fala
+        porcji liczona jest modelem linii długiej (odpowiedzLiniiDlugiej).
+        Zwraca krotkę (f, maksVne, maksVfe, indeksyVne, indeksyVfe), gdzie maks* to największe
+        amplitudy napięć, a indeksy* numery fal, dla których zostały osiągnięte.
+        """
+        f = self.czestotliwosci() if f is None else np.asarray(f, dtype=float).ravel()
+        k = np.asarray(k, dtype=float).reshape(-1, 3)
+        E = np.asarray(E, dtype=float).reshape(-1, 3)
+        H = np.asarray(H, dtype=float).reshape(-1, 3)
+        if self.model == 'mtl':
+            geometria = self.linia.geometria()
+            def odpowiedzPorcji(k, E, H):
+                odpowiedzi = [odpowiedzLiniiDlugiej(geometria, WektoryFali(*fala), f)[:2]\
+                    for fala in zip(map(tuple, k), map(tuple, E), map(tuple, H))]
+                return np.array([Vne for Vne, Vfe in odpowiedzi]).reshape(-1, f.size),\
+                    np.array([Vfe for Vne, Vfe in odpowiedzi]).reshape(-1, f.size)
+        elif self.model == 'skupiony':
+            odpowiedzPorcji = lambda k, E, H: self.linia.odpowiedzFalWielu(k, E, H, f)
+        else:
+            raise ValueError("Nieobsługiwany model linii w najgorszyPrzypadek: " + str(self.model))
+        maksVne = np.full(f.size, -1.0)
+        maksVfe = np.full(f.size, -1.0)
+        indeksyVne = np.zeros(f.size, dtype=int)
+        indeksyVfe = np.zeros(f.size, dtype=int)
+        with instrumentacja.etap('Rozwiazanie.najgorszyPrzypadek',len(k),f.size):
+            for poczatek in range(0, len(k), self.rozmiarPorcjiFal):
+                porcja = slice(poczatek, poczatek + self.rozmiarPorcjiFal)
+                Vne, Vfe = odpowiedzPorcji(k[porcja],E[porcja],H[porcja])
+                for V, maks, indeksy in ((Vne, maksVne, indeksyVne), (Vfe, maksVfe, indeksyVfe)):
+                    amplitudy = np.abs(V)
+                    najwieksze = amplitudy.argmax(axis=0)
+                    wartosci = amplitudy[najwieksze, np.arange(f.size)]
+                    lepsze = wartosci > maks
+                    maks[lepsze] = wartosci[lepsze]
+                    indeksy[lepsze] = najwieksze[lepsze] + poczatek
+        return f, maksVne, maksVfe, indeksyVne, indeksyVfe
+        
 #class Rysownik:
     #"""
     #Klasa obiektów obsługujących graficzną reprezentację zadania drugiego.
@@ -247,17 +701,17 @@ class Rozwiazanie:
 
 # Przydatne narzędzia
 def amplitudy(listaWartosciZespolonych):
-    'Zwraca listę amplitud liczb zespolonych przesłanych w postaci obiektu wyliczeniowego.'
-    absolutne = []
-    for wartosc in listaWartosciZespolonych:
-        absolutne.append(abs(wartosc))
-    return absolutne
+    'Zwraca tablicę amplitud liczb zespolonych przesłanych w postaci obiektu wyliczeniowego lub tablicy.'
+    return np.abs(np.asarray(listaWartosciZespolonych))
     
+@instrumentacja.mierz('rysujSytuacje')
 def rysujSytuacje(liniaTEM,falaPadajaca,tytul):
     """
     Rysuje schemat oświetlania linii TEM 2-przewodowej przez falę płaską.
     Pokazany jest kąt pod jakim fala płaska pada na linię.
     """
+    import visual as v
+    
     # Otwórz nowe okienko graficzne
     ekran = v.display(\
         title = tytul,\
@@ -346,19 +800,17 @@ def rysujSytuacje(liniaTEM,falaPadajaca,tytul):
         xoffset=30,\
         box=False)
     
-def rysujOdpowiedzLiniiTEM(rozwiazanie,tytul):
-    'Rysuje odpowiedź linii TEM 2-przewodowej na pobudzenie falą płaską.'
+@instrumentacja.mierz('rysujOdpowiedzLiniiTEM')
+def rysujOdpowiedzLiniiTEM(rozwiazanie,tytul,f=None):
+    'Rysuje odpowiedź linii TEM 2-przewodowej na pobudzenie falą płaską (domyślnie f = rozwiazanie.czestotliwosci()).'
+    import matplotlib.pyplot as plt
     
-    Vne = rozwiazanie.Vne()
-    Vfe = rozwiazanie.Vfe()
-    f = rozwiazanie.f
+    if f is None:
+        f = rozwiazanie.czestotliwosci()
+    Vne, Vfe, V, I = rozwiazanie.odpowiedz(f)
     
-    Vne = amplitudy(Vne)
-    Vfe = amplitudy(Vfe)
-    
-    Vne = np.asarray(Vne)
-    Vfe = np.asarray(Vfe)
-    f = np.asarray(f)
+    Vne = np.abs(Vne)
+    Vfe = np.abs(Vfe)
     
     plt.figure()
     
@@ -379,8 +831,81 @@ def rysujOdpowiedzLiniiTEM(rozwiazanie,tytul):
     plt.legend(loc='upper center')
 
 
+# Tryb wsadowy (bez okien)
+def wykonajZadanie(parametry):
+    """
+    Wykonuje jedno zadanie obliczeniowe opisane słownikiem parametrów i zapisuje wynik
+    do pliku tekstowego parametry['wyjscie'] w wierszach: f [Hz], |Vne| [V], |Vfe| [V].
+    Plik z rozszerzeniem .npy lub .npz otrzymuje zespolony wynik binarny
+    (patrz Rozwiazanie.wynikOdpowiedzi i wyniki.WynikObliczen). Obsługiwane klucze:
+        k, E, H - trzyelementowe listy wektorów fali padającej (niepodane - z fali Rozwiazanie),
+        Rne, Rfe - [Ohm] obciążenia linii (domyślnie LiniaTEM.Rne i LiniaTEM.Rfe),
+        fmin, fmax - [Hz] zakres siatki częstotliwości,
+        punktyNaDekadeF - gęstość siatki częstotliwości,
+        czestotliwosci - [Hz] jawna lista częstotliwości (zamiast siatki),
+        model - model linii: 'skupiony' (domyślnie) lub 'mtl' (patrz Rozwiazanie.odpowiedz),
+        pamiec - katalog trwałej pamięci wyników (patrz pamiecWynikow.PamiecWynikow).
+    Zwraca nazwę pliku wyniku.
+    """
+    rozwiazanie = Rozwiazanie()
+    rozwiazanie.fmin = wsadowe.parametr(parametry, 'fmin', float, rozwiazanie.fmin)
+    rozwiazanie.fmax = wsadowe.parametr(parametry, 'fmax', float, rozwiazanie.fmax)
+    rozwiazanie.punktyNaDekadeF = wsadowe.parametr(parametry, 'punktyNaDekadeF', int, rozwiazanie.punktyNaDekadeF)
+    rozwiazanie.model = parametry.get('model', rozwiazanie.model)
+    if not 0.0 < rozwiazanie.fmin < rozwiazanie.fmax:
+        raise ValueError("Wymagane 0 < fmin < fmax, podano fmin = {}, fmax = {}".format(\
+            rozwiazanie.fmin, rozwiazanie.fmax))
+    if rozwiazanie.punktyNaDekadeF < 1:
+        raise ValueError("Parametr zadania 'punktyNaDekadeF' musi być dodatni, podano: {}".format(\
+            rozwiazanie.punktyNaDekadeF))
+    for klucz in ('Rne', 'Rfe'):
+        setattr(rozwiazanie.linia, klucz, wsadowe.parametr(parametry, klucz, float, getattr(rozwiazanie.linia, klucz)))
+    if 'k' in parametry or 'E' in parametry or 'H' in parametry:
+        fala = rozwiazanie.fala
+        rozwiazanie.fala = FalaPlaska(\
+            k = UkladKartezjanski(*parametry['k']) if 'k' in parametry else fala.k,\
+            E = UkladKartezjanski(*parametry['E']) if 'E' in parametry else fala.E,\
+            H = UkladKartezjanski(*parametry['H']) if 'H' in parametry else fala.H,\
+            f = rozwiazanie.fmin)
+    
+    pamiec = pamiecWynikow.PamiecWynikow(parametry['pamiec']) if parametry.get('pamiec') else None
+    if parametry['wyjscie'].endswith(('.npy', '.npz')):
+        plik = parametry['wyjscie'] if parametry['wyjscie'].endswith('.npy') else None
+        wynik = rozwiazanie.wynikOdpowiedzi(parametry.get('czestotliwosci'),plik,pamiec)
+        if wynik.plik != parametry['wyjscie']:
+            wynik.zapisz(parametry['wyjscie'])
+        return parametry['wyjscie']
+    wynik = rozwiazanie.wynikOdpowiedzi(parametry.get('czestotliwosci'),None,pamiec)
+    np.savetxt(parametry['wyjscie'],\
+        np.column_stack((wynik.os('f'), np.abs(wynik.dane[0]), np.abs(wynik.dane[1]))),\
+        fmt='%.9e', header='f[Hz] |Vne|[V] |Vfe|[V]')
+    return parametry['wyjscie']
+    
+def wykonajZadania(plikZadan,katalog='.'):
+    'Wykonuje zadania z pliku JSONL (patrz wsadowe.wykonajZadania). Zwraca liczbę wykonanych zadań.'
+    return wsadowe.wykonajZadania(wykonajZadanie,plikZadan,katalog)
+    
+def wierszPolecen(argumenty=None):
+    'Obsługa wiersza poleceń trybu wsadowego (patrz wsadowe.wierszPolecen). Zwraca kod wyjścia programu.'
+    parser = argparse.ArgumentParser(description=\
+        'Napięcia indukowane falą płaską na obciążeniach linii TEM (zadanie 2), bez okien.')
+    parser.add_argument('-k', type=float, nargs=3, help='wektor kierunku propagacji fali')
+    parser.add_argument('-E', type=float, nargs=3, help='wektor pola elektrycznego fali')
+    parser.add_argument('-H', type=float, nargs=3, help='wektor pola magnetycznego fali')
+    parser.add_argument('--Rne', type=float, help='[Ohm] obciążenie na wrotach wejściowych')
+    parser.add_argument('--Rfe', type=float, help='[Ohm] obciążenie na wrotach wyjściowych')
+    parser.add_argument('--fmin', type=float, help='[Hz] częstotliwość początkowa')
+    parser.add_argument('--fmax', type=float, help='[Hz] częstotliwość końcowa')
+    parser.add_argument('--punktyNaDekadeF', type=int, help='liczba punktów na dekadę częstotliwości')
+    parser.add_argument('-f', '--czestotliwosci', type=float, nargs='+', help='[Hz] jawna lista częstotliwości')
+    parser.add_argument('--model', choices=('skupiony', 'mtl'), help='model linii (domyślnie skupiony)')
+    return wsadowe.wierszPolecen(parser,wykonajZadanie,argumenty)
+
 if __name__ == '__main__':
     
+    if len(sys.argv) > 1:
+        sys.exit(wierszPolecen())
+    
     rozwiazanie = Rozwiazanie()
     
     # Z uwagi na niejasność orientacji fali padającej i obwodu oświetlanego.
@@ -404,4 +929,5 @@ if __name__ == '__main__':
     rysujOdpowiedzLiniiTEM(rozwiazanie,'[Fala druga] Napiecia indukowane na obciazeniach')
     
     
+    import matplotlib.pyplot as plt
     plt.show()